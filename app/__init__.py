@@ -6,16 +6,18 @@ from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
 from core.configuration.configuration import get_app_version
+from core.database.routing import RoutingSession
 from core.managers.config_manager import ConfigManager
 from core.managers.error_handler_manager import ErrorHandlerManager
 from core.managers.logging_manager import LoggingManager
 from core.managers.module_manager import ModuleManager
+from core.managers.query_instrumentation_manager import QueryInstrumentationManager
 
 # Load environment variables
 load_dotenv()
 
 # Create the instances
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
 
@@ -43,9 +45,9 @@ def create_app(config_name="development"):
 
     @login_manager.user_loader
     def load_user(user_id):
-        from app.modules.auth.models import User
+        from app.modules.auth.services import AuthenticationService
 
-        return User.query.get(int(user_id))
+        return AuthenticationService().load_user(user_id)
 
     # Set up logging
     logging_manager = LoggingManager(app)
@@ -55,6 +57,10 @@ def create_app(config_name="development"):
     error_handler_manager = ErrorHandlerManager(app)
     error_handler_manager.register_error_handlers()
 
+    # Count queries per request: N+1 warnings in the log and Server-Timing in development
+    query_instrumentation_manager = QueryInstrumentationManager(app)
+    query_instrumentation_manager.register_hooks()
+
     # Injecting environment variables into jinja context
     @app.context_processor
     def inject_vars_into_jinja():
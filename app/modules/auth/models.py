@@ -66,5 +66,20 @@ class UserSession(db.Model):
 
     flask_session_token = db.Column(db.String(512), nullable=True)
 
+    # El token ocupa hasta 2048 bytes en utf8mb4; con el prefijo de 255 caracteres el índice compuesto
+    # cabe en el límite de InnoDB (los tokens son hashes sha256 de 64 caracteres).
+    __table_args__ = (
+        db.Index(
+            "ix_user_session_lookup",
+            "session_id",
+            "flask_session_token",
+            "user_id",
+            mysql_length={"flask_session_token": 255},
+        ),
+        db.Index(
+            "ix_user_session_token_user", "flask_session_token", "user_id", mysql_length={"flask_session_token": 255}
+        ),
+    )
+
     def update_activity(self):
         self.last_activity = datetime.now(timezone.utc)
@@ -1,13 +1,30 @@
 from datetime import datetime, timedelta
 
+from sqlalchemy.orm import make_transient_to_detached
+
 from app.modules.auth.models import User
 from core.repositories.BaseRepository import BaseRepository
 
 
 class UserRepository(BaseRepository):
+    # Columnas que se guardan en la caché de sesión; el hash de la contraseña y el secreto 2FA se
+    # quedan fuera y se cargan de la base de datos solo si se llegan a usar.
+    CACHED_COLUMNS = ("id", "email", "created_at", "two_factor_enabled", "failed_login_attempts", "last_failed_login")
+
     def __init__(self):
         super().__init__(User)
 
+    def cached_values(self, user: User) -> dict:
+        return {column: getattr(user, column) for column in self.CACHED_COLUMNS}
+
+    def from_cached_values(self, values: dict) -> User:
+        """Devuelve un User de la sesión actual construido con valores cacheados, sin consultar."""
+        user = self.model.__mapper__.class_manager.new_instance()
+        for column, value in values.items():
+            setattr(user, column, value)
+        make_transient_to_detached(user)
+        return self.session.merge(user, load=False)
+
     def create(self, commit: bool = True, **kwargs):
         password = kwargs.pop("password")
         instance = self.model(**kwargs)
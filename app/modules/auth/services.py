@@ -5,11 +5,13 @@ from datetime import datetime, timedelta, timezone
 
 from flask import request
 from flask_login import current_user, login_user
+from sqlalchemy import event
 
 from app.modules.auth.models import User, UserSession
 from app.modules.auth.repositories import UserRepository
 from app.modules.profile.models import UserProfile
 from app.modules.profile.repositories import UserProfileRepository
+from core.caches.session_cache import session_cache
 from core.configuration.configuration import uploads_folder_name
 from core.services.BaseService import BaseService
 
@@ -101,6 +103,18 @@ class AuthenticationService(BaseService):
     def verify_password(self, user: User, password: str) -> bool:
         return user.check_password(password)
 
+    def load_user(self, user_id) -> User | None:
+        """Usuario de la petición (user_loader de Flask-Login); usa la caché de sesión si puede."""
+        user_id = int(user_id)
+        values = session_cache.get_user(user_id)
+        if values is not None:
+            return self.repository.from_cached_values(values)
+
+        user = self.repository.get_by_id(user_id)
+        if user is not None:
+            session_cache.remember_user(user_id, self.repository.cached_values(user))
+        return user
+
     def is_current_session_valid(self) -> bool:
         """Verifica si la sesión actual del usuario es válida."""
         if not current_user.is_authenticated:
@@ -111,10 +125,17 @@ class AuthenticationService(BaseService):
         current_session_id = flask_session.get("session_id")
         if not current_token or not current_session_id:
             return False
+        if session_cache.is_session_valid(current_session_id, current_token, current_user.id):
+            return True
+
         session_obj = UserSession.query.filter_by(
             session_id=current_session_id, flask_session_token=current_token, user_id=current_user.id
         ).first()
-        return session_obj is not None
+        if session_obj is None:
+            return False
+
+        session_cache.remember_session(current_session_id, current_token, current_user.id)
+        return True
 
     def create_user_session(self, user: User):
         """Crea una nueva sesión activa para el usuario."""
@@ -146,6 +167,7 @@ class AuthenticationService(BaseService):
         )
         self.repository.session.add(user_session)
         self.repository.session.commit()
+        session_cache.remember_session(session_id, flask_session_token, user.id)
 
         try:
             from flask import session as flask_session_obj
@@ -199,8 +221,9 @@ class AuthenticationService(BaseService):
         if session_obj:
             self.repository.session.delete(session_obj)
             self.repository.session.commit()
-            return True
-        return False
+        # Tras el commit, para que otra petición no vuelva a cachear la sesión antes de borrarla
+        session_cache.forget_sessions(session_id)
+        return session_obj is not None
 
     def verify_session_token(self, token: str, user_id: int) -> bool:
         """Verifica si un token de sesión es válido para un usuario."""
@@ -215,8 +238,13 @@ class AuthenticationService(BaseService):
 
     def terminate_all_other_sessions(self, user: User, current_session_id: str):
         """Elimina todas las sesiones del usuario excepto la actual."""
-        UserSession.query.filter(UserSession.user_id == user.id, UserSession.session_id != current_session_id).delete()
+        other_sessions = UserSession.query.filter(
+            UserSession.user_id == user.id, UserSession.session_id != current_session_id
+        )
+        session_ids = [session_id for (session_id,) in other_sessions.with_entities(UserSession.session_id)]
+        other_sessions.delete()
         self.repository.session.commit()
+        session_cache.forget_sessions(*session_ids)
 
     def get_remaining_seconds(self, user):
         if user.failed_login_attempts >= 6 and user.last_failed_login:
@@ -226,3 +254,10 @@ class AuthenticationService(BaseService):
                 return int(60 - time_since_fail.total_seconds())
 
         return 0
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _forget_cached_user(mapper, connection, user):
+    # Cualquier cambio en el usuario (2FA, intentos fallidos...) debe verse en la siguiente petición
+    session_cache.forget_user(user.id)
@@ -3,11 +3,13 @@ import time
 import pyotp
 import pytest
 from flask import url_for
+from flask_login import login_user
 
 from app import db
 from app.modules.auth.repositories import UserRepository
 from app.modules.auth.services import AuthenticationService
 from app.modules.profile.repositories import UserProfileRepository
+from core.caches.session_cache import LocalCacheBackend, SessionCache
 
 
 @pytest.fixture(scope="module")
@@ -240,3 +242,61 @@ def test_login_brute_force_limit(test_client, clean_database):
     response = test_client.post("/login", data=dict(email="test@example.com", password="test1234"))
 
     assert response.request.path == url_for("auth.login"), "Account should be blocked after multiple failed attempts"
+
+
+# --- Caché de sesión ---
+@pytest.fixture
+def enabled_session_cache(mocker):
+    cache = SessionCache(LocalCacheBackend(), ttl=30)
+    mocker.patch("app.modules.auth.services.session_cache", cache)
+    return cache
+
+
+def test_load_user_is_served_from_session_cache(test_client, clean_database, enabled_session_cache, query_limit):
+    with test_client.application.test_request_context():
+        service = AuthenticationService()
+        user = service.create_with_profile(name="Cache", surname="User", email="cache@example.com", password="1234")
+        user_id = user.id
+        service.load_user(user_id)
+        db.session.remove()
+
+        with query_limit(0):
+            cached_user = service.load_user(str(user_id))
+
+        assert cached_user.email == "cache@example.com"
+        # La contraseña no se cachea: se carga al usarla
+        assert cached_user.check_password("1234")
+
+        cached_user.two_factor_enabled = True
+        db.session.commit()
+        assert enabled_session_cache.get_user(user_id) is None
+
+
+def test_session_validity_cache_is_invalidated_by_terminate(
+    test_client, clean_database, enabled_session_cache, query_limit
+):
+    with test_client.application.test_request_context():
+        service = AuthenticationService()
+        user = service.create_with_profile(name="Remote", surname="Logout", email="remote@example.com", password="1")
+        login_user(user)
+        user_session = service.create_user_session(user)
+
+        with query_limit(0):
+            assert service.is_current_session_valid() is True
+
+        service.terminate_session(user_session.session_id)
+        assert service.is_current_session_valid() is False
+
+
+def test_terminate_all_other_sessions_invalidates_their_cache(test_client, clean_database, enabled_session_cache):
+    with test_client.application.test_request_context():
+        service = AuthenticationService()
+        user = service.create_with_profile(name="Many", surname="Devices", email="many@example.com", password="1")
+        other = service.create_user_session(user)
+        other_key = (other.session_id, other.flask_session_token, user.id)
+        current = service.create_user_session(user)
+
+        service.terminate_all_other_sessions(user, current_session_id=current.session_id)
+
+        assert not enabled_session_cache.is_session_valid(*other_key)
+        assert enabled_session_cache.is_session_valid(current.session_id, current.flask_session_token, user.id)
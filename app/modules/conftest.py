@@ -2,6 +2,7 @@ import pytest
 
 from app import create_app, db
 from app.modules.auth.models import User
+from core.database.instrumentation import max_queries
 
 
 @pytest.fixture(scope="session")
@@ -52,6 +53,15 @@ def clean_database():
     db.create_all()
 
 
+@pytest.fixture
+def query_limit():
+    """
+    Fails the test if a block runs more than the given number of queries:
+    with query_limit(6): test_client.get("/dataset/list")
+    """
+    return max_queries
+
+
 def login(test_client, email, password):
     """
     Authenticates the user with the credentials provided.
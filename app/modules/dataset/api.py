@@ -1,3 +1,4 @@
+from app.modules.dataset.loaders import api_query
 from app.modules.dataset.models import DataSet
 from core.resources.generic_resource import create_resource
 from core.serialisers.serializer import Serializer
@@ -15,7 +16,7 @@ dataset_fields = {
 
 dataset_serializer = Serializer(dataset_fields, related_serializers={"files": file_serializer})
 
-DataSetResource = create_resource(DataSet, dataset_serializer)
+DataSetResource = create_resource(DataSet, dataset_serializer, query=api_query)
 
 
 def init_blueprint_api(api):
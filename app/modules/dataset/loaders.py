@@ -0,0 +1,89 @@
+"""
+Opciones de carga de DataSet por vista.
+
+DataSet usa herencia joined-table: si se consulta la clase padre, cada fila pide después su subtipo
+y sus ficheros por separado. Las consultas de listado usan ``dataset_query(view)``, que resuelve los
+subtipos con LEFT OUTER JOIN en la misma consulta (``with_polymorphic('*')``) y precarga con
+``selectinload`` lo que pinta cada vista. Así el número de consultas de una página no depende de
+cuántos datasets muestre ni de qué tipos sean.
+"""
+
+from functools import lru_cache
+
+from sqlalchemy.orm import selectinload, with_polymorphic
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.dataset.models import DataSet, DSMetaData
+from app.modules.featuremodel.models import FeatureModel, FMMetaData
+
+
+@lru_cache(maxsize=None)
+def polymorphic_dataset():
+    """Entidad DataSet con todas sus subclases unidas (sin alias: los filtros sobre DataSet siguen valiendo)."""
+    return with_polymorphic(DataSet, "*")
+
+
+def _meta_data(ds):
+    return [selectinload(ds.ds_meta_data).selectinload(DSMetaData.authors)]
+
+
+def _meta_data_only(ds):
+    return [selectinload(ds.ds_meta_data)]
+
+
+def _metrics(ds):
+    return [selectinload(ds.ds_meta_data).selectinload(DSMetaData.ds_metrics)]
+
+
+def _owner(ds):
+    return [selectinload(ds.user).selectinload(User.profile)]
+
+
+def _files(ds):
+    return [
+        selectinload(ds.UVLDataSet.feature_models).selectinload(FeatureModel.files),
+        selectinload(ds.FormulaDataSet.files_rel),
+    ]
+
+
+def _feature_model_details(ds):
+    fm_meta_data = selectinload(ds.UVLDataSet.feature_models).selectinload(FeatureModel.fm_meta_data)
+    return [
+        fm_meta_data.selectinload(FMMetaData.authors),
+        fm_meta_data.selectinload(FMMetaData.fm_metrics),
+    ]
+
+
+# Qué precarga cada vista: tarjetas de listado, página de detalle y respuestas JSON (to_dict)
+LOADER_OPTIONS = {
+    "card": (_meta_data, _files),
+    "detail": (_meta_data, _owner, _files, _feature_model_details),
+    "api": (_meta_data, _metrics, _files),
+}
+
+
+# Qué precarga cada campo de /api/v1/datasets/ (?fields=, ?include=); el resto no se carga
+API_FIELD_LOADERS = {
+    "name": _meta_data_only,
+    "doi": _meta_data_only,
+    "files": _files,
+}
+
+
+def loader_options(view: str) -> list:
+    if view not in LOADER_OPTIONS:
+        raise ValueError(f"Unknown dataset view '{view}'. Available: {', '.join(LOADER_OPTIONS)}")
+
+    ds = polymorphic_dataset()
+    return [option for build in LOADER_OPTIONS[view] for option in build(ds)]
+
+
+def dataset_query(view: str):
+    return db.session.query(polymorphic_dataset()).options(*loader_options(view))
+
+
+def api_query(fields):
+    ds = polymorphic_dataset()
+    builders = {API_FIELD_LOADERS[field] for field in fields if field in API_FIELD_LOADERS}
+    return db.session.query(ds).options(*[option for build in builders for option in build(ds)])
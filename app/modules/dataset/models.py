@@ -45,8 +45,20 @@ class Author(db.Model):
 
 class DSMetrics(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    number_of_models = db.Column(db.String(120))
-    number_of_features = db.Column(db.String(120))
+    number_of_models = db.Column(db.Integer)
+    number_of_features = db.Column(db.Integer)
+    number_of_constraints = db.Column(db.Integer)
+    number_of_configurations = db.Column(db.Float)
+    max_tree_depth = db.Column(db.Integer)
+
+    def to_dict(self):
+        return {
+            "number_of_models": self.number_of_models,
+            "number_of_features": self.number_of_features,
+            "number_of_constraints": self.number_of_constraints,
+            "number_of_configurations": self.number_of_configurations,
+            "max_tree_depth": self.max_tree_depth,
+        }
 
     def __repr__(self):
         return f"DSMetrics<models={self.number_of_models}, features={self.number_of_features}>"
@@ -54,12 +66,12 @@ class DSMetrics(db.Model):
 
 class DSMetaData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    deposition_id = db.Column(db.Integer)
+    deposition_id = db.Column(db.Integer, index=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=False)
     publication_type = db.Column(SQLAlchemyEnum(PublicationType), nullable=False)
     publication_doi = db.Column(db.String(120))
-    dataset_doi = db.Column(db.String(120))
+    dataset_doi = db.Column(db.String(120), index=True)
     tags = db.Column(db.String(120))
     ds_metrics_id = db.Column(db.Integer, db.ForeignKey("ds_metrics.id"))
     ds_metrics = db.relationship("DSMetrics", uselist=False, backref="ds_meta_data", cascade="all, delete")
@@ -82,6 +94,7 @@ class DataSet(db.Model):
     dataset_type = db.Column(db.String(50))
 
     __mapper_args__ = {"polymorphic_identity": "generic_dataset", "polymorphic_on": dataset_type}
+    __table_args__ = (db.Index("ix_data_set_user_id_created_at", "user_id", "created_at"),)
 
     ds_meta_data = db.relationship("DSMetaData", backref=db.backref("data_set", uselist=False))
 
@@ -139,6 +152,7 @@ class DataSet(db.Model):
             "zenodo": self.get_zenodo_url(),
             "download_count": self.download_count,
             "dataset_type": self.dataset_type,
+            "metrics": self.ds_meta_data.ds_metrics.to_dict() if self.ds_meta_data.ds_metrics else None,
         }
 
     def __repr__(self):
@@ -192,12 +206,22 @@ class FormulaFile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     size = db.Column(db.Integer, nullable=True)
+    checksum = db.Column(db.String(120), nullable=True)
+    storage_key = db.Column(db.String(512), nullable=True)
+    row_count = db.Column(db.Integer, nullable=True)
+    column_schema = db.Column(db.JSON, nullable=True)
     formula_dataset_id = db.Column(db.Integer, db.ForeignKey("formula_dataset.id"), nullable=False)
 
     def get_path(self):
         """
-        Calcula la ruta física dinámica.
+        Ruta local del fichero. Con storage_key no hace falta ninguna consulta; los ficheros
+        anteriores a esa columna calculan la ruta a partir del dataset.
         """
+        if self.storage_key:
+            from core.storage.storage import storage
+
+            return storage.local_path(self.storage_key)
+
         ds = self.dataset
 
         working_dir = os.getenv("WORKING_DIR") or os.path.abspath(os.getcwd())
@@ -210,7 +234,15 @@ class FormulaFile(db.Model):
         return seed_path
 
     def to_dict(self):
-        return {"id": self.id, "name": self.name, "size": self.size, "url": f"/dataset/formula/file_preview/{self.id}"}
+        return {
+            "id": self.id,
+            "name": self.name,
+            "size": self.size,
+            "checksum": self.checksum,
+            "row_count": self.row_count,
+            "column_schema": self.column_schema,
+            "url": f"/dataset/formula/file_preview/{self.id}",
+        }
 
 
 # ==========================================
@@ -290,6 +322,8 @@ class DSDownloadRecord(db.Model):
     download_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     download_cookie = db.Column(db.String(36), nullable=False)
 
+    __table_args__ = (db.Index("ix_ds_download_record_lookup", "dataset_id", "user_id", "download_cookie"),)
+
 
 class DSViewRecord(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -298,8 +332,10 @@ class DSViewRecord(db.Model):
     view_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     view_cookie = db.Column(db.String(36), nullable=False)
 
+    __table_args__ = (db.Index("ix_ds_view_record_lookup", "dataset_id", "user_id", "view_cookie"),)
+
 
 class DOIMapping(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    dataset_doi_old = db.Column(db.String(120))
+    dataset_doi_old = db.Column(db.String(120), index=True)
     dataset_doi_new = db.Column(db.String(120))
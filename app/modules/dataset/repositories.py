@@ -5,6 +5,7 @@ from typing import Optional
 from flask_login import current_user
 from sqlalchemy import desc, func
 
+from app.modules.dataset.loaders import dataset_query, polymorphic_dataset
 from app.modules.dataset.models import (
     Author,
     DataSet,
@@ -14,6 +15,7 @@ from app.modules.dataset.models import (
     DSViewRecord,
     FormulaFile,
 )
+from core.database.routing import reads_from_replica
 from core.repositories.BaseRepository import BaseRepository
 
 logger = logging.getLogger(__name__)
@@ -33,6 +35,7 @@ class DSDownloadRecordRepository(BaseRepository):
     def __init__(self):
         super().__init__(DSDownloadRecord)
 
+    @reads_from_replica
     def total_dataset_downloads(self) -> int:
         max_id = self.model.query.with_entities(func.max(self.model.id)).scalar()
         return max_id if max_id is not None else 0
@@ -42,6 +45,7 @@ class DSMetaDataRepository(BaseRepository):
     def __init__(self):
         super().__init__(DSMetaData)
 
+    @reads_from_replica
     def filter_by_doi(self, doi: str) -> Optional[DSMetaData]:
         return self.model.query.filter_by(dataset_doi=doi).first()
 
@@ -50,6 +54,7 @@ class DSViewRecordRepository(BaseRepository):
     def __init__(self):
         super().__init__(DSViewRecord)
 
+    @reads_from_replica
     def total_dataset_views(self) -> int:
         max_id = self.model.query.with_entities(func.max(self.model.id)).scalar()
         return max_id if max_id is not None else 0
@@ -74,17 +79,33 @@ class DataSetRepository(BaseRepository):
     def __init__(self):
         super().__init__(DataSet)
 
+    def _query(self, view: str):
+        return dataset_query(view)
+
+    def get_or_404(self, id: int, view: Optional[str] = None) -> DataSet:
+        if view is None:
+            return super().get_or_404(id)
+        return self._query(view).filter(DataSet.id == id).first_or_404()
+
+    @reads_from_replica
+    def get_by_doi(self, doi: str, view: str = "detail") -> Optional[DataSet]:
+        return self._query(view).join(polymorphic_dataset().ds_meta_data).filter(DSMetaData.dataset_doi == doi).first()
+
+    @reads_from_replica
     def get_synchronized(self, current_user_id: int) -> DataSet:
         return (
-            self.model.query.join(DSMetaData)
+            self._query("card")
+            .join(polymorphic_dataset().ds_meta_data)
             .filter(DataSet.user_id == current_user_id, DSMetaData.dataset_doi.isnot(None))
             .order_by(self.model.created_at.desc())
             .all()
         )
 
+    @reads_from_replica
     def get_unsynchronized(self, current_user_id: int) -> DataSet:
         return (
-            self.model.query.join(DSMetaData)
+            self._query("card")
+            .join(polymorphic_dataset().ds_meta_data)
             .filter(DataSet.user_id == current_user_id, DSMetaData.dataset_doi.is_(None))
             .order_by(self.model.created_at.desc())
             .all()
@@ -92,20 +113,33 @@ class DataSetRepository(BaseRepository):
 
     def get_unsynchronized_dataset(self, current_user_id: int, dataset_id: int) -> DataSet:
         return (
-            self.model.query.join(DSMetaData)
+            self._query("detail")
+            .join(polymorphic_dataset().ds_meta_data)
             .filter(DataSet.user_id == current_user_id, DataSet.id == dataset_id, DSMetaData.dataset_doi.is_(None))
             .first()
         )
 
+    def paginate_by_user(self, user_id: int, page: int, per_page: int):
+        return (
+            self._query("card")
+            .filter(DataSet.user_id == user_id)
+            .order_by(self.model.created_at.desc())
+            .paginate(page=page, per_page=per_page, error_out=False)
+        )
+
+    @reads_from_replica
     def count_synchronized_datasets(self):
         return self.model.query.join(DSMetaData).filter(DSMetaData.dataset_doi.isnot(None)).count()
 
+    @reads_from_replica
     def count_unsynchronized_datasets(self):
         return self.model.query.join(DSMetaData).filter(DSMetaData.dataset_doi.is_(None)).count()
 
+    @reads_from_replica
     def latest_synchronized(self):
         return (
-            self.model.query.join(DSMetaData)
+            self._query("card")
+            .join(polymorphic_dataset().ds_meta_data)
             .filter(DSMetaData.dataset_doi.isnot(None))
             .order_by(desc(self.model.id))
             .limit(5)
@@ -117,5 +151,6 @@ class DOIMappingRepository(BaseRepository):
     def __init__(self):
         super().__init__(DOIMapping)
 
+    @reads_from_replica
     def get_new_doi(self, old_doi: str) -> str:
         return self.model.query.filter_by(dataset_doi_old=old_doi).first()
@@ -12,7 +12,7 @@ from flask_login import current_user, login_required
 from app import db
 from app.modules.dataset import dataset_bp
 from app.modules.dataset.forms import DataSetForm, FormulaDataSetForm
-from app.modules.dataset.models import DataSet, DSDownloadRecord, FormulaFile
+from app.modules.dataset.models import DataSet, DSDownloadRecord, FormulaDataSet, FormulaFile
 from app.modules.dataset.services import (
     AuthorService,
     DataSetService,
@@ -21,8 +21,11 @@ from app.modules.dataset.services import (
     DSMetaDataService,
     DSViewRecordService,
     FormulaDataSetService,
+    FormulaQueryService,
+    FormulaSeriesService,
     UVLDataSetService,
 )
+from app.modules.dataset.telemetry import CsvValidationError
 from app.modules.fakenodo.services import FakenodoService
 
 logger = logging.getLogger(__name__)
@@ -34,6 +37,8 @@ dsmetadata_service = DSMetaDataService()
 fakenodo_service = FakenodoService()
 doi_mapping_service = DOIMappingService()
 ds_view_record_service = DSViewRecordService()
+formula_series_service = FormulaSeriesService()
+formula_query_service = FormulaQueryService()
 
 
 @dataset_bp.route("/dataset/upload/select", methods=["GET"])
@@ -127,6 +132,13 @@ def create_dataset(dataset_type):
                 # Si es una petición normal de navegador (fallback), redirección estándar
                 return redirect(url_for("dataset.list_dataset"))
 
+            except CsvValidationError as exc:
+                logger.info(f"Rejected invalid CSV upload: {exc}")
+                if request.accept_mimetypes.best == "application/json" or request.is_json:
+                    return jsonify({"message": "Invalid CSV file", "errors": {"csv_file": [str(exc)]}}), 400
+
+                return render_template(template, form=form, error=str(exc)), 400
+
             except Exception as exc:
                 logger.exception(f"Exception while create dataset: {exc}")
                 flash(f"Error al crear el dataset: {str(exc)}", "danger")
@@ -235,24 +247,25 @@ def download_dataset(dataset_id):
     dataset.download_count = DataSet.download_count + 1
     db.session.commit()
 
-    file_path = f"uploads/user_{dataset.user_id}/dataset_{dataset.id}/"
-
     temp_dir = tempfile.mkdtemp()
     zip_path = os.path.join(temp_dir, f"dataset_{dataset_id}.zip")
+    folder = os.path.basename(zip_path[:-4])
 
-    # Generación de ZIP
-    if not os.path.exists(file_path):
-        os.makedirs(file_path, exist_ok=True)
-
+    # Generación de ZIP: los ficheros registrados se leen del almacenamiento por su clave
     with ZipFile(zip_path, "w") as zipf:
-        for subdir, dirs, files in os.walk(file_path):
-            for file in files:
-                full_path = os.path.join(subdir, file)
-                relative_path = os.path.relpath(full_path, file_path)
-                zipf.write(
-                    full_path,
-                    arcname=os.path.join(os.path.basename(zip_path[:-4]), relative_path),
-                )
+        files = dataset.files()
+        for file in files:
+            full_path = file.get_path()
+            if os.path.exists(full_path):
+                zipf.write(full_path, arcname=os.path.join(folder, file.name))
+
+        if not files:
+            # Los RawDataSet no registran sus ficheros: se recorre su carpeta de uploads
+            file_path = f"uploads/user_{dataset.user_id}/dataset_{dataset.id}/"
+            for subdir, dirs, dir_files in os.walk(file_path):
+                for file in dir_files:
+                    full_path = os.path.join(subdir, file)
+                    zipf.write(full_path, arcname=os.path.join(folder, os.path.relpath(full_path, file_path)))
 
     user_cookie = request.cookies.get("download_cookie")
     if not user_cookie:
@@ -298,13 +311,11 @@ def subdomain_index(doi):
     if new_doi:
         return redirect(url_for("dataset.subdomain_index", doi=new_doi), code=302)
 
-    ds_meta_data = dsmetadata_service.filter_by_doi(doi)
+    dataset = dataset_service.get_by_doi(doi)
 
-    if not ds_meta_data:
+    if not dataset:
         abort(404)
 
-    dataset = ds_meta_data.data_set
-
     user_cookie = ds_view_record_service.create_cookie(dataset=dataset)
     resp = make_response(render_template("dataset/view_dataset.html", dataset=dataset))
     resp.set_cookie("view_cookie", user_cookie)
@@ -323,7 +334,7 @@ def get_unsynchronized_dataset(dataset_id):
 
 @dataset_bp.route("/dataset/view/<int:dataset_id>", methods=["GET"])
 def view_dataset(dataset_id):
-    dataset = dataset_service.get_or_404(dataset_id)
+    dataset = dataset_service.get_or_404(dataset_id, view="detail")
     if current_user.is_authenticated and dataset.user_id != current_user.id:
         abort(403)
     return render_template("dataset/view_dataset.html", dataset=dataset)
@@ -346,3 +357,46 @@ def get_formula_file_preview(file_id):
 
     except Exception as e:
         return jsonify({"error": f"Error reading CSV: {str(e)}"}), 500
+
+
+@dataset_bp.route("/dataset/formula/file/<int:file_id>/series", methods=["GET"])
+def get_formula_file_series(file_id):
+    """
+    Serie (x, y) de un CSV reducida a un número acotado de puntos para pintarla en el navegador.
+    """
+    file = FormulaFile.query.get_or_404(file_id)
+
+    y_column = request.args.get("y")
+    if not y_column:
+        return jsonify({"error": "Query parameter 'y' is required"}), 400
+
+    try:
+        series = formula_series_service.get_series(
+            file,
+            x_column=request.args.get("x", "Time"),
+            y_column=y_column,
+            points=request.args.get("points", type=int),
+            method=request.args.get("method", "lttb"),
+        )
+    except FileNotFoundError:
+        return jsonify({"error": "File not found on disk"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(series)
+
+
+@dataset_bp.route("/dataset/formula/<int:dataset_id>/query", methods=["POST"])
+def query_formula_dataset(dataset_id):
+    """
+    Filtra y agrega todos los CSV de un FormulaDataSet sin descargarlos.
+    Body JSON: {"filters": [...], "group_by": "...", "aggregations": [...]}
+    """
+    dataset = FormulaDataSet.query.get_or_404(dataset_id)
+
+    try:
+        result = formula_query_service.run(dataset, request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(result)
@@ -1,10 +1,10 @@
 import os
-import shutil
 from datetime import datetime, timezone
 
 from dotenv import load_dotenv
 
 from core.seeders.BaseSeeder import BaseSeeder
+from core.storage.storage import dataset_file_key, storage
 
 
 class DataSetSeeder(BaseSeeder):
@@ -22,6 +22,7 @@ class DataSetSeeder(BaseSeeder):
             PublicationType,
             UVLDataSet,
         )
+        from app.modules.dataset.services import calculate_checksum_and_size
         from app.modules.featuremodel.models import FeatureModel, FMMetaData
         from app.modules.hubfile.models import Hubfile
 
@@ -43,7 +44,7 @@ class DataSetSeeder(BaseSeeder):
         # ==============================================================================
 
         # Create DSMetrics instance
-        ds_metrics = DSMetrics(number_of_models="5", number_of_features="50")
+        ds_metrics = DSMetrics(number_of_models=5, number_of_features=50)
         seeded_ds_metrics = self.seed([ds_metrics])[0]
 
         # Create DSMetaData instances
@@ -64,7 +65,7 @@ class DataSetSeeder(BaseSeeder):
 
         # Create Author instances and associate with DSMetaData
         authors = [
-            Author(
+            dict(
                 name=f"Author {i+1}",
                 affiliation=f"Affiliation {i+1}",
                 orcid=f"0000-0000-0000-000{i}",
@@ -72,7 +73,7 @@ class DataSetSeeder(BaseSeeder):
             )
             for i in range(4)
         ]
-        self.seed(authors)
+        self.bulk_seed(Author, authors)
 
         # Create UVLDataSet instances
         datasets = [
@@ -88,7 +89,7 @@ class DataSetSeeder(BaseSeeder):
 
         # Assume there are 12 UVL files, create corresponding FMMetaData and FeatureModel
         fm_meta_data_list = [
-            FMMetaData(
+            dict(
                 uvl_filename=f"file{i+1}.uvl",
                 title=f"Feature Model {i+1}",
                 description=f"Description for feature model {i+1}",
@@ -99,51 +100,50 @@ class DataSetSeeder(BaseSeeder):
             )
             for i in range(12)
         ]
-        seeded_fm_meta_data = self.seed(fm_meta_data_list)
+        fm_meta_data_ids = self.bulk_seed(FMMetaData, fm_meta_data_list, return_ids=True)
 
         # Create Author instances and associate with FMMetaData
         fm_authors = [
-            Author(
+            dict(
                 name=f"Author {i+5}",
                 affiliation=f"Affiliation {i+5}",
                 orcid=f"0000-0000-0000-000{i+5}",
-                fm_meta_data_id=seeded_fm_meta_data[i].id,
+                fm_meta_data_id=fm_meta_data_ids[i],
             )
             for i in range(12)
         ]
-        self.seed(fm_authors)
+        self.bulk_seed(Author, fm_authors)
 
         feature_models = [
-            FeatureModel(uvl_dataset_id=seeded_datasets[i // 3].id, fm_meta_data_id=seeded_fm_meta_data[i].id)
-            for i in range(12)
+            dict(uvl_dataset_id=seeded_datasets[i // 3].id, fm_meta_data_id=fm_meta_data_ids[i]) for i in range(12)
         ]
-        seeded_feature_models = self.seed(feature_models)
+        feature_model_ids = self.bulk_seed(FeatureModel, feature_models, return_ids=True)
 
         # Create files, associate them with FeatureModels and copy files
         uvl_src_folder = os.path.join(working_dir, "app", "modules", "dataset", "uvl_examples")
 
+        uvl_files = []
         for i in range(12):
             file_name = f"file{i+1}.uvl"
             if not os.path.exists(os.path.join(uvl_src_folder, file_name)):
                 continue
 
-            feature_model = seeded_feature_models[i]
-            dataset = next(ds for ds in seeded_datasets if ds.id == feature_model.uvl_dataset_id)
+            dataset = seeded_datasets[i // 3]
             user_id = dataset.user_id
 
-            dest_folder = os.path.join(working_dir, "uploads", f"user_{user_id}", f"dataset_{dataset.id}")
-            os.makedirs(dest_folder, exist_ok=True)
-            shutil.copy(os.path.join(uvl_src_folder, file_name), dest_folder)
-
-            file_path = os.path.join(dest_folder, file_name)
-
-            uvl_file = Hubfile(
-                name=file_name,
-                checksum=f"checksum{i+1}",
-                size=os.path.getsize(file_path),
-                feature_model_id=feature_model.id,
+            src_path = os.path.join(uvl_src_folder, file_name)
+            storage_key = storage.put(dataset_file_key(user_id, dataset.id, file_name), src_path)
+
+            uvl_files.append(
+                dict(
+                    name=file_name,
+                    checksum=f"checksum{i+1}",
+                    size=os.path.getsize(src_path),
+                    storage_key=storage_key,
+                    feature_model_id=feature_model_ids[i],
+                )
             )
-            self.seed([uvl_file])
+        self.bulk_seed(Hubfile, uvl_files)
 
         # ==============================================================================
         # PARTE 2: FORMULA 1 DATASETS
@@ -196,25 +196,31 @@ class DataSetSeeder(BaseSeeder):
                     )
                     seeded_dataset = self.seed([formula_dataset])[0]
 
-                    # 4. Crear Archivos (FormulaFile)
-                    dest_user_folder = os.path.join(
-                        working_dir, "uploads", f"user_{current_user.id}", f"dataset_{seeded_dataset.id}"
-                    )
-                    os.makedirs(dest_user_folder, exist_ok=True)  # Aseguramos que la carpeta de uploads exista
-
+                    # 4. Crear Archivos (FormulaFile), copiados al almacenamiento
+                    formula_files = []
                     for csv_file in team_csv_files:
                         src_path = os.path.join(formula_src_folder, csv_file)
-                        dest_path = os.path.join(dest_user_folder, csv_file)  # <-- Copiar a UPLOADS
 
                         # Copiar y obtener tamaño
+                        checksum, storage_key = None, None
                         if os.path.exists(src_path):
-                            shutil.copy(src_path, dest_path)
-                            file_size = os.path.getsize(dest_path)
+                            storage_key = storage.put(
+                                dataset_file_key(current_user.id, seeded_dataset.id, csv_file), src_path
+                            )
+                            checksum, file_size = calculate_checksum_and_size(src_path)
                         else:
                             # Si el archivo fuente no existe, loguear un error y usar tamaño 0
                             print(f"⚠️ ERROR: Archivo fuente no encontrado: {src_path}")
                             file_size = 0
 
-                        # Crear el registro de DB (FormulaFile)
-                        f_file = FormulaFile(name=csv_file, size=file_size, formula_dataset_id=seeded_dataset.id)
-                        self.seed([f_file])
+                        # Registro de DB (FormulaFile); se insertan todos juntos
+                        formula_files.append(
+                            dict(
+                                name=csv_file,
+                                size=file_size,
+                                checksum=checksum,
+                                storage_key=storage_key,
+                                formula_dataset_id=seeded_dataset.id,
+                            )
+                        )
+                    self.bulk_seed(FormulaFile, formula_files)
@@ -1,11 +1,15 @@
 import hashlib
 import logging
 import os
-import shutil
+import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 
-from flask import request, url_for
+import numpy as np
+import pandas as pd
+from flask import current_app, request, url_for
 from werkzeug.utils import secure_filename
 
 from app.modules.auth.services import AuthenticationService
@@ -28,25 +32,39 @@ from app.modules.dataset.repositories import (
     DSViewRecordRepository,
     FormulaFileRepository,
 )
+from app.modules.dataset.telemetry import (
+    DOWNSAMPLING_METHODS,
+    MERGE_MODES,
+    CsvValidationError,
+    QuerySpec,
+    parse_query_spec,
+    run_query,
+    stream_merge,
+    validate_csv_stream,
+)
 from app.modules.featuremodel.models import FeatureModel, FMMetaData
 from app.modules.featuremodel.repositories import (
     FeatureModelRepository,
     FMMetaDataRepository,
 )
+from app.modules.flamapy.services import FlamapyService
 from app.modules.hubfile.models import Hubfile
 from app.modules.hubfile.repositories import HubfileRepository
+from core.jobs.job_runner import job_runner
 from core.repositories.BaseRepository import BaseRepository
 from core.services.BaseService import BaseService
+from core.storage.storage import dataset_file_key, storage
 
 logger = logging.getLogger(__name__)
 
 
 def calculate_checksum_and_size(file_path):
     file_size = os.path.getsize(file_path)
+    hash_md5 = hashlib.md5(usedforsecurity=False)
     with open(file_path, "rb") as file:
-        content = file.read()
-    hash_md5 = hashlib.md5(content, usedforsecurity=False).hexdigest()
-    return hash_md5, file_size
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            hash_md5.update(block)
+    return hash_md5.hexdigest(), file_size
 
 
 # === SERVICIO BASE ===
@@ -58,6 +76,12 @@ class DataSetService(BaseService):
         self.author_repository = AuthorRepository()
         self.dsmetadata_repository = DSMetaDataRepository()
 
+    def get_or_404(self, id, view=None):
+        return self.repository.get_or_404(id, view=view)
+
+    def get_by_doi(self, doi: str) -> DataSet:
+        return self.repository.get_by_doi(doi)
+
     def get_synchronized(self, current_user_id: int) -> DataSet:
         return self.repository.get_synchronized(current_user_id)
 
@@ -67,6 +91,9 @@ class DataSetService(BaseService):
     def get_unsynchronized_dataset(self, current_user_id: int, dataset_id: int) -> DataSet:
         return self.repository.get_unsynchronized_dataset(current_user_id, dataset_id)
 
+    def paginate_by_user(self, user_id: int, page: int, per_page: int):
+        return self.repository.paginate_by_user(user_id, page, per_page)
+
     def latest_synchronized(self):
         return self.repository.latest_synchronized()
 
@@ -91,11 +118,18 @@ class DataSetService(BaseService):
     def get_uvlhub_doi(self, dataset: DataSet) -> str:
         return url_for("fakenodo.visualize_local_dataset", dataset_id=dataset.id, _external=True)
 
-    def create_combined_dataset(self, current_user, title, description, publication_type, tags, source_dataset_ids):
+    def create_combined_dataset(
+        self, current_user, title, description, publication_type, tags, source_dataset_ids, merge_mode=None
+    ):
         """
         Crea un nuevo dataset combinando modelos/archivos de datasets existentes.
         Determina automáticamente el tipo de dataset resultante basándose en los inputs.
+
+        Si todos son Formula y se indica merge_mode ("union" o "intersection"), en lugar de
+        copiar los CSV se genera un único merged.csv en un job en segundo plano.
         """
+        if merge_mode and merge_mode not in MERGE_MODES:
+            raise ValueError(f"Unknown merge mode '{merge_mode}'. Use one of: {', '.join(MERGE_MODES)}")
 
         # 1. Recuperar todos los datasets fuente
         source_datasets = [self.get_or_404(id) for id in source_dataset_ids]
@@ -126,10 +160,15 @@ class DataSetService(BaseService):
         self.repository.session.add(dataset)
         self.repository.session.commit()
 
-        # 5. Preparar carpetas
-        working_dir = os.getenv("WORKING_DIR", "")
-        dest_folder = os.path.join(working_dir, "uploads", f"user_{current_user.id}", f"dataset_{dataset.id}")
-        os.makedirs(dest_folder, exist_ok=True)
+        # 5. MERGE EN STREAMING (solo Formula)
+        if is_all_formula and merge_mode:
+            # La etiqueta lleva el dataset de origen: ficheros homónimos (series.csv) siguen distinguiéndose
+            sources = [
+                (f"{source_ds.id}/{f.name}", f.get_path()) for source_ds in source_datasets for f in source_ds.files()
+            ]
+            storage_key = dataset_file_key(dataset.user_id, dataset.id, "merged.csv")
+            job_runner.submit(self._merge_formula_files, dataset.id, sources, storage_key, merge_mode)
+            return dataset
 
         # 6. LÓGICA DE COPIA SEGÚN TIPO
         for source_ds in source_datasets:
@@ -160,10 +199,7 @@ class DataSetService(BaseService):
                     for original_file in original_fm.files:
                         self._copy_file_physical_and_db(
                             original_file,
-                            source_ds,
                             dataset,
-                            dest_folder,
-                            working_dir,
                             model_class=Hubfile,
                             parent_id_field="feature_model_id",
                             parent_id_val=new_fm.id,
@@ -175,10 +211,7 @@ class DataSetService(BaseService):
                 for original_file in files_to_copy:
                     self._copy_file_physical_and_db(
                         original_file,
-                        source_ds,
                         dataset,
-                        dest_folder,
-                        working_dir,
                         model_class=FormulaFile,
                         parent_id_field="formula_dataset_id",
                         parent_id_val=dataset.id,
@@ -187,62 +220,111 @@ class DataSetService(BaseService):
             # --- CASO C: MEZCLA / RAW ---
             else:
                 for original_file in source_ds.files():
-                    self._copy_file_physical_only(original_file, source_ds, dest_folder, working_dir)
+                    self._copy_file_physical_only(original_file, dataset)
 
         self.repository.session.commit()
+
+        # Los Hubfiles copiados son filas nuevas: se indexan para que la búsqueda por features los encuentre
+        if is_all_uvl:
+            job_runner.submit(FlamapyService().index_dataset, dataset.id)
         return dataset
 
-    def _copy_file_physical_and_db(
-        self, original_file, source_ds, new_ds, dest_folder, working_dir, model_class, parent_id_field, parent_id_val
-    ):
+    def _merge_formula_files(self, dataset_id, sources, storage_key, merge_mode):
         """
-        Helper para copiar archivo físico y crear registro en DB.
+        Job: une los CSV fuente y registra el resultado como FormulaFile del dataset. Si la unión
+        falla, el dataset combinado se elimina para no dejarlo publicado sin ficheros.
         """
-        # 1. Calcular ruta ORIGEN
-        if hasattr(original_file, "get_path"):
-            source_path = original_file.get_path()
-        else:
-            source_path = os.path.join(
-                working_dir, "uploads", f"user_{source_ds.user_id}", f"dataset_{source_ds.id}", original_file.name
-            )
+        try:
+            return self._store_merged_file(dataset_id, sources, storage_key, merge_mode)
+        except Exception:
+            logger.exception(f"Merging the files of combined dataset {dataset_id} failed; removing it")
+            self.repository.session.rollback()
+            self._discard_dataset(dataset_id, storage_key)
+            return None
 
-        # 2. Calcular ruta DESTINO
+    def _store_merged_file(self, dataset_id, sources, storage_key, merge_mode):
+        fd, temp_path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        try:
+            stream_merge(sources, temp_path, mode=merge_mode)
+            checksum, size = calculate_checksum_and_size(temp_path)
+            storage.put(storage_key, temp_path, move=True)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        merged_file = FormulaFile(
+            name=os.path.basename(storage_key),
+            size=size,
+            checksum=checksum,
+            storage_key=storage_key,
+            formula_dataset_id=dataset_id,
+        )
+        self.repository.session.add(merged_file)
+        self.repository.session.commit()
+        return merged_file.id
+
+    def _discard_dataset(self, dataset_id=None, storage_key=None, ds_meta_data_id=None):
+        """Borra un dataset a medio crear: su fichero en el almacenamiento, la fila y sus metadatos."""
+        if storage_key:
+            storage.delete(storage_key)
+        session = self.repository.session
+        dataset = session.get(DataSet, dataset_id) if dataset_id else None
+        if dataset is not None:
+            ds_meta_data_id = dataset.ds_meta_data_id
+            session.delete(dataset)
+        ds_meta_data = session.get(DSMetaData, ds_meta_data_id) if ds_meta_data_id else None
+        if ds_meta_data is not None:
+            session.delete(ds_meta_data)
+        session.commit()
+
+    def _store_copy(self, original_file, new_ds):
+        """
+        Copia un fichero al almacenamiento del dataset nuevo y devuelve su clave, o None si el
+        original no existe. Con clave guardada la copia es un enlace dentro del almacenamiento.
+        """
         final_filename = original_file.name
-        dest_path = os.path.join(dest_folder, final_filename)
-
-        if os.path.exists(dest_path):
+        dest_key = dataset_file_key(new_ds.user_id, new_ds.id, final_filename)
+        if storage.exists(dest_key):
             name, ext = os.path.splitext(original_file.name)
             final_filename = f"{name}_{uuid.uuid4().hex[:4]}{ext}"
-            dest_path = os.path.join(dest_folder, final_filename)
+            dest_key = dataset_file_key(new_ds.user_id, new_ds.id, final_filename)
 
-        # 3. Realizar la copia
+        source_key = getattr(original_file, "storage_key", None)
+        if source_key and storage.exists(source_key):
+            return storage.link(source_key, dest_key)
+
+        source_path = original_file.get_path()
         if os.path.exists(source_path):
-            shutil.copy2(source_path, dest_path)
+            return storage.put(dest_key, source_path)
 
-            # Crear registro en DB
-            kwargs = {"name": final_filename, "size": original_file.size, parent_id_field: parent_id_val}
-            # Hubfile tiene checksum, FormulaFile no. Lo añadimos solo si existe.
-            if hasattr(original_file, "checksum"):
-                kwargs["checksum"] = original_file.checksum
+        logger.warning(f"File missing on disk during combine: {source_path}")
+        return None
 
-            new_db_file = model_class(**kwargs)
-            self.repository.session.add(new_db_file)
-        else:
-            logger.warning(f"File missing on disk during combine: {source_path}")
-
-    def _copy_file_physical_only(self, original_file, source_ds, dest_folder, working_dir):
-        """Helper para copiar solo físico (para RawDataSet)"""
-        source_path = os.path.join(
-            working_dir, "uploads", f"user_{source_ds.user_id}", f"dataset_{source_ds.id}", original_file.name
-        )
-        dest_path = os.path.join(dest_folder, original_file.name)
+    def _copy_file_physical_and_db(self, original_file, new_ds, model_class, parent_id_field, parent_id_val):
+        """
+        Helper para copiar archivo físico y crear registro en DB.
+        """
+        storage_key = self._store_copy(original_file, new_ds)
+        if storage_key is None:
+            return
+
+        kwargs = {
+            "name": os.path.basename(storage_key),
+            "size": original_file.size,
+            "storage_key": storage_key,
+            parent_id_field: parent_id_val,
+        }
+        # Hubfile tiene checksum, FormulaFile no. Lo añadimos solo si existe.
+        if hasattr(original_file, "checksum"):
+            kwargs["checksum"] = original_file.checksum
 
-        if os.path.exists(dest_path):
-            name, ext = os.path.splitext(original_file.name)
-            dest_path = os.path.join(dest_folder, f"{name}_{uuid.uuid4().hex[:4]}{ext}")
+        new_db_file = model_class(**kwargs)
+        self.repository.session.add(new_db_file)
 
-        if os.path.exists(source_path):
-            shutil.copy2(source_path, dest_path)
+    def _copy_file_physical_only(self, original_file, new_ds):
+        """Helper para copiar solo físico (para RawDataSet)"""
+        self._store_copy(original_file, new_ds)
 
     def duplicate_dataset(self, dataset_id: int, user_id: int):
         """
@@ -290,13 +372,19 @@ class UVLDataSetService(DataSetService):
     def move_feature_models(self, dataset: UVLDataSet):
         current_user = AuthenticationService().get_authenticated_user()
         source_dir = current_user.temp_folder()
-        working_dir = os.getenv("WORKING_DIR", "")
-        dest_dir = os.path.join(working_dir, "uploads", f"user_{current_user.id}", f"dataset_{dataset.id}")
-        os.makedirs(dest_dir, exist_ok=True)
 
         for feature_model in dataset.feature_models:
-            uvl_filename = feature_model.fm_meta_data.uvl_filename
-            shutil.move(os.path.join(source_dir, uvl_filename), dest_dir)
+            for file in feature_model.files:
+                storage.put(file.storage_key, os.path.join(source_dir, file.name), move=True)
+
+        # Validación, métricas, índice de features y exportaciones (Glencoe, SPLOT, DIMACS) en segundo plano
+        flamapy_service = FlamapyService()
+        job_runner.submit(flamapy_service.validate_dataset, dataset.id)
+        job_runner.submit(flamapy_service.analyze_dataset, dataset.id)
+        job_runner.submit(flamapy_service.index_dataset, dataset.id)
+        if current_app.config.get("FLAMAPY_PRECOMPUTE_EXPORTS", False):
+            hubfile_ids = [file.id for feature_model in dataset.feature_models for file in feature_model.files]
+            job_runner.submit(flamapy_service.precompute_exports, hubfile_ids)
 
     def count_feature_models(self):
         return self.feature_model_repository.count_feature_models()
@@ -309,34 +397,55 @@ class UVLDataSetService(DataSetService):
         }
         try:
             logger.info(f"Creating dsmetadata...: {form.get_dsmetadata()}")
-            dsmetadata = self.dsmetadata_repository.create(**form.get_dsmetadata())
-            for author_data in [main_author] + form.get_authors():
-                author = self.author_repository.create(commit=False, ds_meta_data_id=dsmetadata.id, **author_data)
-                dsmetadata.authors.append(author)
+            dsmetadata = self.dsmetadata_repository.create(commit=False, **form.get_dsmetadata())
+            self.author_repository.bulk_create(
+                [
+                    dict(author_data, ds_meta_data_id=dsmetadata.id)
+                    for author_data in [main_author] + form.get_authors()
+                ],
+                commit=False,
+            )
 
             # Aquí se crea la instancia de UVLDataSet automáticamente gracias al repositorio
             dataset = self.create(commit=False, user_id=current_user.id, ds_meta_data_id=dsmetadata.id)
 
-            for feature_model_form in form.feature_models:
+            # Una sentencia por tabla, tenga el dataset los modelos que tenga
+            feature_model_forms = list(form.feature_models)
+            files = []
+            for feature_model_form in feature_model_forms:
                 uvl_filename = feature_model_form.uvl_filename.data
-                fmmetadata = self.fmmetadata_repository.create(commit=False, **feature_model_form.get_fmmetadata())
-                for author_data in feature_model_form.get_authors():
-                    author = self.author_repository.create(commit=False, fm_meta_data_id=fmmetadata.id, **author_data)
-                    fmmetadata.authors.append(author)
-
-                fm = self.feature_model_repository.create(
-                    commit=False, uvl_dataset_id=dataset.id, fm_meta_data_id=fmmetadata.id
-                )
-                file_path = os.path.join(current_user.temp_folder(), uvl_filename)
-                checksum, size = calculate_checksum_and_size(file_path)
-                file = self.hubfilerepository.create(
-                    commit=False,
-                    name=uvl_filename,
-                    checksum=checksum,
-                    size=size,
-                    feature_model_id=fm.id,
+                checksum, size = calculate_checksum_and_size(os.path.join(current_user.temp_folder(), uvl_filename))
+                files.append(
+                    {
+                        "name": uvl_filename,
+                        "checksum": checksum,
+                        "size": size,
+                        "storage_key": dataset_file_key(current_user.id, dataset.id, uvl_filename),
+                    }
                 )
-                fm.files.append(file)
+
+            fmmetadata_ids = self.fmmetadata_repository.bulk_create(
+                [feature_model_form.get_fmmetadata() for feature_model_form in feature_model_forms],
+                return_ids=True,
+                commit=False,
+            )
+            self.author_repository.bulk_create(
+                [
+                    dict(author_data, fm_meta_data_id=fmmetadata_id)
+                    for feature_model_form, fmmetadata_id in zip(feature_model_forms, fmmetadata_ids)
+                    for author_data in feature_model_form.get_authors()
+                ],
+                commit=False,
+            )
+            feature_model_ids = self.feature_model_repository.bulk_create(
+                [{"uvl_dataset_id": dataset.id, "fm_meta_data_id": fmmetadata_id} for fmmetadata_id in fmmetadata_ids],
+                return_ids=True,
+                commit=False,
+            )
+            self.hubfilerepository.bulk_create(
+                [dict(file, feature_model_id=fm_id) for file, fm_id in zip(files, feature_model_ids)],
+                commit=False,
+            )
 
             self.repository.session.commit()
         except Exception as exc:
@@ -354,47 +463,67 @@ class FormulaDataSetService(DataSetService):
         self.formulafiles_repository = FormulaFileRepository()
 
     def create_from_form(self, form, current_user) -> FormulaDataSet:
-        # 1. Crear Metadatos
-        dsmetadata = self.dsmetadata_repository.create(**form.get_dsmetadata())
-
-        # 2. Autor por defecto
-        author = self.author_repository.create(
-            commit=False,
-            ds_meta_data_id=dsmetadata.id,
-            name=f"{current_user.profile.surname}, {current_user.profile.name}",
-            affiliation=current_user.profile.affiliation,
-            orcid=current_user.profile.orcid,
-        )
-        dsmetadata.authors.append(author)
-
-        # 3. Preparar archivo
+        # 1. Validar el CSV mientras se guarda (una sola pasada), antes de tocar la BD
         file = form.csv_file.data
         filename = secure_filename(file.filename)
 
-        # 4. Crear Dataset en BD (commit=True para obtener ID)
-        dataset = self.create(
-            commit=True,
-            user_id=current_user.id,
-            ds_meta_data_id=dsmetadata.id,
-        )
-
-        # 5. Guardar archivo físico
-        working_dir = os.getenv("WORKING_DIR", "")
-        dest_folder = os.path.join(working_dir, "uploads", f"user_{current_user.id}", f"dataset_{dataset.id}")
-        os.makedirs(dest_folder, exist_ok=True)
+        temp_folder = current_user.temp_folder()
+        os.makedirs(temp_folder, exist_ok=True)
 
-        file_path = os.path.join(dest_folder, filename)
-        file.save(file_path)
+        temp_path = os.path.join(temp_folder, f".upload_{uuid.uuid4().hex}.csv")
+        try:
+            report = validate_csv_stream(file.stream, temp_path)
+        except CsvValidationError:
+            os.remove(temp_path)
+            raise
 
-        file_size = os.path.getsize(file_path)
+        # Si algo falla a partir de aquí no quedan ni el temporal ni un dataset a medias
+        ds_meta_data_id = dataset_id = storage_key = None
+        try:
+            # 2. Crear Metadatos
+            dsmetadata = self.dsmetadata_repository.create(**form.get_dsmetadata())
+            ds_meta_data_id = dsmetadata.id
+
+            # 3. Autor por defecto
+            author = self.author_repository.create(
+                commit=False,
+                ds_meta_data_id=dsmetadata.id,
+                name=f"{current_user.profile.surname}, {current_user.profile.name}",
+                affiliation=current_user.profile.affiliation,
+                orcid=current_user.profile.orcid,
+            )
+            dsmetadata.authors.append(author)
 
-        # 6. Registrar FormulaFile en la base de datos
-        self.formulafiles_repository.create(
-            commit=True,  # Commit aquí para asegurar que el archivo se registre
-            name=filename,
-            size=file_size,
-            formula_dataset_id=dataset.id,
-        )
+            # 4. Crear Dataset en BD (commit=True para obtener ID)
+            dataset = self.create(
+                commit=True,
+                user_id=current_user.id,
+                ds_meta_data_id=dsmetadata.id,
+            )
+            dataset_id = dataset.id
+
+            # 5. Mover el archivo validado al almacenamiento del dataset
+            storage_key = dataset_file_key(current_user.id, dataset.id, filename)
+            storage_key = storage.put(storage_key, temp_path, move=True)
+
+            # 6. Registrar FormulaFile con lo obtenido en la validación
+            self.formulafiles_repository.create(
+                commit=True,  # Commit aquí para asegurar que el archivo se registre
+                name=filename,
+                size=report.size,
+                checksum=report.checksum,
+                storage_key=storage_key,
+                row_count=report.rows,
+                column_schema=report.schema,
+                formula_dataset_id=dataset.id,
+            )
+        except Exception as exc:
+            logger.info(f"Exception creating formula dataset from form...: {exc}")
+            self.repository.session.rollback()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self._discard_dataset(dataset_id, storage_key, ds_meta_data_id)
+            raise
 
         return dataset
 
@@ -402,6 +531,124 @@ class FormulaDataSetService(DataSetService):
         pass
 
 
+@lru_cache(maxsize=256)
+def _downsampled_series(file_path, checksum, x_column, y_column, points, method):
+    """
+    Lee solo las dos columnas pedidas y aplica el downsampling. La caché se indexa por
+    checksum, así que un fichero nuevo con el mismo nombre nunca devuelve datos antiguos.
+    """
+    try:
+        df = pd.read_csv(file_path, usecols=list(dict.fromkeys([x_column, y_column])))
+    except ValueError as exc:
+        raise ValueError(f"Column not found in CSV: {exc}") from exc
+
+    x = pd.to_numeric(df[x_column], errors="coerce").to_numpy(dtype=np.float64)
+    y = pd.to_numeric(df[y_column], errors="coerce").to_numpy(dtype=np.float64)
+
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+    if x.size == 0:
+        raise ValueError(f"Columns '{x_column}' and '{y_column}' have no numeric values")
+
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+
+    sampled_x, sampled_y = DOWNSAMPLING_METHODS[method](x, y, points)
+    return {
+        "x": x_column,
+        "y": y_column,
+        "method": method,
+        "source_points": int(x.size),
+        "points": int(len(sampled_x)),
+        "data": {"x": sampled_x.tolist(), "y": sampled_y.tolist()},
+    }
+
+
+class FormulaSeriesService:
+    DEFAULT_POINTS = 1000
+    MAX_POINTS = 10000
+
+    def __init__(self):
+        self.formulafiles_repository = FormulaFileRepository()
+
+    def ensure_checksum(self, formula_file: FormulaFile) -> str:
+        """Los ficheros anteriores a la columna checksum lo calculan una vez y lo guardan."""
+        if not formula_file.checksum:
+            checksum, size = calculate_checksum_and_size(formula_file.get_path())
+            formula_file.checksum = checksum
+            formula_file.size = size
+            self.formulafiles_repository.session.commit()
+        return formula_file.checksum
+
+    def get_series(self, formula_file: FormulaFile, x_column: str, y_column: str, points=None, method="lttb"):
+        if method not in DOWNSAMPLING_METHODS:
+            raise ValueError(f"Unknown method '{method}'. Use one of: {', '.join(DOWNSAMPLING_METHODS)}")
+
+        points = self.DEFAULT_POINTS if points is None else points
+        if points < 3 or points > self.MAX_POINTS:
+            raise ValueError(f"points must be between 3 and {self.MAX_POINTS}")
+
+        file_path = formula_file.get_path()
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+
+        checksum = self.ensure_checksum(formula_file)
+        return _downsampled_series(file_path, checksum, x_column, y_column, points, method)
+
+
+@lru_cache(maxsize=1024)
+def _file_query_rows(file_path, checksum, spec: QuerySpec):
+    """Resultado parcial de un fichero, cacheado por checksum + especificación."""
+    return run_query(file_path, spec)
+
+
+class FormulaQueryService:
+    """
+    Ejecuta una consulta declarativa (filtros, group by, agregaciones) sobre todos los CSV
+    de un FormulaDataSet en paralelo y devuelve una tabla compacta con una fila por fichero y grupo.
+    """
+
+    MAX_WORKERS = min(8, os.cpu_count() or 1)
+    _executor = None
+
+    def __init__(self):
+        self.series_service = FormulaSeriesService()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        # Se crea bajo demanda para que cada worker de gunicorn tenga su propio pool
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WORKERS, thread_name_prefix="formula-query")
+        return cls._executor
+
+    def run(self, dataset: FormulaDataSet, raw_spec: dict) -> dict:
+        spec = parse_query_spec(raw_spec)
+
+        # Rutas y checksums se resuelven aquí: los hilos del pool no tocan la sesión de BD
+        tasks = []
+        for formula_file in dataset.files():
+            file_path = formula_file.get_path()
+            if os.path.exists(file_path):
+                tasks.append((formula_file.name, file_path, self.series_service.ensure_checksum(formula_file)))
+
+        futures = [
+            (name, self.get_executor().submit(_file_query_rows, path, checksum, spec)) for name, path, checksum in tasks
+        ]
+
+        rows, errors = [], []
+        for name, future in futures:
+            try:
+                rows.extend([name] + row for row in future.result())
+            except (ValueError, KeyError) as exc:
+                errors.append({"file": name, "error": str(exc)})
+
+        return {
+            "columns": ["file", spec.group_by or "group"] + spec.result_columns,
+            "rows": rows,
+            "errors": errors,
+        }
+
+
 # === SERVICIO GENÉRICO (RAW) ===
 class RawDataSetService(DataSetService):
     def __init__(self):
@@ -0,0 +1,413 @@
+"""
+Utilidades numéricas (NumPy/pandas) para los CSV de telemetría de los FormulaDataSet.
+
+Son funciones puras: no tocan la base de datos ni Flask, solo arrays y ficheros.
+"""
+
+import csv
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int):
+    """
+    Largest-Triangle-Three-Buckets.
+
+    Conserva el primer y el último punto y, en cada bucket intermedio, el punto que
+    forma el triángulo de mayor área con el punto elegido en el bucket anterior y la
+    media del bucket siguiente. El cálculo de áreas dentro de cada bucket está vectorizado.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return x, y
+
+    # Límites de los (points - 2) buckets interiores
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+
+    # Media de cada bucket (se usa como tercer vértice del triángulo del bucket anterior)
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / sizes
+    mean_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / sizes
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 1 < points - 2:
+            next_x, next_y = mean_x[i + 1], mean_y[i + 1]
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs((x[prev] - next_x) * (bucket_y - y[prev]) - (x[prev] - bucket_x) * (next_y - y[prev]))
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+
+    return x[selected], y[selected]
+
+
+def minmax(x: np.ndarray, y: np.ndarray, points: int):
+    """
+    Divide la serie en points/2 buckets de igual número de muestras y conserva el
+    mínimo y el máximo de cada uno, en su orden original (mantiene los picos).
+    """
+    n = len(x)
+    buckets = points // 2
+    if points >= n or buckets < 1:
+        return x, y
+
+    bucket_ids = np.arange(n) * buckets // n
+    order = np.lexsort((y, bucket_ids))
+
+    starts = np.searchsorted(bucket_ids[order], np.arange(buckets), side="left")
+    ends = np.searchsorted(bucket_ids[order], np.arange(buckets), side="right") - 1
+
+    selected = np.unique(np.concatenate((order[starts], order[ends])))
+    return x[selected], y[selected]
+
+
+def mean_resample(x: np.ndarray, y: np.ndarray, points: int):
+    """
+    Remuestreo a intervalos fijos de X: media de Y en cada uno de los `points`
+    intervalos. Los intervalos sin muestras se descartan.
+    """
+    n = len(x)
+    if points >= n or points < 1:
+        return x, y
+
+    edges = np.linspace(x[0], x[-1], points + 1)
+    bins = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, points - 1)
+
+    counts = np.bincount(bins, minlength=points)
+    sums = np.bincount(bins, weights=y, minlength=points)
+
+    non_empty = counts > 0
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers[non_empty], sums[non_empty] / counts[non_empty]
+
+
+DOWNSAMPLING_METHODS = {
+    "lttb": lttb,
+    "minmax": minmax,
+    "mean": mean_resample,
+}
+
+
+# ==========================================
+# Motor de consultas sobre CSV (filtros + group by + agregaciones)
+# ==========================================
+FILTER_OPERATORS = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+AGGREGATIONS = ("count", "min", "max", "mean", "median", "sum", "std", "percentile")
+
+
+class QuerySpec(namedtuple("QuerySpec", ["filters", "group_by", "aggregations"])):
+    """
+    Especificación normalizada e inmutable (hashable), para poder usarla como clave de caché.
+
+    filters: tupla de (columna, operador, valor)
+    group_by: nombre de columna o None
+    aggregations: tupla de (función, columna, q)
+    """
+
+    @property
+    def columns(self):
+        names = [column for column, _, _ in self.filters]
+        if self.group_by:
+            names.append(self.group_by)
+        names.extend(column for _, column, _ in self.aggregations if column)
+        return list(dict.fromkeys(names))
+
+    @property
+    def result_columns(self):
+        labels = []
+        for func, column, q in self.aggregations:
+            if func == "count":
+                labels.append(f"count({column})" if column else "count")
+            elif func == "percentile":
+                labels.append(f"p{q:g}({column})")
+            else:
+                labels.append(f"{func}({column})")
+        return labels
+
+
+def parse_query_spec(spec: dict) -> QuerySpec:
+    if not isinstance(spec, dict):
+        raise ValueError("Query spec must be a JSON object")
+
+    filters = []
+    for item in spec.get("filters") or []:
+        if not isinstance(item, dict):
+            raise ValueError(f"Invalid filter {item!r}: expected an object with column, op and value")
+        column, op, value = item.get("column"), item.get("op"), item.get("value")
+        if not column or op not in FILTER_OPERATORS:
+            raise ValueError(f"Invalid filter {item}. Operators: {', '.join(FILTER_OPERATORS)}")
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"Filter value for '{column}' must be a number or a string")
+        if isinstance(value, str) and op not in ("==", "!="):
+            raise ValueError(f"Operator '{op}' needs a numeric value")
+        filters.append((column, op, value))
+
+    aggregations = []
+    for item in spec.get("aggregations") or [{"func": "count"}]:
+        if not isinstance(item, dict):
+            raise ValueError(f"Invalid aggregation {item!r}: expected an object with func and column")
+        func, column, q = item.get("func"), item.get("column"), None
+        if func not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{func}'. Use one of: {', '.join(AGGREGATIONS)}")
+        if func != "count" and not column:
+            raise ValueError(f"Aggregation '{func}' needs a column")
+        if func == "percentile":
+            q = item.get("q")
+            if isinstance(q, bool) or not isinstance(q, (int, float)) or not 0 <= q <= 100:
+                raise ValueError("Percentile needs 'q' between 0 and 100")
+            q = float(q)
+        aggregations.append((func, column or None, q))
+
+    group_by = spec.get("group_by") or None
+    if group_by is not None and not isinstance(group_by, str):
+        raise ValueError("group_by must be a column name")
+
+    return QuerySpec(tuple(filters), group_by, tuple(aggregations))
+
+
+def run_query(file_path: str, spec: QuerySpec, max_groups: int = 1000):
+    """
+    Ejecuta la consulta sobre un CSV leyendo solo las columnas implicadas.
+    Devuelve una lista de filas [grupo, agregación_1, agregación_2, ...].
+    """
+    # Un simple count no necesita ninguna columna, pero con usecols=[] pandas no lee filas
+    df = pd.read_csv(file_path, usecols=spec.columns or [0])
+
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in spec.filters:
+        if isinstance(value, str):
+            values = df[column].astype(str).to_numpy()
+        else:
+            values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+        mask &= FILTER_OPERATORS[op](values, value)
+    df = df[mask]
+
+    numeric = {column: pd.to_numeric(df[column], errors="coerce") for _, column, _ in spec.aggregations if column}
+    frame = pd.DataFrame(numeric, index=df.index)
+
+    if spec.group_by:
+        keys = df[spec.group_by]
+        if keys.nunique() > max_groups:
+            raise ValueError(f"group_by '{spec.group_by}' produces more than {max_groups} groups")
+        grouped = frame.groupby(keys, sort=True)
+        sizes = keys.groupby(keys, sort=True).size()
+    else:
+        grouped = frame.groupby(np.zeros(len(frame), dtype=np.int8))
+        sizes = pd.Series([len(frame)], index=[0])
+
+    results = []
+    for func, column, q in spec.aggregations:
+        if func == "count":
+            results.append(grouped[column].count() if column else sizes)
+        elif func == "percentile":
+            results.append(grouped[column].quantile(q / 100))
+        else:
+            results.append(grouped[column].agg(func))
+
+    table = pd.concat(results, axis=1).reindex(sizes.index) if results else pd.DataFrame(index=sizes.index)
+    table = table.astype(object).where(table.notna(), None)
+
+    rows = []
+    for key, values in zip(table.index, table.itertuples(index=False)):
+        group = key.item() if hasattr(key, "item") else key
+        rows.append([group if spec.group_by else None] + [v.item() if hasattr(v, "item") else v for v in values])
+    return rows
+
+
+# ==========================================
+# Merge en streaming de varios CSV con esquemas distintos
+# ==========================================
+MERGE_MODES = ("union", "intersection")
+SOURCE_FILE_COLUMN = "source_file"
+
+
+def scan_schema(file_path: str, chunksize: int = 50_000) -> dict:
+    """
+    Recorre el CSV por chunks y devuelve {columna: "numeric" | "text"}, en el orden de la cabecera.
+    Una columna es numérica si todos sus valores no vacíos se pueden convertir a número.
+    """
+    schema = None
+    for chunk in pd.read_csv(file_path, dtype=str, keep_default_na=False, chunksize=chunksize):
+        if schema is None:
+            schema = dict.fromkeys(chunk.columns, "numeric")
+        for column in chunk.columns:
+            if schema[column] == "text":
+                continue
+            values = chunk[column]
+            present = values != ""
+            if (pd.to_numeric(values[present], errors="coerce").isna()).any():
+                schema[column] = "text"
+
+    if schema is None:
+        schema = dict.fromkeys(pd.read_csv(file_path, nrows=0).columns, "numeric")
+    return schema
+
+
+def align_schemas(schemas: list, mode: str = "union") -> dict:
+    """
+    Combina los esquemas de varios ficheros. Con "union" entran todas las columnas (en orden
+    de aparición) y con "intersection" solo las comunes. Una columna es numérica solo si lo es
+    en todos los ficheros que la contienen.
+    """
+    if mode not in MERGE_MODES:
+        raise ValueError(f"Unknown merge mode '{mode}'. Use one of: {', '.join(MERGE_MODES)}")
+
+    aligned = {}
+    for schema in schemas:
+        for column, kind in schema.items():
+            if aligned.get(column) != "text":
+                aligned[column] = kind
+
+    if mode == "intersection":
+        aligned = {column: kind for column, kind in aligned.items() if all(column in s for s in schemas)}
+
+    aligned.pop(SOURCE_FILE_COLUMN, None)
+    return aligned
+
+
+def stream_merge(sources: list, dest_path: str, mode: str = "union", chunksize: int = 50_000) -> int:
+    """
+    Escribe en dest_path un único CSV con el esquema alineado de todas las fuentes.
+
+    sources: lista de (etiqueta, ruta). Cada fila se etiqueta con su fichero de origen en la
+    columna source_file. Solo hay un chunk en memoria a la vez. Los valores no numéricos de
+    una columna numérica quedan vacíos. Devuelve el número de filas escritas.
+    """
+    schema = align_schemas([scan_schema(path, chunksize) for _, path in sources], mode)
+    columns = list(schema)
+    numeric_columns = [column for column, kind in schema.items() if kind == "numeric"]
+
+    rows = 0
+    with open(dest_path, "w", newline="", encoding="utf-8") as out:
+        pd.DataFrame(columns=[SOURCE_FILE_COLUMN] + columns).to_csv(out, index=False)
+
+        for label, path in sources:
+            for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+                chunk = chunk.reindex(columns=columns, fill_value="")
+                for column in numeric_columns:
+                    values = chunk[column]
+                    chunk[column] = values.where(pd.to_numeric(values, errors="coerce").notna(), "")
+                chunk.insert(0, SOURCE_FILE_COLUMN, label)
+                chunk.to_csv(out, index=False, header=False)
+                rows += len(chunk)
+
+    return rows
+
+
+# ==========================================
+# Validación en streaming de un CSV subido
+# ==========================================
+MAX_LINE_BYTES = 1024 * 1024
+
+
+class CsvValidationError(ValueError):
+    """Error de formato en un CSV, con la línea (1 = cabecera) donde se detectó."""
+
+    def __init__(self, message: str, line: int = None):
+        super().__init__(f"Line {line}: {message}" if line else message)
+        self.line = line
+
+
+CsvReport = namedtuple("CsvReport", ["rows", "schema", "checksum", "size"])
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def validate_csv_stream(stream, dest_path: str, chunk_size: int = 64 * 1024) -> CsvReport:
+    """
+    Lee el CSV de `stream` por bloques, lo guarda en dest_path y lo valida en la misma pasada:
+    codificación UTF-8, cabecera, mismo número de columnas en todas las filas y que los
+    valores de las columnas numéricas sean números (el tipo lo fija el primer valor no vacío).
+
+    Lanza CsvValidationError en el primer error. Si todo va bien devuelve número de filas,
+    esquema, checksum MD5 y tamaño, sin tener que volver a leer el fichero.
+    """
+    digest = hashlib.md5(usedforsecurity=False)
+    size = 0
+    line_number = 0
+
+    def decode(raw: bytes) -> str:
+        nonlocal line_number
+        line_number += 1
+        try:
+            return raw.decode("utf-8-sig" if line_number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise CsvValidationError("invalid UTF-8 encoding", line_number) from None
+
+    def lines(out):
+        nonlocal size
+        pending = b""
+        for block in iter(lambda: stream.read(chunk_size), b""):
+            out.write(block)
+            digest.update(block)
+            size += len(block)
+
+            *complete, pending = (pending + block).split(b"\n")
+            if len(pending) > MAX_LINE_BYTES:
+                raise CsvValidationError(f"line longer than {MAX_LINE_BYTES} bytes", line_number + len(complete) + 1)
+            for raw in complete:
+                yield decode(raw + b"\n")
+        if pending:
+            yield decode(pending)
+
+    with open(dest_path, "wb") as out:
+        reader = csv.reader(lines(out))
+        try:
+            header = [name.strip() for name in next(reader, [])]
+            if not header:
+                raise CsvValidationError("file is empty or has no header")
+            if not all(header):
+                raise CsvValidationError("header has empty column names", 1)
+            duplicated = sorted({name for name in header if header.count(name) > 1})
+            if duplicated:
+                raise CsvValidationError(f"duplicated columns in header: {', '.join(duplicated)}", 1)
+
+            types = [None] * len(header)
+            rows = 0
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) != len(header):
+                    raise CsvValidationError(f"expected {len(header)} columns, found {len(row)}", reader.line_num)
+                for index, value in enumerate(row):
+                    value = value.strip()
+                    if not value:
+                        continue
+                    if types[index] is None:
+                        types[index] = "numeric" if _is_number(value) else "text"
+                    elif types[index] == "numeric" and not _is_number(value):
+                        raise CsvValidationError(
+                            f"value '{value}' in numeric column '{header[index]}' is not a number", reader.line_num
+                        )
+                rows += 1
+        except csv.Error as exc:
+            raise CsvValidationError(str(exc), reader.line_num) from exc
+
+    schema = {name: kind or "numeric" for name, kind in zip(header, types)}
+    return CsvReport(rows, schema, digest.hexdigest(), size)
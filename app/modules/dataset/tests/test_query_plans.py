@@ -0,0 +1,189 @@
+"""
+Comprueba con EXPLAIN que las consultas de los repositorios usan índices.
+
+Solo tiene sentido contra MariaDB/MySQL (la base de datos de testing habitual): se siembran unas
+cuantas filas por tabla, se actualizan las estadísticas y cualquier consulta cuyo plan recorra una
+tabla entera (``type = ALL``) hace fallar el test.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from app import db
+from app.modules.auth.models import UserSession
+from app.modules.dataset.models import (
+    DataSet,
+    DOIMapping,
+    DSDownloadRecord,
+    DSMetaData,
+    DSViewRecord,
+    PublicationType,
+)
+from app.modules.dataset.repositories import (
+    DataSetRepository,
+    DOIMappingRepository,
+    DSMetaDataRepository,
+    DSViewRecordRepository,
+)
+from app.modules.hubfile.models import HubfileDownloadRecord, HubfileViewRecord
+
+ROWS = 500
+
+SEEDED_TABLES = [
+    DSMetaData,
+    DataSet,
+    DSDownloadRecord,
+    DSViewRecord,
+    HubfileDownloadRecord,
+    HubfileViewRecord,
+    UserSession,
+    DOIMapping,
+]
+
+
+@pytest.fixture(scope="module")
+def seeded_db(test_client):
+    if db.engine.dialect.name not in ("mysql", "mariadb"):
+        pytest.skip("EXPLAIN checks need the MariaDB test database")
+
+    now = datetime.utcnow()
+    rows = range(1, ROWS + 1)
+
+    # Las filas solo existen para que el optimizador tenga estadísticas realistas; las foreign keys
+    # apuntan a identificadores que no hace falta crear.
+    db.session.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+    db.session.execute(
+        insert(DSMetaData),
+        [
+            {
+                "id": i,
+                "deposition_id": 1000 + i,
+                "title": f"Dataset {i}",
+                "description": "Seeded for query plans",
+                "publication_type": PublicationType.NONE,
+                "dataset_doi": f"10.1234/dataset{i}" if i % 2 else None,
+            }
+            for i in rows
+        ],
+    )
+    db.session.execute(
+        insert(DataSet),
+        [
+            {
+                "id": i,
+                "user_id": i % 50 + 1,
+                "ds_meta_data_id": i,
+                "created_at": now - timedelta(minutes=i),
+                "dataset_type": "generic_dataset",
+            }
+            for i in rows
+        ],
+    )
+    for model, parent, cookie, date in (
+        (DSDownloadRecord, "dataset_id", "download_cookie", "download_date"),
+        (DSViewRecord, "dataset_id", "view_cookie", "view_date"),
+        (HubfileDownloadRecord, "file_id", "download_cookie", "download_date"),
+        (HubfileViewRecord, "file_id", "view_cookie", "view_date"),
+    ):
+        db.session.execute(
+            insert(model),
+            [
+                {
+                    parent: i % 100 + 1,
+                    "user_id": None if i % 3 else i % 50 + 1,
+                    cookie: str(uuid.UUID(int=i)),
+                    date: now,
+                }
+                for i in rows
+            ],
+        )
+    db.session.execute(
+        insert(UserSession),
+        [
+            {
+                "user_id": i % 50 + 1,
+                "session_id": f"session-{i}",
+                "flask_session_token": f"{i:064x}",
+                "created_at": now,
+                "last_activity": now,
+            }
+            for i in rows
+        ],
+    )
+    db.session.execute(
+        insert(DOIMapping),
+        [{"dataset_doi_old": f"10.1234/old{i}", "dataset_doi_new": f"10.1234/dataset{i}"} for i in rows],
+    )
+    db.session.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+    db.session.commit()
+
+    for model in SEEDED_TABLES:
+        db.session.execute(text(f"ANALYZE TABLE {model.__table__.name}"))
+
+    yield test_client
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def full_scans(run_queries):
+    """Ejecuta ``run_queries`` y devuelve las tablas que alguno de sus SELECT recorre enteras."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        run_queries()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert statements, "the queries under test did not reach the database"
+
+    scans = []
+    for statement, parameters in statements:
+        plan = db.session.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+        scans.extend(row["table"] for row in plan if row["type"] == "ALL")
+    return scans
+
+
+QUERIES = {
+    "dataset by doi": lambda: DSMetaDataRepository().filter_by_doi("10.1234/dataset7"),
+    "dataset by deposition": lambda: DSMetaData.query.filter_by(deposition_id=1007).first(),
+    "synchronized datasets of user": lambda: DataSetRepository().get_synchronized(7),
+    "unsynchronized datasets of user": lambda: DataSetRepository().get_unsynchronized(7),
+    "unsynchronized dataset": lambda: DataSetRepository().get_unsynchronized_dataset(7, 56),
+    "user datasets by date": lambda: DataSet.query.filter_by(user_id=7).order_by(DataSet.created_at.desc()).all(),
+    "dataset view record": lambda: DSViewRecordRepository().the_record_exists(DataSet(id=7), str(uuid.UUID(int=106))),
+    "dataset download record": lambda: DSDownloadRecord.query.filter_by(
+        dataset_id=7, user_id=None, download_cookie=str(uuid.UUID(int=106))
+    ).first(),
+    "file view record": lambda: HubfileViewRecord.query.filter_by(
+        file_id=7, user_id=None, view_cookie=str(uuid.UUID(int=106))
+    ).first(),
+    "file download record": lambda: HubfileDownloadRecord.query.filter_by(
+        file_id=7, user_id=None, download_cookie=str(uuid.UUID(int=106))
+    ).first(),
+    "current user session": lambda: UserSession.query.filter_by(
+        session_id="session-7", flask_session_token=f"{7:064x}", user_id=8
+    ).first(),
+    "session by token and user": lambda: UserSession.query.filter_by(
+        flask_session_token=f"{7:064x}", user_id=8
+    ).first(),
+    "session by token": lambda: UserSession.query.filter_by(flask_session_token=f"{7:064x}").first(),
+    "doi mapping": lambda: DOIMappingRepository().get_new_doi("10.1234/old7"),
+}
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_repository_query_uses_an_index(seeded_db, name):
+    with seeded_db.application.test_request_context():
+        scans = full_scans(QUERIES[name])
+
+    assert not scans, f"'{name}' falls back to a full table scan on {', '.join(scans)}"
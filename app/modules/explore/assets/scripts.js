@@ -21,6 +21,7 @@ function send_query() {
                 query: document.querySelector('#query').value,
                 publication_type: document.querySelector('#publication_type').value,
                 sorting: document.querySelector('[name="sorting"]:checked').value,
+                min_features: document.querySelector('#min_features').value,
             };
 
             console.log(document.querySelector('#publication_type').value);
@@ -279,6 +280,9 @@ function clearFilters() {
     publicationTypeSelect.value = "any"; // replace "any" with whatever your default value is
     // publicationTypeSelect.dispatchEvent(new Event('input', {bubbles: true}));
 
+    // Reset the metrics filter
+    document.querySelector('#min_features').value = "";
+
     // Reset the sorting option
     let sortingOptions = document.querySelectorAll('[name="sorting"]');
     sortingOptions.forEach(option => {
@@ -349,6 +353,7 @@ document.addEventListener('DOMContentLoaded', () => {
         formData.append('description', document.getElementById('dataset-description').value);
         formData.append('publication_type', document.getElementById('dataset-publication-type').value);
         formData.append('tags', document.getElementById('dataset-tags').value);
+        formData.append('merge_mode', document.getElementById('dataset-merge-mode').value);
         formData.append('selected_datasets', selectedDatasetIds);
         formData.append('csrf_token', document.getElementById('csrf_token').value);
 
@@ -3,16 +3,37 @@ import re
 import unidecode
 from sqlalchemy import or_
 
-from app.modules.dataset.models import Author, DataSet, DSMetaData, PublicationType, UVLDataSet
+from app.modules.dataset.loaders import dataset_query, polymorphic_dataset
+from app.modules.dataset.models import Author, DataSet, DSMetaData, DSMetrics, PublicationType
 from app.modules.featuremodel.models import FeatureModel, FMMetaData
+from app.modules.flamapy.models import UVLFeatureIndex
+from app.modules.hubfile.models import Hubfile
+from core.database.routing import reads_from_replica
 from core.repositories.BaseRepository import BaseRepository
 
+# feature:ABS, attribute:cost, constraint:"Data Storage"
+CONTENT_TERM = re.compile(r'\b(feature|attribute|constraint):(?:"([^"]+)"|(\S+))', re.IGNORECASE)
+
 
 class ExploreRepository(BaseRepository):
     def __init__(self):
         super().__init__(DataSet)
 
-    def filter(self, query="", sorting="newest", publication_type="any", tags=[], **kwargs):
+    @reads_from_replica
+    def filter(
+        self,
+        query="",
+        sorting="newest",
+        publication_type="any",
+        tags=[],
+        min_features=None,
+        max_features=None,
+        **kwargs,
+    ):
+        # Términos sobre el contenido de los UVL (índice de features); el resto es búsqueda libre
+        content_terms = [(kind.lower(), quoted or plain) for kind, quoted, plain in CONTENT_TERM.findall(query or "")]
+        query = CONTENT_TERM.sub(" ", query or "")
+
         # Normalize and remove unwanted characters
         normalized_query = unidecode.unidecode(query).lower()
         cleaned_query = re.sub(r'[,.":\'()\[\]^;!¡¿?]', "", normalized_query)
@@ -31,17 +52,28 @@ class ExploreRepository(BaseRepository):
             filters.append(FMMetaData.tags.ilike(f"%{word}%"))
             filters.append(DSMetaData.tags.ilike(f"%{word}%"))
 
+        # uvl_dataset ya viene unido por la carga polimórfica; sus feature models cuelgan del mismo id
         datasets = (
-            self.model.query.join(DataSet.ds_meta_data)
+            dataset_query("api")
+            .join(polymorphic_dataset().ds_meta_data)
             .outerjoin(DSMetaData.authors)
-            .outerjoin(UVLDataSet, DataSet.id == UVLDataSet.id)
-            .outerjoin(FeatureModel, UVLDataSet.id == FeatureModel.uvl_dataset_id)
+            .outerjoin(DSMetrics, DSMetaData.ds_metrics_id == DSMetrics.id)
+            .outerjoin(FeatureModel, DataSet.id == FeatureModel.uvl_dataset_id)
             .outerjoin(FMMetaData)
         )
 
         if filters:
             datasets = datasets.filter(or_(*filters))
 
+        for kind, name in content_terms:
+            matching_datasets = (
+                FeatureModel.query.with_entities(FeatureModel.uvl_dataset_id)
+                .join(Hubfile, Hubfile.feature_model_id == FeatureModel.id)
+                .join(UVLFeatureIndex, UVLFeatureIndex.hubfile_id == Hubfile.id)
+                .filter(UVLFeatureIndex.kind == kind, UVLFeatureIndex.name == name)
+            )
+            datasets = datasets.filter(DataSet.id.in_(matching_datasets))
+
         datasets = datasets.distinct(DataSet.id)
 
         if publication_type != "any":
@@ -61,8 +93,18 @@ class ExploreRepository(BaseRepository):
             if tag_filters:
                 datasets = datasets.filter(or_(*tag_filters))
 
+        # Filtros por métricas precalculadas (DSMetrics)
+        if min_features is not None:
+            datasets = datasets.filter(DSMetrics.number_of_features >= min_features)
+        if max_features is not None:
+            datasets = datasets.filter(DSMetrics.number_of_features <= max_features)
+
         if sorting == "oldest":
             datasets = datasets.order_by(self.model.created_at.asc())
+        elif sorting == "most_features":
+            datasets = datasets.order_by(DSMetrics.number_of_features.desc(), self.model.created_at.desc())
+        elif sorting == "most_configurations":
+            datasets = datasets.order_by(DSMetrics.number_of_configurations.desc(), self.model.created_at.desc())
         else:
             datasets = datasets.order_by(self.model.created_at.desc())
 
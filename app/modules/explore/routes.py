@@ -13,6 +13,13 @@ logger = logging.getLogger(__name__)
 dataset_service = DataSetService()
 
 
+def _optional_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
 @explore_bp.route("/explore", methods=["GET", "POST"])
 def index():
     if request.method == "GET":
@@ -30,6 +37,8 @@ def index():
             sorting=criteria.get("sorting", "newest"),
             publication_type=criteria.get("publication_type", "any"),
             tags=criteria.get("tags", []),
+            min_features=_optional_int(criteria.get("min_features")),
+            max_features=_optional_int(criteria.get("max_features")),
             include_unsynchronized=True,
         )
         return jsonify([dataset.to_dict() for dataset in datasets])
@@ -44,6 +53,7 @@ def create_dataset_from_cart():
         publication_type = request.form.get("publication_type")
         tags = request.form.get("tags")
         selected_datasets = request.form.get("selected_datasets", "")
+        merge_mode = request.form.get("merge_mode") or None
 
         # Convertir string de IDs a lista
         source_dataset_ids = [int(id.strip()) for id in selected_datasets.split(",") if id.strip()]
@@ -55,6 +65,7 @@ def create_dataset_from_cart():
             publication_type=publication_type,
             tags=tags,
             source_dataset_ids=source_dataset_ids,
+            merge_mode=merge_mode,
         )
 
         return jsonify(
@@ -4,7 +4,7 @@ import pytest
 
 from app import db
 from app.modules.auth.models import User, UserSession
-from app.modules.dataset.models import DataSet, DSMetaData, PublicationType
+from app.modules.dataset.models import DataSet, DSMetaData, DSMetrics, PublicationType
 
 
 def force_login(client, user_id):
@@ -136,3 +136,32 @@ def test_session_cart_persistence(test_client):
     with test_client.session_transaction() as sess:
         assert 103 in sess["cart"]
         assert len(sess["cart"]) == 3
+
+
+def test_explore_sorts_and_filters_by_metrics(test_client):
+    user = User(email="metrics@example.com", password="1234")
+    db.session.add(user)
+    db.session.commit()
+
+    datasets = []
+    for title, features in (("Small FM", 10), ("Big FM", 80)):
+        meta = DSMetaData(title=title, description="d", publication_type=PublicationType.NONE)
+        meta.ds_metrics = DSMetrics(number_of_models=1, number_of_features=features)
+        db.session.add(meta)
+        db.session.commit()
+        datasets.append(DataSet(user_id=user.id, ds_meta_data_id=meta.id))
+    db.session.add_all(datasets)
+    db.session.commit()
+
+    try:
+        response = test_client.post("/explore", json={"query": "FM", "sorting": "most_features"})
+        assert [item["title"] for item in response.get_json()] == ["Big FM", "Small FM"]
+        assert response.get_json()[0]["metrics"]["number_of_features"] == 80
+
+        response = test_client.post("/explore", json={"query": "FM", "min_features": "50"})
+        assert [item["title"] for item in response.get_json()] == ["Big FM"]
+    finally:
+        for dataset in datasets:
+            db.session.delete(dataset)
+        db.session.delete(user)
+        db.session.commit()
@@ -39,5 +39,28 @@ class FMMetrics(db.Model):
     solver = db.Column(db.Text)
     not_solver = db.Column(db.Text)
 
+    # --- Métricas calculadas por el análisis con flamapy ---
+    number_of_features = db.Column(db.Integer)
+    number_of_constraints = db.Column(db.Integer)
+    tree_depth = db.Column(db.Integer)
+    core_features = db.Column(db.Integer)
+    dead_features = db.Column(db.Integer)
+    # Float: el número de configuraciones crece exponencialmente y no cabe en un entero
+    number_of_configurations = db.Column(db.Float)
+    analysis_status = db.Column(db.String(20))
+    analysis_errors = db.Column(db.JSON)
+    analyzed_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "number_of_features": self.number_of_features,
+            "number_of_constraints": self.number_of_constraints,
+            "tree_depth": self.tree_depth,
+            "core_features": self.core_features,
+            "dead_features": self.dead_features,
+            "number_of_configurations": self.number_of_configurations,
+            "analysis_status": self.analysis_status,
+        }
+
     def __repr__(self):
-        return f"FMMetrics<solver={self.solver}, not_solver={self.not_solver}>"
+        return f"FMMetrics<features={self.number_of_features}, status={self.analysis_status}>"
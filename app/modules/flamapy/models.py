@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+from app import db
+
+
+class UVLValidation(db.Model):
+    """
+    Resultado de validar sintácticamente un UVL. Se indexa por checksum (mismo contenido, mismo
+    resultado) y se guarda la versión del validador para recalcularlo solo si esta cambia.
+    """
+
+    __tablename__ = "uvl_validation"
+
+    id = db.Column(db.Integer, primary_key=True)
+    checksum = db.Column(db.String(120), nullable=False, unique=True)
+    validator_version = db.Column(db.String(50), nullable=False)
+    valid = db.Column(db.Boolean, nullable=False)
+    errors = db.Column(db.JSON, nullable=True)
+    parse_time_ms = db.Column(db.Float, nullable=True)
+    validated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        return {
+            "valid": self.valid,
+            "errors": self.errors or [],
+            "parse_time_ms": self.parse_time_ms,
+            "validator_version": self.validator_version,
+        }
+
+    def __repr__(self):
+        return f"UVLValidation<{self.checksum}, valid={self.valid}>"
+
+
+class UVLFeatureIndex(db.Model):
+    """
+    Índice de los nombres que aparecen dentro de cada UVL: features, atributos e identificadores
+    usados en las restricciones. Permite buscar modelos por contenido sin leer los ficheros.
+    """
+
+    __tablename__ = "uvl_feature_index"
+    __table_args__ = (
+        db.UniqueConstraint("hubfile_id", "kind", "name", name="uq_uvl_feature_index_entry"),
+        db.Index("ix_uvl_feature_index_kind_name", "kind", "name"),
+    )
+
+    KINDS = ("feature", "attribute", "constraint")
+
+    id = db.Column(db.Integer, primary_key=True)
+    hubfile_id = db.Column(db.Integer, db.ForeignKey("file.id", ondelete="CASCADE"), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+
+    hubfile = db.relationship(
+        "Hubfile", backref=db.backref("feature_index", lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    )
+
+    def __repr__(self):
+        return f"UVLFeatureIndex<{self.kind}:{self.name} -> {self.hubfile_id}>"
@@ -1,7 +1,47 @@
-from app.modules.flamapy.models import Flamapy
+from app.modules.flamapy.models import UVLFeatureIndex, UVLValidation
 from core.repositories.BaseRepository import BaseRepository
 
 
-class FlamapyRepository(BaseRepository):
+class UVLValidationRepository(BaseRepository):
     def __init__(self):
-        super().__init__(Flamapy)
+        super().__init__(UVLValidation)
+
+    def get_by_checksums(self, checksums) -> dict:
+        checksums = set(checksums)
+        if not checksums:
+            return {}
+        records = self.model.query.filter(self.model.checksum.in_(checksums)).all()
+        return {record.checksum: record for record in records}
+
+
+class UVLFeatureIndexRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(UVLFeatureIndex)
+
+    def replace_for_hubfile(self, hubfile_id: int, terms: dict, commit: bool = True):
+        """
+        Sustituye las entradas de un fichero por terms ({kind: iterable de nombres}). Los nombres se
+        deduplican sin distinguir mayúsculas, como la collation de MariaDB en la restricción única.
+        """
+        self.model.query.filter_by(hubfile_id=hubfile_id).delete(synchronize_session=False)
+        self.session.bulk_insert_mappings(
+            self.model,
+            [
+                {"hubfile_id": hubfile_id, "kind": kind, "name": name}
+                for kind, names in terms.items()
+                for name in _unique_ignoring_case(names)
+            ],
+        )
+        if commit:
+            self.session.commit()
+
+    def indexed_hubfile_ids(self) -> set:
+        return {hubfile_id for (hubfile_id,) in self.session.query(self.model.hubfile_id).distinct()}
+
+
+def _unique_ignoring_case(names) -> list:
+    # Se conserva la primera grafía de cada nombre, en orden
+    unique = {}
+    for name in sorted(names):
+        unique.setdefault(name.lower(), name)
+    return list(unique.values())
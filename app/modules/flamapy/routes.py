@@ -1,68 +1,101 @@
+import json
 import logging
-import os
-import tempfile
 
-from antlr4 import CommonTokenStream, FileStream
-from antlr4.error.ErrorListener import ErrorListener
-from flamapy.metamodels.fm_metamodel.transformations import GlencoeWriter, SPLOTWriter, UVLReader
-from flamapy.metamodels.pysat_metamodel.transformations import DimacsWriter, FmToPysat
-from flask import jsonify, send_file
-from uvl.UVLCustomLexer import UVLCustomLexer
-from uvl.UVLPythonParser import UVLPythonParser
+from flask import Response, abort, current_app, jsonify, request, send_file
 
+from app.modules.dataset.models import UVLDataSet
 from app.modules.flamapy import flamapy_bp
+from app.modules.flamapy.services import EXPORT_FORMATS, FlamapyService
 from app.modules.hubfile.services import HubfileService
+from core.jobs.compute_executor import ComputeBusyError, ComputeTimeoutError
 
 logger = logging.getLogger(__name__)
 
 
 @flamapy_bp.route("/flamapy/check_uvl/<int:file_id>", methods=["GET"])
 def check_uvl(file_id):
-    class CustomErrorListener(ErrorListener):
-        def __init__(self):
-            self.errors = []
-
-        def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-            if "\\t" in msg:
-                warning_message = (
-                    f"The UVL has the following warning that prevents reading it: " f"Line {line}:{column} - {msg}"
-                )
-                print(warning_message)
-                self.errors.append(warning_message)
-            else:
-                error_message = (
-                    f"The UVL has the following error that prevents reading it: " f"Line {line}:{column} - {msg}"
-                )
-                self.errors.append(error_message)
-
+    hubfile = HubfileService().get_or_404(file_id)
     try:
-        hubfile = HubfileService().get_by_id(file_id)
-        input_stream = FileStream(hubfile.get_path())
-        lexer = UVLCustomLexer(input_stream)
+        result = FlamapyService().get_validation(hubfile)
+    except (ComputeBusyError, ComputeTimeoutError):
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        error_listener = CustomErrorListener()
+    if not result["valid"]:
+        return jsonify({"errors": result["errors"], "parse_time_ms": result["parse_time_ms"]}), 400
 
-        lexer.removeErrorListeners()
-        lexer.addErrorListener(error_listener)
+    return jsonify({"message": "Valid Model", "parse_time_ms": result["parse_time_ms"]}), 200
 
-        stream = CommonTokenStream(lexer)
-        parser = UVLPythonParser(stream)
 
-        parser.removeErrorListeners()
-        parser.addErrorListener(error_listener)
+@flamapy_bp.route("/flamapy/check_dataset/<int:dataset_id>", methods=["GET"])
+def check_dataset(dataset_id):
+    UVLDataSet.query.get_or_404(dataset_id)
+    files = FlamapyService().check_dataset(dataset_id)
+    return jsonify(
+        {
+            "dataset_id": dataset_id,
+            "valid": all(file["valid"] for file in files),
+            "files": files,
+        }
+    )
 
-        # tree = parser.featureModel()
 
-        if error_listener.errors:
-            return jsonify({"errors": error_listener.errors}), 400
+FEATURE_TREE_MAX_DEPTH = 10
 
-        # Optional: Print the parse tree
-        # print(tree.toStringTree(recog=parser))
 
-        return jsonify({"message": "Valid Model"}), 200
+@flamapy_bp.route("/flamapy/tree/<int:file_id>", methods=["GET"])
+def feature_tree(file_id):
+    hubfile = HubfileService().get_or_404(file_id)
+    node = request.args.get("node")
+    depth = request.args.get("depth", 1, type=int)
+    if depth is None or not 0 <= depth <= FEATURE_TREE_MAX_DEPTH:
+        abort(400, description=f"depth must be between 0 and {FEATURE_TREE_MAX_DEPTH}")
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    tree = FlamapyService().get_feature_tree(hubfile, node, depth)
+    if tree is None:
+        return jsonify({"error": f"Feature '{node}' not found"}), 404
+    return jsonify({"file_id": file_id, "node": tree})
+
+
+@flamapy_bp.route("/flamapy/diff/<int:file_a>/<int:file_b>", methods=["GET"])
+def diff(file_a, file_b):
+    hubfile_service = HubfileService()
+    hubfile_a = hubfile_service.get_or_404(file_a)
+    hubfile_b = hubfile_service.get_or_404(file_b)
+    return jsonify({"file_a": file_a, "file_b": file_b, **FlamapyService().diff(hubfile_a, hubfile_b)})
+
+
+@flamapy_bp.route("/flamapy/count/<int:file_id>", methods=["GET"])
+def count_configurations(file_id):
+    hubfile = HubfileService().get_or_404(file_id)
+    return jsonify({"file_id": file_id, "configurations": FlamapyService().count_configurations(hubfile)})
+
+
+@flamapy_bp.route("/flamapy/sample/<int:file_id>", methods=["GET"])
+def sample_configurations(file_id):
+    """Muestra aleatoria uniforme de configuraciones, una por línea (NDJSON)."""
+    hubfile = HubfileService().get_or_404(file_id)
+    size = request.args.get("size", 10, type=int)
+    seed = request.args.get("seed", type=int)
+    with_replacement = request.args.get("replacement", "false").lower() == "true"
+
+    max_size = current_app.config.get("FLAMAPY_MAX_SAMPLE_SIZE", 10000)
+    if size is None or not 0 < size <= max_size:
+        abort(400, description=f"size must be between 1 and {max_size}")
+
+    configurations = FlamapyService().sample_configurations(hubfile, size, with_replacement, seed)
+
+    def generate():
+        try:
+            for configuration in configurations:
+                yield json.dumps({"features": configuration}) + "\n"
+        except Exception as e:
+            # Las cabeceras ya se han enviado: el error viaja como última línea
+            logger.warning(f"Sampling of file {file_id} stopped: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
 
 
 @flamapy_bp.route("/flamapy/valid/<int:file_id>", methods=["GET"])
@@ -70,47 +103,52 @@ def valid(file_id):
     return jsonify({"success": True, "file_id": file_id})
 
 
+def _send_export(file_id, export_format):
+    hubfile = HubfileService().get_or_404(file_id)
+    path, etag = FlamapyService().export(hubfile, export_format)
+
+    response = send_file(
+        path,
+        as_attachment=True,
+        download_name=f"{hubfile.name}{EXPORT_FORMATS[export_format]}",
+        mimetype="text/plain",
+        etag=etag,
+        conditional=True,
+    )
+    response.cache_control.no_cache = True
+    return response
+
+
 @flamapy_bp.route("/flamapy/to_glencoe/<int:file_id>", methods=["GET"])
 def to_glencoe(file_id):
-    temp_file = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
-    try:
-        hubfile = HubfileService().get_or_404(file_id)
-        fm = UVLReader(hubfile.get_path()).transform()
-        GlencoeWriter(temp_file.name, fm).transform()
-
-        # Return the file in the response
-        return send_file(temp_file.name, as_attachment=True, download_name=f"{hubfile.name}_glencoe.txt")
-    finally:
-        # Clean up the temporary file
-        os.remove(temp_file.name)
+    return _send_export(file_id, "glencoe")
 
 
 @flamapy_bp.route("/flamapy/to_splot/<int:file_id>", methods=["GET"])
 def to_splot(file_id):
-    temp_file = tempfile.NamedTemporaryFile(suffix=".splx", delete=False)
-    try:
-        hubfile = HubfileService().get_by_id(file_id)
-        fm = UVLReader(hubfile.get_path()).transform()
-        SPLOTWriter(temp_file.name, fm).transform()
-
-        # Return the file in the response
-        return send_file(temp_file.name, as_attachment=True, download_name=f"{hubfile.name}_splot.txt")
-    finally:
-        # Clean up the temporary file
-        os.remove(temp_file.name)
+    return _send_export(file_id, "splot")
 
 
 @flamapy_bp.route("/flamapy/to_cnf/<int:file_id>", methods=["GET"])
 def to_cnf(file_id):
-    temp_file = tempfile.NamedTemporaryFile(suffix=".cnf", delete=False)
-    try:
-        hubfile = HubfileService().get_by_id(file_id)
-        fm = UVLReader(hubfile.get_path()).transform()
-        sat = FmToPysat(fm).transform()
-        DimacsWriter(temp_file.name, sat).transform()
-
-        # Return the file in the response
-        return send_file(temp_file.name, as_attachment=True, download_name=f"{hubfile.name}_cnf.txt")
-    finally:
-        # Clean up the temporary file
-        os.remove(temp_file.name)
+    return _send_export(file_id, "cnf")
+
+
+@flamapy_bp.route("/flamapy/dataset/<int:dataset_id>/export", methods=["GET"])
+def export_dataset(dataset_id):
+    UVLDataSet.query.get_or_404(dataset_id)
+    export_format = request.args.get("format", "cnf")
+    if export_format not in EXPORT_FORMATS:
+        abort(400, description=f"Unknown export format '{export_format}'")
+
+    path, etag = FlamapyService().export_dataset(dataset_id, export_format)
+    response = send_file(
+        path,
+        as_attachment=True,
+        download_name=f"dataset_{dataset_id}_{export_format}.zip",
+        mimetype="application/zip",
+        etag=etag,
+        conditional=True,
+    )
+    response.cache_control.no_cache = True
+    return response
@@ -1,7 +1,717 @@
-from app.modules.flamapy.repositories import FlamapyRepository
+import hashlib
+import logging
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from antlr4 import CommonTokenStream, FileStream
+from antlr4.error.ErrorListener import ErrorListener
+from flamapy.metamodels.bdd_metamodel.operations import BDDConfigurations, BDDConfigurationsNumber
+from flamapy.metamodels.bdd_metamodel.operations.bdd_sampling import random_configuration
+from flamapy.metamodels.bdd_metamodel.transformations import FmToBDD
+from flamapy.metamodels.fm_metamodel.operations import FMMaxDepthTree
+from flamapy.metamodels.fm_metamodel.transformations import GlencoeWriter, SPLOTWriter, UVLReader
+from flamapy.metamodels.pysat_metamodel.operations import PySATCoreFeatures, PySATDeadFeatures
+from flamapy.metamodels.pysat_metamodel.transformations import DimacsWriter, FmToPysat
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from uvl.UVLCustomLexer import UVLCustomLexer
+from uvl.UVLPythonParser import UVLPythonParser
+
+from app.modules.dataset.models import DSMetrics, UVLDataSet
+from app.modules.dataset.repositories import DataSetRepository
+from app.modules.featuremodel.models import FMMetrics
+from app.modules.flamapy.models import UVLValidation
+from app.modules.flamapy.repositories import UVLFeatureIndexRepository, UVLValidationRepository
+from app.modules.hubfile.repositories import HubfileRepository
+from app.modules.hubfile.services import HubfileService
+from core.caches.file_store import file_store
+from core.caches.model_cache import model_cache
+from core.jobs.compute_executor import ComputeTimeoutError, compute_executor
 from core.services.BaseService import BaseService
 
+try:
+    FLAMAPY_VERSION = version("flamapy-fw")
+except PackageNotFoundError:
+    FLAMAPY_VERSION = "unknown"
+
+try:
+    UVL_PARSER_VERSION = version("uvlparser")
+except PackageNotFoundError:
+    UVL_PARSER_VERSION = "unknown"
+
+# Si cambia (nueva versión del parser o de validate_uvl) las validaciones guardadas se recalculan
+VALIDATOR_VERSION = f"1/uvlparser-{UVL_PARSER_VERSION}"
+
+logger = logging.getLogger(__name__)
+
+# Configuraciones generadas por cada tarea del ComputeExecutor al muestrear
+SAMPLE_CHUNK_SIZE = 500
+# Sin reemplazo: desde esta fracción del total se enumeran todas las configuraciones en vez de descartar
+# repetidas, y como mucho se generan SAMPLE_MAX_DRAWS configuraciones por cada una pedida
+SAMPLE_ENUMERATE_FRACTION = 0.5
+SAMPLE_MAX_DRAWS = 10
+
+# Datasets leídos por consulta en los backfills (uvl:validate, uvl:index)
+BACKFILL_BATCH_SIZE = 200
+
+# formato -> sufijo del nombre de descarga
+EXPORT_FORMATS = {
+    "glencoe": "_glencoe.txt",
+    "splot": "_splot.txt",
+    "cnf": "_cnf.txt",
+}
+
+
+class UVLErrorListener(ErrorListener):
+    def __init__(self):
+        self.errors = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        if "\\t" in msg:
+            self.errors.append(
+                f"The UVL has the following warning that prevents reading it: " f"Line {line}:{column} - {msg}"
+            )
+        else:
+            self.errors.append(
+                f"The UVL has the following error that prevents reading it: " f"Line {line}:{column} - {msg}"
+            )
+
+
+def validate_uvl(path: str) -> list:
+    """
+    Analiza léxica y sintácticamente el UVL y devuelve la lista de errores (vacía si es válido).
+    Es una función de módulo para poder ejecutarla en un pool de procesos.
+    """
+    try:
+        input_stream = FileStream(path, encoding="utf-8")
+    except OSError as exc:
+        return [f"Could not read the UVL file: {exc.strerror}"]
+
+    error_listener = UVLErrorListener()
+
+    lexer = UVLCustomLexer(input_stream)
+    lexer.removeErrorListeners()
+    lexer.addErrorListener(error_listener)
+
+    parser = UVLPythonParser(CommonTokenStream(lexer))
+    parser.removeErrorListeners()
+    parser.addErrorListener(error_listener)
+    parser.featureModel()
+
+    return error_listener.errors
+
+
+def _timed_validate_many(paths: list) -> list:
+    results = []
+    for path in paths:
+        start = time.perf_counter()
+        errors = validate_uvl(path)
+        results.append((errors, (time.perf_counter() - start) * 1000))
+    return results
+
+
+def _read_uvl(path: str):
+    return UVLReader(path).transform()
+
+
+def _relation_type(relation) -> str:
+    if relation.is_mandatory():
+        return "mandatory"
+    if relation.is_optional():
+        return "optional"
+    if relation.is_alternative():
+        return "alternative"
+    if relation.is_or():
+        return "or"
+    if relation.is_mutex():
+        return "mutex"
+    return "cardinality"
+
+
+def _attribute_value(value):
+    return value if value is None or isinstance(value, (bool, int, float, str)) else str(value)
+
+
+def feature_subtree(feature, depth: int, relation=None) -> dict:
+    """
+    Nodo JSON de una feature. Los hijos solo se incluyen hasta `depth` niveles; un nodo sin la
+    clave "children" pero con children_count > 0 se puede expandir con otra petición.
+    """
+    node = {
+        "name": feature.name,
+        "abstract": feature.is_abstract,
+        "relation": _relation_type(relation) if relation else None,
+        "children_count": len(feature.get_children()),
+        "attributes": {
+            attribute.get_name(): _attribute_value(attribute.get_default_value())
+            for attribute in feature.get_attributes()
+        },
+    }
+    if relation is not None and relation.is_cardinal():
+        node["cardinality"] = [relation.card_min, relation.card_max]
+    if depth > 0:
+        node["children"] = [
+            feature_subtree(child, depth - 1, child_relation)
+            for child_relation in feature.get_relations()
+            for child in child_relation.children
+        ]
+    return node
+
+
+def _relation_index(fm) -> dict:
+    """{nombre de feature: (nombre del padre, tipo de relación con él)} en un único recorrido."""
+    index = {fm.root.name: (None, None)}
+    for feature in fm.get_features():
+        for relation in feature.get_relations():
+            relation_type = _relation_type(relation)
+            if relation.is_cardinal():
+                relation_type = f"cardinality[{relation.card_min},{relation.card_max}]"
+            for child in relation.children:
+                index[child.name] = (feature.name, relation_type)
+    return index
+
+
+def diff_feature_models(fm_a, fm_b) -> dict:
+    """
+    Diferencias estructurales de fm_a a fm_b: features añadidas, eliminadas o movidas (cambio de
+    padre), cambios del tipo de relación con el padre y restricciones añadidas o eliminadas.
+    Las features se comparan por nombre con índices hash, así que el coste es lineal.
+    """
+    index_a, index_b = _relation_index(fm_a), _relation_index(fm_b)
+    common = [name for name in index_a if name in index_b]
+
+    moved, relations = [], []
+    for name in common:
+        (parent_a, relation_a), (parent_b, relation_b) = index_a[name], index_b[name]
+        if parent_a != parent_b:
+            moved.append({"name": name, "from": parent_a, "to": parent_b})
+        if relation_a != relation_b:
+            relations.append({"name": name, "from": relation_a, "to": relation_b})
+
+    constraints_a = Counter(constraint.ast.pretty_str() for constraint in fm_a.get_constraints())
+    constraints_b = Counter(constraint.ast.pretty_str() for constraint in fm_b.get_constraints())
+
+    diff = {
+        "features": {
+            "added": sorted(name for name in index_b if name not in index_a),
+            "removed": sorted(name for name in index_a if name not in index_b),
+            "moved": moved,
+        },
+        "relations": relations,
+        "constraints": {
+            "added": sorted((constraints_b - constraints_a).elements()),
+            "removed": sorted((constraints_a - constraints_b).elements()),
+        },
+    }
+    diff["identical"] = not (
+        diff["features"]["added"]
+        or diff["features"]["removed"]
+        or moved
+        or relations
+        or diff["constraints"]["added"]
+        or diff["constraints"]["removed"]
+    )
+    return diff
+
+
+# ==========================================
+# Análisis de modelos: cada operación se ejecuta en el ComputeExecutor con su límite de tiempo
+# ==========================================
+def _structure_metrics(path: str) -> dict:
+    fm = UVLReader(path).transform()
+    return {
+        "number_of_features": len(fm.get_features()),
+        "number_of_constraints": len(fm.get_constraints()),
+        "tree_depth": FMMaxDepthTree().execute(fm).get_result(),
+    }
+
+
+def _sat_metrics(path: str) -> dict:
+    sat = FmToPysat(UVLReader(path).transform()).transform()
+    return {
+        "core_features": len(PySATCoreFeatures().execute(sat).get_result()),
+        "dead_features": len(PySATDeadFeatures().execute(sat).get_result()),
+    }
+
+
+def _bdd_metrics(path: str) -> dict:
+    bdd = FmToBDD(UVLReader(path).transform()).transform()
+    return {"number_of_configurations": float(BDDConfigurationsNumber().execute(bdd).get_result())}
+
+
+ANALYSIS_OPERATIONS = (
+    ("structure", _structure_metrics),
+    ("sat", _sat_metrics),
+    ("bdd", _bdd_metrics),
+)
+
+
+def analyze_uvl(path: str, timeout: float) -> tuple:
+    """
+    Devuelve (métricas, errores). Cada operación tiene su propio límite de tiempo, así que un
+    BDD que no termina no impide guardar el resto de métricas.
+    """
+    metrics, errors = {}, {}
+    for name, operation in ANALYSIS_OPERATIONS:
+        try:
+            metrics.update(compute_executor.run(operation, path, timeout=timeout, wait=float("inf")))
+        except Exception as exc:
+            errors[name] = str(exc)
+    return metrics, errors
+
 
 class FlamapyService(BaseService):
+    """
+    Acceso a los modelos de flamapy de un Hubfile. Los modelos se cachean por checksum del
+    fichero y versión de flamapy, así que un mismo UVL solo se parsea/transforma una vez.
+    """
+
     def __init__(self):
-        super().__init__(FlamapyRepository())
+        super().__init__(HubfileRepository())
+        self.hubfile_service = HubfileService()
+        self.dataset_repository = DataSetRepository()
+        self.validation_repository = UVLValidationRepository()
+        self.feature_index_repository = UVLFeatureIndexRepository()
+        self.cache = model_cache
+        self.file_store = file_store
+        self.compute = compute_executor
+
+    def _run_validations(self, paths: list, wait: float = None) -> list:
+        """
+        Reparte los ficheros en lotes según los procesos de cálculo libres y los valida en paralelo
+        (el parser de ANTLR es Python puro y consume CPU).
+        """
+        return self.compute.map_chunks(_timed_validate_many, paths, wait=wait)
+
+    def validate_files(self, files: list, force: bool = False, wait: float = None) -> dict:
+        """
+        Devuelve {checksum: UVLValidation} para los (hubfile, ruta) recibidos. Solo se analizan
+        los ficheros sin resultado guardado o validados con otra versión del validador.
+        Los ficheros que no están en disco no se validan (ni se guarda nada para ellos).
+        """
+        records = self.validation_repository.get_by_checksums(hubfile.checksum for hubfile, _ in files)
+
+        pending = {}
+        for hubfile, path in files:
+            record = records.get(hubfile.checksum)
+            outdated = record is None or record.validator_version != VALIDATOR_VERSION
+            if (force or outdated) and os.path.exists(path):
+                pending.setdefault(hubfile.checksum, path)
+
+        if not pending:
+            return records
+
+        results = self._run_validations(list(pending.values()), wait=wait)
+        for checksum, (errors, parse_time_ms) in zip(pending, results):
+            record = records.get(checksum) or UVLValidation(checksum=checksum)
+            record.validator_version = VALIDATOR_VERSION
+            record.valid = not errors
+            record.errors = errors
+            record.parse_time_ms = parse_time_ms
+            record.validated_at = datetime.now(timezone.utc)
+            self.validation_repository.session.add(record)
+            records[checksum] = record
+
+        try:
+            self.validation_repository.session.commit()
+        except IntegrityError:
+            # Otro worker ha guardado el mismo checksum a la vez: nos quedamos con el suyo
+            self.validation_repository.session.rollback()
+            records = self.validation_repository.get_by_checksums(hubfile.checksum for hubfile, _ in files)
+
+        return records
+
+    @staticmethod
+    def _validation_result(hubfile, record) -> dict:
+        result = {"file_id": hubfile.id, "name": hubfile.name}
+        if record is None:
+            result.update({"valid": False, "errors": ["UVL file not found on disk"], "parse_time_ms": None})
+        else:
+            result.update(record.to_dict())
+        return result
+
+    def get_validation(self, hubfile) -> dict:
+        record = self.validation_repository.get_by_checksums([hubfile.checksum]).get(hubfile.checksum)
+        if record is None or record.validator_version != VALIDATOR_VERSION:
+            record = self.validate_files([(hubfile, hubfile.get_path())]).get(hubfile.checksum)
+        return self._validation_result(hubfile, record)
+
+    def check_dataset(self, dataset_id: int, wait: float = None) -> list:
+        """
+        Resultado de validación de todos los UVL de un dataset: las rutas se resuelven con una
+        única consulta y solo se analizan (en paralelo) los ficheros sin resultado guardado.
+        """
+        files = self.hubfile_service.get_paths_by_dataset(dataset_id)
+        records = self.validate_files(files, wait=wait)
+        return [self._validation_result(hubfile, records.get(hubfile.checksum)) for hubfile, _ in files]
+
+    def validate_dataset(self, dataset_id: int):
+        """Job lanzado tras la subida de un dataset UVL."""
+        self.check_dataset(dataset_id, wait=float("inf"))
+
+    def _uvl_dataset_ids(self):
+        # Los backfills recorren todos los datasets: se leen por lotes y pueden hacer commit entre lotes
+        query = UVLDataSet.query.with_entities(UVLDataSet.id)
+        for batch in self.dataset_repository.iter_batches(BACKFILL_BATCH_SIZE, query=query):
+            for (dataset_id,) in batch:
+                yield dataset_id
+
+    def backfill_validations(self, force: bool = False) -> int:
+        validated = 0
+        for dataset_id in self._uvl_dataset_ids():
+            files = self.hubfile_service.get_paths_by_dataset(dataset_id)
+            validated += len(self.validate_files(files, force=force, wait=float("inf")))
+        return validated
+
+    def _index_terms(self, checksum: str, uvl_path: str) -> dict:
+        # Se ejecuta en el ComputeExecutor, reutilizando el modelo cacheado en disco si existe
+        fm = self._feature_model(checksum, lambda: uvl_path)
+        features = fm.get_features()
+        terms = {
+            "feature": [feature.name for feature in features],
+            "attribute": [attribute.get_name() for feature in features for attribute in feature.get_attributes()],
+            "constraint": [name for constraint in fm.get_constraints() for name in constraint.get_features()],
+        }
+        return {kind: [name for name in names if len(name) <= 255] for kind, names in terms.items()}
+
+    def index_files(self, files: list) -> int:
+        """
+        Indexa los nombres de features, atributos y restricciones de los (hubfile, ruta) recibidos.
+        Los ficheros que no existen, no se pueden parsear o no se pueden guardar se quedan sin entradas.
+        """
+        session = self.feature_index_repository.session
+        indexed = 0
+        for hubfile, path in files:
+            if not os.path.exists(path):
+                continue
+            hubfile_id = hubfile.id
+            try:
+                terms = self.compute.run(self._index_terms, hubfile.checksum, path, wait=float("inf"))
+                # Cada fichero en su savepoint: uno que falle al insertar no tumba el lote
+                with session.begin_nested():
+                    self.feature_index_repository.replace_for_hubfile(hubfile_id, terms, commit=False)
+            except Exception as exc:
+                logger.warning(f"Could not index UVL file {hubfile_id}: {exc}")
+                continue
+            indexed += 1
+        session.commit()
+        return indexed
+
+    def index_dataset(self, dataset_id: int):
+        """Job lanzado tras la subida de un dataset UVL."""
+        self.index_files(self.hubfile_service.get_paths_by_dataset(dataset_id))
+
+    def backfill_feature_index(self, force: bool = False) -> int:
+        indexed_ids = set() if force else self.feature_index_repository.indexed_hubfile_ids()
+        indexed = 0
+        for dataset_id in self._uvl_dataset_ids():
+            files = self.hubfile_service.get_paths_by_dataset(dataset_id)
+            indexed += self.index_files([(hubfile, path) for hubfile, path in files if hubfile.id not in indexed_ids])
+        return indexed
+
+    def analyze_dataset(self, dataset_id: int):
+        """
+        Job lanzado tras la subida de un dataset UVL: analiza cada modelo, guarda sus FMMetrics
+        y actualiza las métricas agregadas del dataset.
+        """
+        timeout = current_app.config.get("FLAMAPY_ANALYSIS_TIMEOUT", 60)
+        session = self.repository.session
+
+        for hubfile, path in self.hubfile_service.get_paths_by_dataset(dataset_id):
+            fm_meta_data = hubfile.feature_model.fm_meta_data
+            if fm_meta_data is None:
+                continue
+
+            metrics, errors = analyze_uvl(path, timeout)
+            if errors:
+                logger.warning(f"Analysis of file {hubfile.id} incomplete: {errors}")
+
+            fm_metrics = fm_meta_data.fm_metrics or FMMetrics()
+            for name, value in metrics.items():
+                setattr(fm_metrics, name, value)
+            fm_metrics.analysis_status = "failed" if not metrics else "partial" if errors else "done"
+            fm_metrics.analysis_errors = errors or None
+            fm_metrics.analyzed_at = datetime.now(timezone.utc)
+            fm_meta_data.fm_metrics = fm_metrics
+            session.commit()
+
+        self.update_dataset_metrics(dataset_id)
+
+    def update_dataset_metrics(self, dataset_id: int):
+        dataset = UVLDataSet.query.get(dataset_id)
+        if dataset is None:
+            return
+
+        fm_metrics = [
+            fm.fm_meta_data.fm_metrics
+            for fm in dataset.feature_models
+            if fm.fm_meta_data is not None and fm.fm_meta_data.fm_metrics is not None
+        ]
+
+        def total(name):
+            values = [getattr(metrics, name) for metrics in fm_metrics if getattr(metrics, name) is not None]
+            return sum(values) if values else None
+
+        ds_meta_data = dataset.ds_meta_data
+        ds_metrics = ds_meta_data.ds_metrics or DSMetrics()
+        ds_metrics.number_of_models = len(dataset.feature_models)
+        ds_metrics.number_of_features = total("number_of_features")
+        ds_metrics.number_of_constraints = total("number_of_constraints")
+        ds_metrics.number_of_configurations = total("number_of_configurations")
+        depths = [metrics.tree_depth for metrics in fm_metrics if metrics.tree_depth is not None]
+        ds_metrics.max_tree_depth = max(depths) if depths else None
+        ds_meta_data.ds_metrics = ds_metrics
+        self.repository.session.commit()
+
+    def _cache_key(self, kind: str, checksum: str) -> str:
+        return f"{kind}:{checksum}:{FLAMAPY_VERSION}"
+
+    def _feature_model(self, checksum: str, get_path):
+        return self.cache.get_or_compute(self._cache_key("fm", checksum), lambda: UVLReader(get_path()).transform())
+
+    def _sat_model(self, checksum: str, get_path):
+        return self.cache.get_or_compute(
+            self._cache_key("sat", checksum), lambda: FmToPysat(self._feature_model(checksum, get_path)).transform()
+        )
+
+    def _bdd_model(self, checksum: str, get_path):
+        return self.cache.get_or_compute(
+            self._cache_key("bdd", checksum), lambda: FmToBDD(self._feature_model(checksum, get_path)).transform()
+        )
+
+    def get_feature_model(self, hubfile):
+        return self._feature_model(hubfile.checksum, hubfile.get_path)
+
+    def get_sat_model(self, hubfile):
+        return self._sat_model(hubfile.checksum, hubfile.get_path)
+
+    def get_bdd_model(self, hubfile):
+        return self._bdd_model(hubfile.checksum, hubfile.get_path)
+
+    def _cached_feature_model(self, hubfile):
+        # Si no está en caché se parsea en el ComputeExecutor y el modelo se cachea en este proceso
+        return self.cache.get_or_compute(
+            self._cache_key("fm", hubfile.checksum), lambda: self.compute.run(_read_uvl, hubfile.get_path())
+        )
+
+    def diff(self, hubfile_a, hubfile_b) -> dict:
+        return diff_feature_models(self._cached_feature_model(hubfile_a), self._cached_feature_model(hubfile_b))
+
+    def get_feature_tree(self, hubfile, node: str = None, depth: int = 1):
+        """
+        Subárbol JSON a partir de la feature `node` (la raíz por defecto), o None si no existe.
+        Las expansiones siguientes reutilizan el modelo cacheado, sin volver a leer el fichero.
+        """
+        fm = self._cached_feature_model(hubfile)
+        feature = fm.root if node is None else fm.get_feature_by_name(node)
+        if feature is None:
+            return None
+
+        parent = feature.get_parent()
+        relation = None
+        if parent is not None:
+            relation = next(r for r in parent.get_relations() if feature in r.children)
+        return feature_subtree(feature, depth, relation)
+
+    def _count_configurations(self, checksum: str, uvl_path: str) -> int:
+        # Se ejecuta en el ComputeExecutor; el BDD compilado queda en la caché de disco
+        bdd = self._bdd_model(checksum, lambda: uvl_path)
+        return int(BDDConfigurationsNumber().execute(bdd).get_result())
+
+    def _sample_chunk(self, checksum: str, uvl_path: str, size: int, seed) -> list:
+        # Tras el fork el hijo hereda el estado de random del padre: sin semilla se reinicia desde el SO
+        random.seed(seed)
+        bdd = self._bdd_model(checksum, lambda: uvl_path)
+        return [
+            sorted(str(feature) for feature in random_configuration(bdd).get_selected_elements()) for _ in range(size)
+        ]
+
+    def _sample_enumerated(self, checksum: str, uvl_path: str, size: int, seed) -> list:
+        # Muestra sin reemplazo de una fracción grande: se enumeran todas y se eligen `size` distintas
+        bdd = self._bdd_model(checksum, lambda: uvl_path)
+        configurations = BDDConfigurations().execute(bdd).get_result()
+        return [
+            sorted(str(feature) for feature in configuration.get_selected_elements())
+            for configuration in random.Random(seed).sample(configurations, size)
+        ]
+
+    def count_configurations(self, hubfile) -> int:
+        return self.compute.run(self._count_configurations, hubfile.checksum, hubfile.get_path())
+
+    def sample_configurations(self, hubfile, size: int, with_replacement: bool = False, seed: int = None):
+        """
+        Devuelve un iterador de `size` configuraciones uniformes (listas de features seleccionadas).
+        Se generan por lotes de SAMPLE_CHUNK_SIZE en el ComputeExecutor, así que una muestra grande
+        puede enviarse mientras se calcula. El primer lote se calcula antes de devolver el iterador
+        para que los errores (servidor ocupado, tiempo agotado) lleguen antes de la respuesta.
+
+        Sin reemplazo, la muestra se limita al número de configuraciones del modelo. Si pide al menos
+        SAMPLE_ENUMERATE_FRACTION de ellas, se enumeran todas y se eligen con random.sample; si no, se
+        descartan las repetidas, con un máximo de SAMPLE_MAX_DRAWS configuraciones generadas por cada
+        una pedida y FLAMAPY_SAMPLE_TIMEOUT segundos en total.
+        """
+        checksum, uvl_path = hubfile.checksum, hubfile.get_path()
+        if not with_replacement:
+            total = self.compute.run(self._count_configurations, checksum, uvl_path)
+            size = min(size, total)
+            if size and size >= total * SAMPLE_ENUMERATE_FRACTION:
+                return iter(self.compute.run(self._sample_enumerated, checksum, uvl_path, size, seed))
+
+        deadline = time.monotonic() + current_app.config.get("FLAMAPY_SAMPLE_TIMEOUT", 60)
+        max_draws = size * SAMPLE_MAX_DRAWS
+
+        def chunk(index: int, chunk_size: int) -> list:
+            chunk_seed = None if seed is None else f"{seed}:{index}"
+            return self.compute.run(self._sample_chunk, checksum, uvl_path, chunk_size, chunk_seed)
+
+        def configurations(first: list):
+            seen, pending, index, draws = set(), size, 0, len(first)
+            batch = first
+            while True:
+                for configuration in batch:
+                    if pending == 0:
+                        return
+                    if not with_replacement:
+                        key = tuple(configuration)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    pending -= 1
+                    yield configuration
+                if pending == 0:
+                    return
+                if draws >= max_draws or time.monotonic() >= deadline:
+                    raise ComputeTimeoutError(f"Sampling stopped after {size - pending} distinct configurations")
+                index += 1
+                chunk_size = min(pending, SAMPLE_CHUNK_SIZE, max_draws - draws)
+                draws += chunk_size
+                batch = chunk(index, chunk_size)
+
+        first = chunk(0, min(size, SAMPLE_CHUNK_SIZE)) if size else []
+        return configurations(first)
+
+    def _write_export(self, checksum: str, uvl_path: str, export_format: str, path: str):
+        # Se ejecuta en un proceso del ComputeExecutor: solo recibe datos, nunca toca la BD
+        def get_path():
+            return uvl_path
+
+        if export_format == "glencoe":
+            GlencoeWriter(path, self._feature_model(checksum, get_path)).transform()
+        elif export_format == "splot":
+            SPLOTWriter(path, self._feature_model(checksum, get_path)).transform()
+        elif export_format == "cnf":
+            DimacsWriter(path, self._sat_model(checksum, get_path)).transform()
+        else:
+            raise ValueError(f"Unknown export format '{export_format}'")
+
+    def export(self, hubfile, export_format: str, wait: float = None):
+        """
+        Devuelve (ruta, etag) del fichero exportado. Se genera la primera vez (en el
+        ComputeExecutor) y después se sirve desde el almacén, indexado por checksum del UVL,
+        formato y versión de flamapy.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}'")
+
+        def writer(temp_path):
+            self.compute.run(
+                self._write_export, hubfile.checksum, hubfile.get_path(), export_format, temp_path, wait=wait
+            )
+
+        key = self._cache_key(f"export-{export_format}", hubfile.checksum)
+        path = self.file_store.get_or_create(key, writer)
+        return path, self.file_store.digest(key)
+
+    def _write_exports(self, items: list, export_format: str) -> list:
+        """Convierte un lote de (checksum, ruta UVL, ruta destino); devuelve el error de cada uno o None."""
+        errors = []
+        for checksum, uvl_path, path in items:
+            try:
+                self._write_export(checksum, uvl_path, export_format, path)
+                errors.append(None)
+            except Exception as exc:
+                errors.append(f"{type(exc).__name__}: {exc}")
+        return errors
+
+    def _export_files(self, files: list, export_format: str, wait: float = None) -> dict:
+        """
+        Devuelve {checksum: ruta exportada o mensaje de error}. Las conversiones que faltan en el
+        almacén se reparten en lotes que se ejecutan en paralelo en el ComputeExecutor.
+        """
+        results, pending = {}, {}
+        for hubfile, path in files:
+            key = self._cache_key(f"export-{export_format}", hubfile.checksum)
+            stored = self.file_store.get(key)
+            if stored:
+                results[hubfile.checksum] = stored
+            elif hubfile.checksum not in pending:
+                pending[hubfile.checksum] = (hubfile.checksum, path, self.file_store.temp_path_for(key))
+
+        if not pending:
+            return results
+
+        items = list(pending.values())
+        try:
+            errors = self.compute.map_chunks(self._write_exports, items, export_format, wait=wait)
+            for (checksum, _, temp_path), error in zip(items, errors):
+                key = self._cache_key(f"export-{export_format}", checksum)
+                results[checksum] = error or self.file_store.put(key, temp_path, evict=False)
+        finally:
+            for _, _, temp_path in items:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        return results
+
+    def export_dataset(self, dataset_id: int, export_format: str, wait: float = None):
+        """
+        Devuelve (ruta, etag) de un zip con todos los modelos del dataset convertidos a
+        export_format. El zip se guarda en el almacén indexado por el contenido del dataset
+        (nombres y checksums), así que se regenera solo si cambia algún fichero.
+        Los modelos que no se pueden convertir se listan en export_errors.txt.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}'")
+
+        files = self.hubfile_service.get_paths_by_dataset(dataset_id)
+        content = hashlib.sha256()
+        for hubfile, _ in files:
+            content.update(f"{hubfile.name}\0{hubfile.checksum}\0".encode("utf-8"))
+        key = self._cache_key(f"dataset-export-{export_format}", content.hexdigest())
+
+        def writer(temp_path):
+            exports = self._export_files(files, export_format, wait=wait)
+            folder = f"dataset_{dataset_id}_{export_format}"
+            errors = []
+            with ZipFile(temp_path, "w", ZIP_DEFLATED) as zipf:
+                for hubfile, _ in files:
+                    result = exports[hubfile.checksum]
+                    if os.path.isfile(result):
+                        arcname = f"{hubfile.name}{EXPORT_FORMATS[export_format]}"
+                        zipf.write(result, arcname=os.path.join(folder, arcname))
+                    else:
+                        errors.append(f"{hubfile.name}: {result}")
+                if errors:
+                    zipf.writestr(os.path.join(folder, "export_errors.txt"), "\n".join(errors) + "\n")
+
+        path = self.file_store.get_or_create(key, writer)
+        return path, self.file_store.digest(key)
+
+    def precompute_exports(self, hubfile_ids):
+        """
+        Job lanzado tras la subida de un dataset UVL: deja preparados todos los formatos.
+        """
+        for hubfile_id in hubfile_ids:
+            hubfile = self.repository.get_by_id(hubfile_id)
+            if hubfile is None:
+                continue
+            for export_format in EXPORT_FORMATS:
+                try:
+                    self.export(hubfile, export_format, wait=float("inf"))
+                except Exception as exc:
+                    logger.warning(f"Could not precompute {export_format} export for file {hubfile_id}: {exc}")
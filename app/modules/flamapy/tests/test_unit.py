@@ -1,4 +1,27 @@
+import io
+import json
+import os
+import shutil
+import time
+import zipfile
+from unittest.mock import MagicMock, patch
+
 import pytest
+from flamapy.metamodels.fm_metamodel.transformations import UVLReader
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.dataset.models import DSMetaData, PublicationType, UVLDataSet
+from app.modules.explore.repositories import ExploreRepository
+from app.modules.featuremodel.models import FeatureModel, FMMetaData
+from app.modules.flamapy.models import UVLFeatureIndex, UVLValidation
+from app.modules.flamapy.services import VALIDATOR_VERSION, FlamapyService
+from app.modules.hubfile.models import Hubfile
+from core.caches.file_store import FileStore
+from core.caches.model_cache import ModelCache
+from core.jobs.compute_executor import ComputeError, ComputeExecutor, ComputeTimeoutError, compute_executor
+from core.storage.storage import LocalStorage, storage
 
 
 @pytest.fixture(scope="module")
@@ -22,3 +45,429 @@ def test_sample_assertion(test_client):
     """
     greeting = "Hello, World!"
     assert greeting == "Hello, World!", "The greeting does not coincide with 'Hello, World!'"
+
+
+def test_model_cache_levels_and_memory_budget(tmp_path):
+    cache = ModelCache(memory_budget=200, disk_dir=str(tmp_path))
+    compute = MagicMock(side_effect=lambda: "x" * 100)
+
+    assert cache.get_or_compute("a", compute) == "x" * 100
+    assert cache.get_or_compute("a", compute) == "x" * 100
+    assert compute.call_count == 1
+    assert cache.stats["memory_hits"] == 1
+
+    # Otro proceso (otra instancia) reutiliza la copia en disco
+    other = ModelCache(memory_budget=200, disk_dir=str(tmp_path))
+    assert other.get_or_compute("a", compute) == "x" * 100
+    assert compute.call_count == 1
+    assert other.stats["disk_hits"] == 1
+
+    # El presupuesto de memoria expulsa la entrada menos usada
+    cache.get_or_compute("b", lambda: "y" * 100)
+    assert "a" not in cache._entries
+    assert cache._memory_used <= 200
+
+
+def test_flamapy_service_parses_each_model_once(test_client, tmp_path):
+    uvl_path = os.path.join(test_client.application.root_path, "modules", "dataset", "uvl_examples", "file1.uvl")
+    hubfile = MagicMock(checksum="file1-checksum")
+    hubfile.get_path.return_value = uvl_path
+
+    service = FlamapyService()
+    service.cache = ModelCache(disk_dir=str(tmp_path), memory_budget=1024 * 1024)
+
+    with patch("app.modules.flamapy.services.UVLReader", wraps=UVLReader) as reader:
+        fm = service.get_feature_model(hubfile)
+        sat = service.get_sat_model(hubfile)
+        assert service.get_feature_model(hubfile) is fm
+        assert service.get_sat_model(hubfile) is sat
+        assert reader.call_count == 1
+
+    assert fm.root.name == "Chat"
+
+
+def test_file_store_evicts_least_recently_used(tmp_path):
+    store = FileStore(root=str(tmp_path), max_bytes=25)
+
+    def writer(content):
+        return lambda path: open(path, "w").write(content)
+
+    first = store.get_or_create("a", writer("a" * 10))
+    os.utime(first, (1, 1))
+    second = store.get_or_create("b", writer("b" * 10))
+    os.utime(second, (2, 2))
+
+    assert store.get("a") == first  # refresca el acceso de "a"
+    store.get_or_create("c", writer("c" * 10))
+
+    assert store.get("a") == first
+    assert store.get("b") is None
+    assert store.get("c") is not None
+
+
+def test_export_route_serves_from_store_with_etag(test_client, tmp_path):
+    uvl_path = os.path.join(test_client.application.root_path, "modules", "dataset", "uvl_examples", "file1.uvl")
+    hubfile = MagicMock(checksum="route-export-checksum")
+    hubfile.name = "file1.uvl"
+    hubfile.get_path.return_value = uvl_path
+
+    with (
+        patch("app.modules.flamapy.routes.HubfileService") as hubfile_service,
+        patch.object(compute_executor, "run", wraps=compute_executor.run) as compute,
+        patch("app.modules.flamapy.services.file_store", FileStore(root=str(tmp_path), max_bytes=1024 * 1024)),
+    ):
+        hubfile_service.return_value.get_or_404.return_value = hubfile
+
+        response = test_client.get("/flamapy/to_cnf/1")
+        assert response.status_code == 200
+        assert b"p cnf" in response.data
+        etag = response.headers["ETag"]
+
+        cached = test_client.get("/flamapy/to_cnf/1", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+        again = test_client.get("/flamapy/to_cnf/1")
+        assert again.data == response.data
+        assert compute.call_count == 1
+
+
+@pytest.fixture
+def uvl_dataset_on_disk(test_client, tmp_path, monkeypatch):
+    """
+    Dataset UVL con un modelo válido y otro con errores de sintaxis, guardados en un WORKING_DIR temporal.
+    """
+    monkeypatch.setenv("WORKING_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_backend", LocalStorage(str(tmp_path / "uploads")))
+    examples = os.path.join(test_client.application.root_path, "modules", "dataset", "uvl_examples")
+
+    user = User.query.filter_by(email="test@example.com").first()
+    ds_meta = DSMetaData(title="UVL check", description="d", publication_type=PublicationType.NONE)
+    db.session.add(ds_meta)
+    db.session.commit()
+    dataset = UVLDataSet(user_id=user.id, ds_meta_data_id=ds_meta.id)
+    db.session.add(dataset)
+    db.session.commit()
+    folder = tmp_path / "uploads" / f"user_{user.id}" / f"dataset_{dataset.id}"
+    folder.mkdir(parents=True)
+    shutil.copy(os.path.join(examples, "file1.uvl"), folder / "valid.uvl")
+    (folder / "broken.uvl").write_text("features\n    Root\n        mandatory mandatory\n")
+
+    for name in ("valid.uvl", "broken.uvl"):
+        fm_meta_data = FMMetaData(uvl_filename=name, title=name, description="d", publication_type=PublicationType.NONE)
+        feature_model = FeatureModel(uvl_dataset_id=dataset.id, fm_meta_data=fm_meta_data)
+        feature_model.files.append(Hubfile(name=name, checksum=name, size=1))
+        db.session.add(feature_model)
+    db.session.commit()
+
+    yield dataset
+
+    UVLValidation.query.delete()
+    UVLFeatureIndex.query.delete()
+    db.session.delete(dataset)
+    db.session.commit()
+
+
+def test_check_dataset_validates_all_files(test_client, uvl_dataset_on_disk):
+    response = test_client.get(f"/flamapy/check_dataset/{uvl_dataset_on_disk.id}")
+    assert response.status_code == 200
+
+    data = response.get_json()
+    results = {file["name"]: file for file in data["files"]}
+    assert data["valid"] is False
+    assert results["valid.uvl"]["valid"] is True
+    assert results["broken.uvl"]["valid"] is False
+    assert "Line" in results["broken.uvl"]["errors"][0]
+
+    assert test_client.get("/flamapy/check_dataset/999999").status_code == 404
+
+
+def test_validation_is_stored_and_reused(test_client, uvl_dataset_on_disk):
+    service = FlamapyService()
+    service.check_dataset(uvl_dataset_on_disk.id)
+
+    record = UVLValidation.query.filter_by(checksum="broken.uvl").one()
+    assert record.valid is False
+    assert record.validator_version == VALIDATOR_VERSION
+    assert record.parse_time_ms >= 0
+
+    # Con la misma versión del validador se responde desde la BD sin volver a analizar
+    record.errors = ["stored result"]
+    db.session.commit()
+    results = {file["name"]: file for file in service.check_dataset(uvl_dataset_on_disk.id)}
+    assert results["broken.uvl"]["errors"] == ["stored result"]
+
+    # Un cambio de versión obliga a recalcular
+    record.validator_version = "0/old"
+    db.session.commit()
+    results = {file["name"]: file for file in service.check_dataset(uvl_dataset_on_disk.id)}
+    assert results["broken.uvl"]["errors"] != ["stored result"]
+    assert UVLValidation.query.filter_by(checksum="broken.uvl").one().validator_version == VALIDATOR_VERSION
+
+    hubfile = Hubfile.query.filter_by(name="valid.uvl").first()
+    response = test_client.get(f"/flamapy/check_uvl/{hubfile.id}")
+    assert response.status_code == 200
+    assert response.get_json()["message"] == "Valid Model"
+
+
+def test_analyze_dataset_stores_typed_metrics(test_client, uvl_dataset_on_disk):
+    FlamapyService().analyze_dataset(uvl_dataset_on_disk.id)
+
+    metrics = {fm.fm_meta_data.uvl_filename: fm.fm_meta_data.fm_metrics for fm in uvl_dataset_on_disk.feature_models}
+    valid = metrics["valid.uvl"]
+    assert valid.analysis_status == "done"
+    assert (valid.number_of_features, valid.number_of_constraints, valid.tree_depth) == (10, 2, 2)
+    assert (valid.core_features, valid.dead_features) == (3, 0)
+    assert valid.number_of_configurations == 24
+
+    assert metrics["broken.uvl"].analysis_status == "failed"
+    assert set(metrics["broken.uvl"].analysis_errors) == {"structure", "sat", "bdd"}
+
+    ds_metrics = uvl_dataset_on_disk.ds_meta_data.ds_metrics
+    assert ds_metrics.number_of_models == 2
+    assert ds_metrics.number_of_features == 10
+    assert ds_metrics.number_of_configurations == 24
+
+
+@pytest.fixture
+def small_executor(test_client, monkeypatch):
+    """ComputeExecutor con un único proceso y sin cola de espera."""
+    monkeypatch.setitem(test_client.application.config, "COMPUTE_MAX_WORKERS", 1)
+    monkeypatch.setitem(test_client.application.config, "COMPUTE_MAX_QUEUE", 0)
+    monkeypatch.setitem(test_client.application.config, "COMPUTE_RETRY_AFTER", 7)
+    with test_client.application.app_context():
+        executor = ComputeExecutor()
+        executor.settings
+    monkeypatch.setattr("app.modules.flamapy.services.compute_executor", executor)
+    return executor
+
+
+def test_compute_executor_enforces_deadline_and_reports_errors(small_executor):
+    with pytest.raises(ComputeTimeoutError):
+        small_executor.run(time.sleep, 10, timeout=0.2)
+
+    with pytest.raises(ComputeError, match="ZeroDivisionError"):
+        small_executor.run(divmod, 1, 0)
+
+    # Los fallos anteriores liberan su hueco
+    assert small_executor.run(divmod, 7, 2) == (3, 1)
+
+
+def _double_all(chunk):
+    return [value * 2 for value in chunk]
+
+
+def test_compute_executor_map_chunks_never_waits_holding_a_slot(test_client, monkeypatch):
+    monkeypatch.setitem(test_client.application.config, "COMPUTE_MAX_WORKERS", 2)
+    with test_client.application.app_context():
+        executor = ComputeExecutor()
+        assert executor.map_chunks(_double_all, [1, 2, 3, 4, 5], wait=0) == [2, 4, 6, 8, 10]
+
+        # Otro job ocupa un hueco: el reparto usa solo el que queda en vez de esperar con él cogido
+        running = executor.submit(time.sleep, 10)
+        try:
+            assert executor.map_chunks(_double_all, [1, 2, 3], wait=float("inf")) == [2, 4, 6]
+        finally:
+            running.cancel()
+
+        # Todos los huecos vuelven a estar libres
+        assert executor.map_chunks(_double_all, [1, 2], wait=0) == [2, 4]
+
+
+def test_compute_executor_busy_returns_503(test_client, uvl_dataset_on_disk, small_executor):
+    hubfile = Hubfile.query.filter_by(name="valid.uvl").first()
+    running = small_executor.submit(time.sleep, 10)
+    try:
+        response = test_client.get(f"/flamapy/check_uvl/{hubfile.id}")
+    finally:
+        running.cancel()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+    assert test_client.get(f"/flamapy/check_uvl/{hubfile.id}").status_code == 200
+
+
+def test_export_dataset_zips_all_models(test_client, uvl_dataset_on_disk, tmp_path):
+    store = FileStore(root=str(tmp_path / "store"), max_bytes=1024 * 1024)
+    url = f"/flamapy/dataset/{uvl_dataset_on_disk.id}/export?format=cnf"
+
+    with patch("app.modules.flamapy.services.file_store", store):
+        response = test_client.get(url)
+        assert response.status_code == 200
+        assert response.mimetype == "application/zip"
+
+        folder = f"dataset_{uvl_dataset_on_disk.id}_cnf"
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            assert sorted(archive.namelist()) == [f"{folder}/export_errors.txt", f"{folder}/valid.uvl_cnf.txt"]
+            assert b"p cnf" in archive.read(f"{folder}/valid.uvl_cnf.txt")
+            assert b"broken.uvl" in archive.read(f"{folder}/export_errors.txt")
+
+        # La conversión individual reutiliza la ya hecha para el zip
+        assert store.get(FlamapyService()._cache_key("export-cnf", "valid.uvl")) is not None
+
+        cached = test_client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        assert cached.status_code == 304
+
+    assert test_client.get(f"/flamapy/dataset/{uvl_dataset_on_disk.id}/export?format=pdf").status_code == 400
+
+
+def test_export_dataset_with_relative_file_store_dir(test_client, uvl_dataset_on_disk, tmp_path, monkeypatch):
+    # Con WORKING_DIR vacío FILE_STORE_DIR es relativo y send_file no debe resolverlo contra app/
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(test_client.application.config, "FILE_STORE_DIR", os.path.join("cache", "files"))
+    store = FileStore(max_bytes=1024 * 1024)
+
+    with patch("app.modules.flamapy.services.file_store", store):
+        response = test_client.get(f"/flamapy/dataset/{uvl_dataset_on_disk.id}/export?format=cnf")
+        assert response.status_code == 200
+        assert response.mimetype == "application/zip"
+        assert zipfile.is_zipfile(io.BytesIO(response.data))
+
+    assert store.root == str(tmp_path / "cache" / "files")
+
+
+def test_count_and_sample_configurations(test_client):
+    uvl_path = os.path.join(test_client.application.root_path, "modules", "dataset", "uvl_examples", "file1.uvl")
+    hubfile = MagicMock(checksum="sampling-checksum")
+    hubfile.get_path.return_value = uvl_path
+
+    with patch("app.modules.flamapy.routes.HubfileService") as hubfile_service:
+        hubfile_service.return_value.get_or_404.return_value = hubfile
+
+        response = test_client.get("/flamapy/count/1")
+        assert response.get_json()["configurations"] == 24
+
+        # Sin reemplazo la muestra se limita a las 24 configuraciones distintas
+        response = test_client.get("/flamapy/sample/1?size=30")
+        assert response.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert len(lines) == 24
+        assert len({tuple(line["features"]) for line in lines}) == 24
+        assert all("Chat" in line["features"] for line in lines)
+
+        first = test_client.get("/flamapy/sample/1?size=5&seed=7&replacement=true")
+        second = test_client.get("/flamapy/sample/1?size=5&seed=7&replacement=true")
+        assert len(first.data.decode().splitlines()) == 5
+        assert first.data == second.data
+
+        assert test_client.get("/flamapy/sample/1?size=0").status_code == 400
+
+        # Fracción pequeña: se descartan repetidas, pero con un límite de configuraciones generadas
+        with patch.object(FlamapyService, "_sample_chunk", lambda self, checksum, path, size, seed: [["A"]] * size):
+            lines = [json.loads(line) for line in test_client.get("/flamapy/sample/1?size=5").data.splitlines()]
+        assert lines[0] == {"features": ["A"]}
+        assert "Sampling stopped after 1 distinct configurations" in lines[-1]["error"]
+
+
+def test_feature_tree_expands_on_demand(test_client):
+    uvl_path = os.path.join(test_client.application.root_path, "modules", "dataset", "uvl_examples", "file1.uvl")
+    hubfile = MagicMock(checksum="tree-checksum")
+    hubfile.get_path.return_value = uvl_path
+
+    with patch("app.modules.flamapy.routes.HubfileService") as hubfile_service:
+        hubfile_service.return_value.get_or_404.return_value = hubfile
+
+        root = test_client.get("/flamapy/tree/1").get_json()["node"]
+        assert (root["name"], root["relation"], root["children_count"]) == ("Chat", None, 4)
+        connection = next(child for child in root["children"] if child["name"] == "Connection")
+        assert connection["relation"] == "mandatory"
+        assert "children" not in connection
+
+        messages = test_client.get("/flamapy/tree/1?node=Messages&depth=2").get_json()["node"]
+        assert messages["relation"] == "mandatory"
+        assert [(child["name"], child["relation"]) for child in messages["children"]] == [
+            ("Text", "or"),
+            ("Video", "or"),
+            ("Audio", "or"),
+        ]
+        assert messages["children"][0]["children"] == []
+
+        assert test_client.get("/flamapy/tree/1?node=Missing").status_code == 404
+        assert test_client.get("/flamapy/tree/1?depth=99").status_code == 400
+
+
+def test_diff_reports_structural_changes(test_client, tmp_path):
+    original = os.path.join(test_client.application.root_path, "modules", "dataset", "uvl_examples", "file1.uvl")
+    changed = tmp_path / "changed.uvl"
+    changed.write_text(
+        "features\n"
+        "    Chat\n"
+        "        mandatory\n"
+        "            Connection\n"
+        "                alternative\n"
+        '                    "Peer 2 Peer"\n'
+        "                    Server\n"
+        "                    Bluetooth\n"
+        "            Messages\n"
+        "                or\n"
+        "                    Text\n"
+        "                    Video\n"
+        "            Audio\n"
+        "        optional\n"
+        '            "Data Storage"\n'
+        "\n"
+        "constraints\n"
+        '    Server => "Data Storage"\n'
+        "    Bluetooth => Audio\n"
+    )
+    hubfile_a = MagicMock(checksum="diff-a")
+    hubfile_a.get_path.return_value = original
+    hubfile_b = MagicMock(checksum="diff-b")
+    hubfile_b.get_path.return_value = str(changed)
+
+    with patch("app.modules.flamapy.routes.HubfileService") as hubfile_service:
+        hubfile_service.return_value.get_or_404.side_effect = [hubfile_a, hubfile_b]
+        diff = test_client.get("/flamapy/diff/1/2").get_json()
+
+    assert diff["identical"] is False
+    assert diff["features"]["added"] == ["Bluetooth"]
+    assert diff["features"]["removed"] == ["Media Player"]
+    assert diff["features"]["moved"] == [{"name": "Audio", "from": "Messages", "to": "Chat"}]
+    assert diff["relations"] == [{"name": "Audio", "from": "or", "to": "mandatory"}]
+    assert diff["constraints"]["added"] == ["Bluetooth IMPLIES Audio"]
+    assert diff["constraints"]["removed"] == ['(Video OR Audio) IMPLIES "Media Player"']
+
+    service = FlamapyService()
+    assert service.diff(hubfile_a, hubfile_a)["identical"] is True
+
+
+def test_feature_index_is_searchable_from_explore(test_client, uvl_dataset_on_disk):
+    FlamapyService().index_dataset(uvl_dataset_on_disk.id)
+
+    valid = Hubfile.query.filter_by(name="valid.uvl").first()
+    entries = {(entry.kind, entry.name) for entry in UVLFeatureIndex.query.filter_by(hubfile_id=valid.id)}
+    assert ("feature", "Data Storage") in entries
+    assert ("constraint", "Media Player") in entries
+    broken = Hubfile.query.filter_by(name="broken.uvl").first()
+    assert UVLFeatureIndex.query.filter_by(hubfile_id=broken.id).count() == 0
+
+    repository = ExploreRepository()
+    assert [dataset.id for dataset in repository.filter(query='feature:"Data Storage"')] == [uvl_dataset_on_disk.id]
+    assert [dataset.id for dataset in repository.filter(query="constraint:Server feature:Chat")] == [
+        uvl_dataset_on_disk.id
+    ]
+    assert repository.filter(query="feature:ABS") == []
+
+
+def test_feature_index_failures_are_isolated_per_file(test_client, uvl_dataset_on_disk):
+    service = FlamapyService()
+    files = service.hubfile_service.get_paths_by_dataset(uvl_dataset_on_disk.id)
+    terms = {"feature": ["Chat", "chat", "CHAT", "Audio"], "attribute": [], "constraint": []}
+    real_replace = service.feature_index_repository.replace_for_hubfile
+
+    def replace_or_fail(hubfile_id, terms, commit=True):
+        real_replace(hubfile_id, terms, commit=commit)
+        if hubfile_id == files[0][0].id:
+            raise IntegrityError("INSERT", {}, Exception("Duplicate entry"))
+
+    with (
+        patch.object(service, "_index_terms", return_value=terms),
+        patch.object(service.compute, "run", side_effect=lambda fn, *args, **kwargs: fn(*args)),
+        patch.object(service.feature_index_repository, "replace_for_hubfile", side_effect=replace_or_fail),
+    ):
+        assert service.index_files(files) == len(files) - 1
+
+    assert UVLFeatureIndex.query.filter_by(hubfile_id=files[0][0].id).count() == 0
+    # Los nombres que solo difieren en mayúsculas se guardan una vez
+    names = [entry.name for entry in UVLFeatureIndex.query.filter_by(hubfile_id=files[1][0].id)]
+    assert sorted(names) == ["Audio", "CHAT"]
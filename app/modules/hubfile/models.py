@@ -13,6 +13,7 @@ class Hubfile(db.Model):
     name = db.Column(db.String(120), nullable=False)
     checksum = db.Column(db.String(120), nullable=False)
     size = db.Column(db.Integer, nullable=False)
+    storage_key = db.Column(db.String(512), nullable=True)
     feature_model_id = db.Column(db.Integer, db.ForeignKey("feature_model.id"), nullable=False)
 
     def get_formatted_size(self):
@@ -30,7 +31,7 @@ class Hubfile(db.Model):
 
         return HubfileService().get_dataset_by_hubfile(self)
 
-    def get_path(self) -> DataSet:
+    def get_path(self) -> str:
         from app.modules.hubfile.services import HubfileService
 
         return HubfileService().get_path_by_hubfile(self)
@@ -57,6 +58,8 @@ class HubfileViewRecord(db.Model):
     view_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     view_cookie = db.Column(db.String(36))
 
+    __table_args__ = (db.Index("ix_file_view_record_lookup", "file_id", "user_id", "view_cookie"),)
+
     def __repr__(self):
         return "<FileViewRecord {}>".format(self.id)
 
@@ -69,6 +72,8 @@ class HubfileDownloadRecord(db.Model):
     download_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     download_cookie = db.Column(db.String(36), nullable=False)
 
+    __table_args__ = (db.Index("ix_file_download_record_lookup", "file_id", "user_id", "download_cookie"),)
+
     def __repr__(self):
         return (
             f"<FileDownload id={self.id} "
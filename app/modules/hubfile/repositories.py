@@ -5,6 +5,7 @@ from app.modules.auth.models import User
 from app.modules.dataset.models import DataSet
 from app.modules.featuremodel.models import FeatureModel
 from app.modules.hubfile.models import Hubfile, HubfileDownloadRecord, HubfileViewRecord
+from core.database.routing import reads_from_replica
 from core.repositories.BaseRepository import BaseRepository
 
 
@@ -16,20 +17,38 @@ class HubfileRepository(BaseRepository):
         return (
             db.session.query(User)
             .join(DataSet)
-            .join(FeatureModel)
+            .join(FeatureModel, FeatureModel.uvl_dataset_id == DataSet.id)
             .join(Hubfile)
             .filter(Hubfile.id == hubfile.id)
             .first()
         )
 
     def get_dataset_by_hubfile(self, hubfile: Hubfile) -> DataSet:
-        return db.session.query(DataSet).join(FeatureModel).join(Hubfile).filter(Hubfile.id == hubfile.id).first()
+        return (
+            db.session.query(DataSet)
+            .join(FeatureModel, FeatureModel.uvl_dataset_id == DataSet.id)
+            .join(Hubfile)
+            .filter(Hubfile.id == hubfile.id)
+            .first()
+        )
+
+    def get_with_owner_by_dataset(self, dataset_id: int) -> list:
+        """Returns (hubfile, user_id) for every file of the dataset in a single query."""
+        return (
+            db.session.query(Hubfile, DataSet.user_id)
+            .join(FeatureModel, Hubfile.feature_model_id == FeatureModel.id)
+            .join(DataSet, FeatureModel.uvl_dataset_id == DataSet.id)
+            .filter(DataSet.id == dataset_id)
+            .order_by(Hubfile.id)
+            .all()
+        )
 
 
 class HubfileViewRecordRepository(BaseRepository):
     def __init__(self):
         super().__init__(HubfileViewRecord)
 
+    @reads_from_replica
     def total_hubfile_views(self) -> int:
         max_id = self.model.query.with_entities(func.max(self.model.id)).scalar()
         return max_id if max_id is not None else 0
@@ -39,6 +58,7 @@ class HubfileDownloadRecordRepository(BaseRepository):
     def __init__(self):
         super().__init__(HubfileDownloadRecord)
 
+    @reads_from_replica
     def total_hubfile_downloads(self) -> int:
         max_id = self.model.query.with_entities(func.max(self.model.id)).scalar()
         return max_id if max_id is not None else 0
@@ -3,25 +3,22 @@ import traceback
 import uuid
 from datetime import datetime, timezone
 
-from flask import current_app, jsonify, make_response, request, send_from_directory, url_for
+from flask import jsonify, make_response, redirect, request, send_file, url_for
 from flask_login import current_user
 
 from app import db
 from app.modules.hubfile import hubfile_bp
 from app.modules.hubfile.models import HubfileDownloadRecord, HubfileViewRecord
 from app.modules.hubfile.services import HubfileDownloadRecordService, HubfileService
+from core.storage.storage import storage
 
 
 @hubfile_bp.route("/file/download/<int:file_id>", methods=["GET"])
 def download_file(file_id):
-    file = HubfileService().get_or_404(file_id)
+    hubfile_service = HubfileService()
+    file = hubfile_service.get_or_404(file_id)
     filename = file.name
-
-    directory_path = (
-        f"uploads/user_{file.feature_model.uvl_dataset.user_id}/dataset_{file.feature_model.uvl_dataset_id}/"
-    )
-    parent_directory_path = os.path.dirname(current_app.root_path)
-    file_path = os.path.join(parent_directory_path, directory_path)
+    storage_key = hubfile_service.get_storage_key(file)
 
     # Get the cookie from the request or generate a new one if it does not exist
     user_cookie = request.cookies.get("file_download_cookie")
@@ -42,8 +39,14 @@ def download_file(file_id):
             download_cookie=user_cookie,
         )
 
+    # Con almacenamiento remoto se redirige a una URL firmada; en local lo sirve la app
+    url = storage.url(storage_key)
+    if url:
+        resp = make_response(redirect(url))
+    else:
+        resp = make_response(send_file(storage.local_path(storage_key), download_name=filename, as_attachment=True))
+
     # Save the cookie to the user's browser
-    resp = make_response(send_from_directory(directory=file_path, path=filename, as_attachment=True))
     resp.set_cookie("file_download_cookie", user_cookie)
 
     return resp
@@ -54,17 +57,8 @@ def view_file(file_id):
     file = HubfileService().get_or_404(file_id)
     filename = file.name
 
-    directory_path = (
-        f"uploads/user_{file.feature_model.uvl_dataset.user_id}/dataset_{file.feature_model.uvl_dataset_id}/"
-    )
-    parent_directory_path = os.path.dirname(current_app.root_path)
-
-    # Ruta completa a la CARPETA (necesaria para send_from_directory)
-    full_dir_path = os.path.join(parent_directory_path, directory_path)
-    # Ruta completa al ARCHIVO (necesaria para open)
-    file_path = os.path.join(full_dir_path, filename)
-
     try:
+        file_path = file.get_path()
         if os.path.exists(file_path):
             # En lugar de enviar el binario, enviamos un JSON con HTML que apunta a la descarga
             ext = os.path.splitext(filename)[1].lower()
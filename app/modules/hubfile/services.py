@@ -1,5 +1,3 @@
-import os
-
 from app.modules.auth.models import User
 from app.modules.dataset.models import DataSet
 from app.modules.hubfile.models import Hubfile
@@ -9,6 +7,7 @@ from app.modules.hubfile.repositories import (
     HubfileViewRecordRepository,
 )
 from core.services.BaseService import BaseService
+from core.storage.storage import dataset_file_key, storage
 
 
 class HubfileService(BaseService):
@@ -23,17 +22,23 @@ class HubfileService(BaseService):
     def get_dataset_by_hubfile(self, hubfile: Hubfile) -> DataSet:
         return self.repository.get_dataset_by_hubfile(hubfile)
 
-    def get_path_by_hubfile(self, hubfile: Hubfile) -> str:
+    def get_storage_key(self, hubfile: Hubfile) -> str:
+        """La clave guardada; los ficheros anteriores a storage_key la reconstruyen con dos consultas."""
+        if hubfile.storage_key:
+            return hubfile.storage_key
 
         hubfile_user = self.get_owner_user_by_hubfile(hubfile)
         hubfile_dataset = self.get_dataset_by_hubfile(hubfile)
-        working_dir = os.getenv("WORKING_DIR")
+        return dataset_file_key(hubfile_user.id, hubfile_dataset.id, hubfile.name)
 
-        path = os.path.join(
-            working_dir, "uploads", f"user_{hubfile_user.id}", f"dataset_{hubfile_dataset.id}", hubfile.name
-        )
+    def get_path_by_hubfile(self, hubfile: Hubfile) -> str:
+        return storage.local_path(self.get_storage_key(hubfile))
 
-        return path
+    def get_paths_by_dataset(self, dataset_id: int) -> list:
+        return [
+            (hubfile, storage.local_path(hubfile.storage_key or dataset_file_key(user_id, dataset_id, hubfile.name)))
+            for hubfile, user_id in self.repository.get_with_owner_by_dataset(dataset_id)
+        ]
 
     def total_hubfile_views(self) -> int:
         return self.hubfile_view_record_repository.total_hubfile_views()
@@ -1,4 +1,12 @@
+import os
+from unittest.mock import patch
+
 import pytest
+from sqlalchemy import event
+
+from app import db
+from app.modules.hubfile.models import Hubfile
+from core.storage.storage import LocalStorage, S3Storage, Storage, dataset_file_key
 
 
 @pytest.fixture(scope="module")
@@ -22,3 +30,79 @@ def test_sample_assertion(test_client):
     """
     greeting = "Hello, World!"
     assert greeting == "Hello, World!", "The greeting does not coincide with 'Hello, World!'"
+
+
+def test_local_storage_operations(tmp_path):
+    backend = LocalStorage(str(tmp_path / "storage"))
+    source = tmp_path / "model.uvl"
+    source.write_text("features\n    Root\n")
+
+    key = backend.put(dataset_file_key(1, 2, "model.uvl"), str(source))
+    assert key == "user_1/dataset_2/model.uvl"
+    assert source.exists()
+    assert backend.stat(key).size == source.stat().st_size
+    with backend.open(key) as f:
+        assert f.read() == b"features\n    Root\n"
+
+    backend.link(key, "user_1/dataset_3/model.uvl")
+    assert backend.exists("user_1/dataset_3/model.uvl")
+    assert backend.url(key) is None
+
+    backend.delete(key)
+    assert not backend.exists(key)
+    with pytest.raises(ValueError):
+        backend.local_path("../outside.uvl")
+
+
+def test_hubfile_path_from_storage_key_needs_no_queries(test_client, tmp_path):
+    hubfile = Hubfile(name="model.uvl", checksum="x", size=1, storage_key="user_1/dataset_2/model.uvl")
+    queries = []
+
+    def count_query(*args):
+        queries.append(args)
+
+    with test_client.application.app_context():
+        event.listen(db.engine, "before_cursor_execute", count_query)
+        try:
+            with patch("app.modules.hubfile.services.storage", Storage(LocalStorage(str(tmp_path)))):
+                path = hubfile.get_path()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_query)
+
+    assert path == str(tmp_path / "user_1" / "dataset_2" / "model.uvl")
+    assert queries == []
+
+
+@pytest.mark.skipif(not os.getenv("S3_TEST_ENDPOINT_URL"), reason="needs an S3-compatible server (e.g. MinIO)")
+def test_s3_storage_against_local_server(tmp_path):
+    """
+    Se ejecuta contra un servidor compatible con S3, p. ej.:
+    docker run -p 9000:9000 minio/minio server /data  (S3_TEST_ENDPOINT_URL=http://localhost:9000)
+    """
+    boto3 = pytest.importorskip("boto3")
+    options = {
+        "endpoint_url": os.getenv("S3_TEST_ENDPOINT_URL"),
+        "aws_access_key_id": os.getenv("S3_TEST_ACCESS_KEY_ID", "minioadmin"),
+        "aws_secret_access_key": os.getenv("S3_TEST_SECRET_ACCESS_KEY", "minioadmin"),
+    }
+    bucket = os.getenv("S3_TEST_BUCKET", "formulahub-test")
+    client = boto3.client("s3", **options)
+    try:
+        client.create_bucket(Bucket=bucket)
+    except client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+    backend = S3Storage(bucket, cache_dir=str(tmp_path / "cache"), prefix="tests", client=client)
+    source = tmp_path / "model.uvl"
+    source.write_text("features\n    Root\n")
+
+    key = backend.put("user_1/dataset_2/model.uvl", str(source))
+    assert backend.stat(key).size == source.stat().st_size
+    backend.link(key, "user_1/dataset_3/model.uvl")
+    with open(backend.local_path("user_1/dataset_3/model.uvl")) as f:
+        assert f.read() == "features\n    Root\n"
+    assert backend.url(key).startswith(options["endpoint_url"])
+
+    backend.delete(key)
+    backend.delete("user_1/dataset_3/model.uvl")
+    assert not backend.exists(key)
@@ -8,7 +8,7 @@ from flask_login import current_user, login_required
 
 from app import db
 from app.modules.auth.services import AuthenticationService
-from app.modules.dataset.models import DataSet
+from app.modules.dataset.services import DataSetService
 from app.modules.profile import profile_bp
 from app.modules.profile.forms import UserProfileForm
 from app.modules.profile.services import UserProfileService
@@ -39,16 +39,8 @@ def my_profile():
     page = request.args.get("page", 1, type=int)
     per_page = 5
 
-    user_datasets_pagination = (
-        db.session.query(DataSet)
-        .filter(DataSet.user_id == current_user.id)
-        .order_by(DataSet.created_at.desc())
-        .paginate(page=page, per_page=per_page, error_out=False)
-    )
-
-    total_datasets_count = db.session.query(DataSet).filter(DataSet.user_id == current_user.id).count()
-
-    print(user_datasets_pagination.items)
+    user_datasets_pagination = DataSetService().paginate_by_user(current_user.id, page, per_page)
+    total_datasets_count = user_datasets_pagination.total
 
     return render_template(
         "profile/summary.html",
@@ -9,8 +9,8 @@ from flask_login import current_user
 from app.modules.dataset.models import DataSet
 from app.modules.featuremodel.models import FeatureModel
 from app.modules.zenodo.repositories import ZenodoRepository
-from core.configuration.configuration import uploads_folder_name
 from core.services.BaseService import BaseService
+from core.storage.storage import dataset_file_key, storage
 
 logger = logging.getLogger(__name__)
 
@@ -209,13 +209,10 @@ class ZenodoService(BaseService):
         uvl_filename = feature_model.fm_meta_data.uvl_filename
         data = {"name": uvl_filename}
         user_id = current_user.id if user is None else user.id
-        file_path = os.path.join(
-            uploads_folder_name(),
-            f"user_{str(user_id)}",
-            f"dataset_{dataset.id}/",
-            uvl_filename,
+        storage_key = next(
+            (file.storage_key for file in feature_model.files if file.name == uvl_filename and file.storage_key), None
         )
-        files = {"file": open(file_path, "rb")}
+        files = {"file": storage.open(storage_key or dataset_file_key(user_id, dataset.id, uvl_filename), "rb")}
 
         publish_url = f"{self.ZENODO_API_URL}/{deposition_id}/files"
         response = requests.post(publish_url, params=self.params, data=data, files=files, timeout=10)
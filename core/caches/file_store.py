@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+import threading
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class FileStore:
+    """
+    Content-addressed store of generated files (exports, archives...), bounded by size.
+
+    Each entry is stored under the SHA-256 of its key, which doubles as a strong ETag. Reads
+    refresh the file mtime, and writes evict the least recently used files until the store fits
+    in FILE_STORE_MAX_BYTES. Everything lives on disk, so all gunicorn workers share it.
+    """
+
+    def __init__(self, root: str = None, max_bytes: int = None):
+        self._root = os.path.abspath(root) if root else None
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            # Absolute, so send_file does not resolve it against app.root_path (FILE_STORE_DIR is relative
+            # when WORKING_DIR is empty)
+            self._root = os.path.abspath(current_app.config.get("FILE_STORE_DIR", os.path.join("cache", "files")))
+        return self._root
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is None:
+            self._max_bytes = current_app.config.get("FILE_STORE_MAX_BYTES", 512 * 1024 * 1024)
+        return self._max_bytes
+
+    @staticmethod
+    def digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, self.digest(key))
+
+    def get(self, key: str):
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_or_create(self, key: str, writer) -> str:
+        """
+        Returns the stored path for key. On a miss, writer(temp_path) must write the file; it is
+        then moved into place atomically.
+        """
+        path = self.get(key)
+        if path:
+            return path
+
+        temp_path = self.temp_path_for(key)
+        try:
+            writer(temp_path)
+            return self.put(key, temp_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def temp_path_for(self, key: str) -> str:
+        """Private temp path for writing the entry of key, to be handed to put() afterwards."""
+        os.makedirs(self.root, exist_ok=True)
+        return f"{self.path_for(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def put(self, key: str, temp_path: str, evict: bool = True) -> str:
+        """
+        Moves an already written file into place atomically. Pass evict=False when storing several
+        entries that are about to be read together, and call evict() once they are no longer needed.
+        """
+        path = self.path_for(key)
+        os.replace(temp_path, path)
+        if evict:
+            self.evict(keep=path)
+        return path
+
+    def evict(self, keep: str = None):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if os.path.join(self.root, name) == keep:
+                    continue
+                try:
+                    os.remove(os.path.join(self.root, name))
+                    total -= size
+                except FileNotFoundError:
+                    pass
+                logger.info(f"Evicted {name} from file store")
+
+
+file_store = FileStore()
@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCache:
+    """
+    Two-level cache for expensive, picklable objects (parsed feature models, SAT/BDD models...).
+
+    Level 1 is an in-process LRU bounded by MODEL_CACHE_MEMORY_BYTES, using the pickled size as
+    an estimate of each entry. Level 2 is a directory of pickle files (MODEL_CACHE_DIR) shared by
+    every gunicorn worker; files are written atomically so concurrent workers never read a
+    partial entry.
+
+    Cached objects are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, memory_budget: int = None, disk_dir: str = None):
+        self._memory_budget = memory_budget
+        self._disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @property
+    def memory_budget(self) -> int:
+        if self._memory_budget is None:
+            self._memory_budget = current_app.config.get("MODEL_CACHE_MEMORY_BYTES", 64 * 1024 * 1024)
+        return self._memory_budget
+
+    @property
+    def disk_dir(self) -> str:
+        if self._disk_dir is None:
+            self._disk_dir = current_app.config.get("MODEL_CACHE_DIR", os.path.join("cache", "models"))
+        return self._disk_dir
+
+    def get_or_compute(self, key: str, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._entries[key][0]
+
+        path = self._disk_path(key)
+        value, size = self._read_disk(path)
+        if value is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            value = compute()
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            size = len(data)
+            self._write_disk(path, data)
+
+        self._remember(key, value, size)
+        return value
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._entries.clear()
+            self._memory_used = 0
+        if disk and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".pickle"):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def _remember(self, key, value, size):
+        if size > self.memory_budget:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._memory_used -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._memory_used += size
+            while self._memory_used > self.memory_budget:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._memory_used -= evicted_size
+
+    def _disk_path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.pickle")
+
+    def _read_disk(self, path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            return pickle.loads(data), len(data)
+        except FileNotFoundError:
+            return None, 0
+        except Exception as exc:
+            # Corrupt or incompatible entry (e.g. written by another library version): recompute it
+            logger.warning(f"Discarding unreadable cache entry {path}: {exc}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None, 0
+
+    def _write_disk(self, path, data):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as exc:
+            logger.warning(f"Could not write cache entry {path}: {exc}")
+
+
+model_cache = ModelCache()
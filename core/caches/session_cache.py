@@ -0,0 +1,160 @@
+import logging
+import pickle
+import threading
+import time
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCacheBackend:
+    """In-process key/value store with per-entry expiry. Each gunicorn worker has its own copy."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Store shared by every worker and node. Redis errors are logged and behave as cache misses, so
+    an unavailable Redis only costs the database round-trips the cache was saving.
+    """
+
+    def __init__(self, url: str, prefix: str = "formulahub:", client=None):
+        self._url = url
+        self._prefix = prefix
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self._url)
+        return self._client
+
+    def get(self, key: str):
+        try:
+            data = self.client.get(self._prefix + key)
+        except Exception as exc:
+            logger.warning("Session cache read failed: %s", exc)
+            return None
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key: str, value, ttl: float):
+        try:
+            self.client.set(self._prefix + key, pickle.dumps(value), px=max(int(ttl * 1000), 1))
+        except Exception as exc:
+            logger.warning("Session cache write failed: %s", exc)
+
+    def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            self.client.delete(*(self._prefix + key for key in keys))
+        except Exception as exc:
+            # Si no se puede invalidar, la entrada caduca sola tras SESSION_CACHE_TTL
+            logger.warning("Session cache invalidation failed: %s", exc)
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=self._prefix + "*"))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as exc:
+            logger.warning("Session cache clear failed: %s", exc)
+
+
+class SessionCache:
+    """
+    Short-lived cache of authenticated users and of which UserSession rows are still valid, so a
+    logged-in request does not need to reach the database just to authenticate.
+
+    Only positive results are cached, for SESSION_CACHE_TTL seconds (0 disables the cache).
+    terminate_session, terminate_all_other_sessions and logout delete the affected entries right
+    away. With SESSION_CACHE_BACKEND="local" that only reaches the worker handling the request, and
+    other workers notice within the TTL. With "redis" (SESSION_CACHE_REDIS_URL) every worker shares
+    the entries and a remote logout takes effect on the next request.
+    """
+
+    def __init__(self, backend=None, ttl: float = None):
+        self._backend = backend
+        self._ttl = ttl
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = self._build_backend(current_app.config)
+        return self._backend
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is None:
+            self._ttl = float(current_app.config.get("SESSION_CACHE_TTL", 30))
+        return self._ttl
+
+    @staticmethod
+    def _build_backend(config):
+        kind = config.get("SESSION_CACHE_BACKEND", "local")
+        if kind == "local":
+            return LocalCacheBackend()
+        if kind == "redis":
+            return RedisCacheBackend(config["SESSION_CACHE_REDIS_URL"])
+        raise ValueError(f"Unknown SESSION_CACHE_BACKEND '{kind}'")
+
+    def is_session_valid(self, session_id: str, token: str, user_id: int) -> bool:
+        """True if the session was validated recently; False means "ask the database"."""
+        if self.ttl <= 0:
+            return False
+        return self.backend.get(f"session:{session_id}") == (token, user_id)
+
+    def remember_session(self, session_id: str, token: str, user_id: int):
+        if self.ttl > 0:
+            self.backend.set(f"session:{session_id}", (token, user_id), self.ttl)
+
+    def forget_sessions(self, *session_ids: str):
+        self.backend.delete(*(f"session:{session_id}" for session_id in session_ids))
+
+    def get_user(self, user_id: int):
+        if self.ttl <= 0:
+            return None
+        return self.backend.get(f"user:{user_id}")
+
+    def remember_user(self, user_id: int, values: dict):
+        if self.ttl > 0:
+            self.backend.set(f"user:{user_id}", values, self.ttl)
+
+    def forget_user(self, user_id: int):
+        self.backend.delete(f"user:{user_id}")
+
+    def clear(self):
+        self.backend.clear()
+
+
+session_cache = SessionCache()
@@ -0,0 +1,113 @@
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# QueryStats currently collecting in this context (request, test block...); queries are recorded in all of them
+_collectors: ContextVar[tuple] = ContextVar("query_collectors", default=())
+
+_WHITESPACE = re.compile(r"\s+")
+# IN (?, ?, ?) / IN (%s, %s) lists: same shape whatever the number of values
+_PARAMETER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace collapsed and parameter lists folded, to group repeated queries."""
+    return _PARAMETER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement.strip()))
+
+
+class QueryStats:
+    """Queries seen while collecting: how many, total SQL time and how often each statement shape ran."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_selects(self, threshold: int) -> list:
+        """(shape, times) of the SELECTs that ran at least ``threshold`` times: the usual N+1 signature."""
+        return [
+            (shape, times)
+            for shape, times in self.shapes.most_common()
+            if times >= threshold and shape[:6].upper() == "SELECT"
+        ]
+
+    def summary(self) -> str:
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms"]
+        lines.extend(f"  {times}x {shape}" for shape, times in self.shapes.most_common())
+        return "\n".join(lines)
+
+
+def start_collecting(stats: QueryStats):
+    return _collectors.set(_collectors.get() + (stats,))
+
+
+def stop_collecting(token):
+    _collectors.reset(token)
+
+
+@contextmanager
+def collect_queries():
+    """Counts the queries run inside the block: ``with collect_queries() as stats: ...``"""
+    stats = QueryStats()
+    token = start_collecting(stats)
+    try:
+        yield stats
+    finally:
+        stop_collecting(token)
+
+
+class _MaxQueries(ContextDecorator):
+    def __init__(self, limit: int):
+        self.limit = limit
+
+    def __enter__(self):
+        self.stats = QueryStats()
+        self._token = start_collecting(self.stats)
+        return self.stats
+
+    def __exit__(self, exc_type, exc, traceback):
+        stop_collecting(self._token)
+        if exc_type is None and self.stats.count > self.limit:
+            raise AssertionError(f"Expected at most {self.limit} queries, ran {self.stats.summary()}")
+        return False
+
+
+def max_queries(limit: int) -> _MaxQueries:
+    """
+    Fails with AssertionError when the block or decorated function runs more than ``limit`` queries:
+
+        with max_queries(6):
+            test_client.get("/dataset/list")
+
+        @max_queries(6)
+        def test_dataset_list(test_client): ...
+    """
+    return _MaxQueries(limit)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _collectors.get():
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    for stats in _collectors.get():
+        stats.record(statement, duration)
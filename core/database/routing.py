@@ -0,0 +1,108 @@
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, has_request_context
+from flask import session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND_PREFIX = "replica_"
+PRIMARY_UNTIL_KEY = "_db_primary_until"
+
+
+def replica_binds(replica_uris) -> dict:
+    """SQLALCHEMY_BINDS entries for the read replicas (replica_0, replica_1...)."""
+    return {f"{REPLICA_BIND_PREFIX}{index}": uri for index, uri in enumerate(replica_uris)}
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only work to a replica and everything else to the primary.
+
+    A statement goes to a replica only when all of these hold:
+    - it runs inside replica_reads() (or a @reads_from_replica repository method);
+    - it is a SELECT, the session is not flushing and has no pending changes;
+    - this session has not written anything yet (read-after-write in the same request stays on
+      the primary);
+    - the user has not committed a write in the last SQLALCHEMY_REPLICA_LAG_WINDOW seconds. That is
+      tracked in the Flask session cookie, so it holds across workers while replicas catch up.
+
+    Without replicas configured (SQLALCHEMY_REPLICA_URIS) it behaves like the default session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or engine is not self._db.engines.get(None):
+            return engine
+
+        replicas = [engine for key, engine in self._db.engines.items() if key and key.startswith(REPLICA_BIND_PREFIX)]
+        if replicas and self._can_read_from_replica(clause):
+            return random.choice(replicas)
+        return engine
+
+    def _can_read_from_replica(self, clause) -> bool:
+        if not self.info.get("replica_reads") or self.info.get("wrote"):
+            return False
+        if clause is not None and not getattr(clause, "is_select", False):
+            return False
+        if self._flushing or self.new or self.dirty or self.deleted:
+            return False
+        return not recently_wrote()
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _mark_write(session, flush_context, instances):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_user_to_primary(session):
+    if not session.info.pop("wrote", False) or not has_request_context():
+        return
+    if not any(key and key.startswith(REPLICA_BIND_PREFIX) for key in session._db.engines):
+        return
+    window = current_app.config.get("SQLALCHEMY_REPLICA_LAG_WINDOW", 5)
+    flask_session[PRIMARY_UNTIL_KEY] = time.time() + window
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+def recently_wrote() -> bool:
+    return has_request_context() and flask_session.get(PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+@contextmanager
+def replica_reads(session=None):
+    """Lets the SELECTs issued inside the block read from a replica (see RoutingSession)."""
+    if session is None:
+        import app
+
+        session = app.db.session
+
+    session.info["replica_reads"] = session.info.get("replica_reads", 0) + 1
+    try:
+        yield session
+    finally:
+        session.info["replica_reads"] -= 1
+
+
+def reads_from_replica(method):
+    """Marks a read-only repository method as safe to serve from a replica."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with replica_reads(self.session):
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,208 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from flask import current_app
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class ComputeBusyError(Exception):
+    """Every compute slot is taken and the waiting queue is full (or the wait timed out)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("The server is busy with other analyses, try again later")
+        self.retry_after = retry_after
+
+
+class ComputeTimeoutError(TimeoutError):
+    pass
+
+
+class ComputeError(RuntimeError):
+    pass
+
+
+def _child_main(app, fn, args, kwargs, memory_limit, connection):
+    if resource is not None and memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    try:
+        # The task may be submitted from outside a request (e.g. a streamed response)
+        with app.app_context():
+            connection.send((True, fn(*args, **kwargs)))
+    except BaseException as exc:
+        connection.send((False, f"{type(exc).__name__}: {exc}"))
+    finally:
+        connection.close()
+
+
+class ComputeTask:
+    """Handle of a task running in its own process. result() waits for it, cancel() kills it."""
+
+    def __init__(self, executor, process, receiver, timeout):
+        self._executor = executor
+        self._process = process
+        self._receiver = receiver
+        self._deadline = time.monotonic() + timeout
+        self._finished = False
+
+    def result(self):
+        try:
+            if not self._receiver.poll(max(0.0, self._deadline - time.monotonic())):
+                raise ComputeTimeoutError("The operation took too long and was cancelled")
+            ok, payload = self._receiver.recv()
+        except EOFError:
+            raise ComputeError("The compute process exited unexpectedly (memory limit exceeded?)") from None
+        finally:
+            self.cancel()
+
+        if not ok:
+            raise ComputeError(payload)
+        return payload
+
+    def cancel(self):
+        if self._finished:
+            return
+        self._finished = True
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+        self._receiver.close()
+        self._executor._release()
+
+
+class ComputeExecutor:
+    """
+    Runs CPU-heavy callables out of the request thread, each in a freshly forked process that
+    can be killed: a wall-clock deadline (COMPUTE_TASK_TIMEOUT) and an address-space limit
+    (COMPUTE_TASK_MEMORY_MB) apply to every task.
+
+    At most COMPUTE_MAX_WORKERS tasks run at once per application process. Up to
+    COMPUTE_MAX_QUEUE callers wait for a slot (COMPUTE_QUEUE_TIMEOUT seconds at most); beyond
+    that ComputeBusyError is raised, which the app turns into a 503 with Retry-After.
+
+    Tasks must not touch the database session: resolve everything they need beforehand.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._settings = None
+        self._slots = None
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> dict:
+        if self._settings is None:
+            self._app = current_app._get_current_object()
+            config = self._app.config
+            self._settings = {
+                "max_workers": config.get("COMPUTE_MAX_WORKERS", os.cpu_count() or 1),
+                "max_queue": config.get("COMPUTE_MAX_QUEUE", 16),
+                "queue_timeout": config.get("COMPUTE_QUEUE_TIMEOUT", 5),
+                "task_timeout": config.get("COMPUTE_TASK_TIMEOUT", 60),
+                "memory_limit": config.get("COMPUTE_TASK_MEMORY_MB", 1024) * 1024 * 1024,
+                "retry_after": config.get("COMPUTE_RETRY_AFTER", 10),
+            }
+            self._slots = threading.BoundedSemaphore(self._settings["max_workers"])
+        return self._settings
+
+    def _acquire(self, wait):
+        settings = self.settings
+        if self._slots.acquire(blocking=False):
+            return
+
+        if wait is None:
+            wait = settings["queue_timeout"]
+        elif wait == float("inf"):
+            # Jobs en segundo plano: esperan su turno sin contar para la cola de peticiones
+            self._slots.acquire()
+            return
+
+        with self._lock:
+            if self._waiting >= settings["max_queue"]:
+                raise ComputeBusyError(settings["retry_after"])
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            raise ComputeBusyError(settings["retry_after"])
+
+    def _release(self):
+        self._slots.release()
+
+    def submit(self, fn, *args, timeout: float = None, wait: float = None, **kwargs) -> ComputeTask:
+        """
+        Starts fn(*args, **kwargs) in a new process once a slot is free. `wait` is how long to
+        queue for a slot (None: COMPUTE_QUEUE_TIMEOUT, float("inf"): no limit, for background jobs).
+        """
+        self._acquire(wait)
+        return self._start(fn, args, kwargs, timeout)
+
+    def _start(self, fn, args, kwargs, timeout) -> ComputeTask:
+        # The caller already holds a slot; it is released here if the process cannot start
+        try:
+            context = multiprocessing.get_context("fork")
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_child_main,
+                args=(self._app, fn, args, kwargs, self.settings["memory_limit"], sender),
+                daemon=True,
+            )
+            process.start()
+            sender.close()
+        except BaseException:
+            self._release()
+            raise
+        return ComputeTask(self, process, receiver, timeout or self.settings["task_timeout"])
+
+    def run(self, fn, *args, timeout: float = None, wait: float = None, **kwargs):
+        return self.submit(fn, *args, timeout=timeout, wait=wait, **kwargs).result()
+
+    def map_chunks(self, fn, items: list, *args, timeout: float = None, wait: float = None) -> list:
+        """
+        Splits items into as many chunks as slots it gets and runs fn(chunk, *args) on each in parallel.
+        fn returns one result per item of its chunk; the results come back in the order of items.
+
+        Only the first slot is waited for (`wait` as in submit); more are taken only if they are free
+        right now. Waiting for a second slot while holding one would deadlock two callers that each
+        hold part of the slots.
+        """
+        if not items:
+            return []
+
+        self._acquire(wait)
+        slots = 1
+        while slots < min(len(items), self.settings["max_workers"]) and self._slots.acquire(blocking=False):
+            slots += 1
+
+        chunks = [items[i::slots] for i in range(slots)]
+        unstarted, tasks = slots, []
+        try:
+            for chunk in chunks:
+                unstarted -= 1
+                tasks.append(self._start(fn, (chunk, *args), {}, timeout))
+            chunk_results = [task.result() for task in tasks]
+        finally:
+            for _ in range(unstarted):
+                self._release()
+            for task in tasks:
+                task.cancel()
+
+        results = [None] * len(items)
+        for i, chunk_result in enumerate(chunk_results):
+            results[i::slots] = chunk_result
+        return results
+
+
+compute_executor = ComputeExecutor()
@@ -0,0 +1,50 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    """
+    Runs callables outside the request thread, each one inside its own application context.
+
+    Jobs run inline when the app sets JOBS_RUN_SYNC (testing), so their effects can be
+    asserted right after the request that queued them.
+    """
+
+    def __init__(self):
+        self._executor = None
+
+    def _get_executor(self, app) -> ThreadPoolExecutor:
+        # Created lazily so every gunicorn worker gets its own pool after forking
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=app.config.get("JOBS_MAX_WORKERS", 2), thread_name_prefix="job"
+            )
+        return self._executor
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    logger.exception(f"Background job {fn.__qualname__} failed")
+                    raise
+
+        if app.config.get("JOBS_RUN_SYNC", False):
+            future = Future()
+            try:
+                future.set_result(run())
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+
+        return self._get_executor(app).submit(run)
+
+
+job_runner = JobRunner()
@@ -1,5 +1,8 @@
 import os
 import secrets
+import tempfile
+
+from core.database.routing import replica_binds
 
 
 class ConfigManager:
@@ -20,6 +23,23 @@ class ConfigManager:
             self.app.config.from_object(DevelopmentConfig)
 
 
+def engine_options(pool_size: int, max_overflow: int) -> dict:
+    """Pool settings for every engine (primary and replicas); each value can be overridden from the env."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", str(pool_size))),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", str(max_overflow))),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Recycle connections before MariaDB's wait_timeout closes them, and ping on checkout to
+        # discard the ones dropped anyway (server restarts, failovers)
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+
+def _replica_uris() -> list:
+    return [uri.strip() for uri in os.getenv("SQLALCHEMY_REPLICA_URIS", "").split(",") if uri.strip()]
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_bytes())
     SQLALCHEMY_DATABASE_URI = (
@@ -30,13 +50,52 @@ class Config:
         f"{os.getenv('MARIADB_DATABASE', 'default_db')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=10, max_overflow=20)
+    # Read replicas (comma-separated URIs) for the repository methods marked @reads_from_replica
+    SQLALCHEMY_BINDS = replica_binds(_replica_uris())
+    SQLALCHEMY_REPLICA_LAG_WINDOW = float(os.getenv("SQLALCHEMY_REPLICA_LAG_WINDOW", "5"))
     TIMEZONE = "Europe/Madrid"
     TEMPLATES_AUTO_RELOAD = True
     UPLOAD_FOLDER = "uploads"
+    JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+    JOBS_RUN_SYNC = False
+    MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(os.getenv("WORKING_DIR", ""), "cache", "models"))
+    MODEL_CACHE_MEMORY_BYTES = int(os.getenv("MODEL_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+    FILE_STORE_DIR = os.getenv("FILE_STORE_DIR", os.path.join(os.getenv("WORKING_DIR", ""), "cache", "files"))
+    FILE_STORE_MAX_BYTES = int(os.getenv("FILE_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+    SESSION_CACHE_BACKEND = os.getenv("SESSION_CACHE_BACKEND", "local")
+    SESSION_CACHE_REDIS_URL = os.getenv("SESSION_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "30"))
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+    STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT")
+    STORAGE_CACHE_DIR = os.getenv("STORAGE_CACHE_DIR", os.path.join(os.getenv("WORKING_DIR", ""), "cache", "storage"))
+    S3_BUCKET = os.getenv("S3_BUCKET")
+    S3_PREFIX = os.getenv("S3_PREFIX", "")
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+    S3_REGION = os.getenv("S3_REGION")
+    S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY")
+    FLAMAPY_ANALYSIS_TIMEOUT = int(os.getenv("FLAMAPY_ANALYSIS_TIMEOUT", "60"))
+    FLAMAPY_MAX_SAMPLE_SIZE = int(os.getenv("FLAMAPY_MAX_SAMPLE_SIZE", "10000"))
+    FLAMAPY_SAMPLE_TIMEOUT = float(os.getenv("FLAMAPY_SAMPLE_TIMEOUT", "60"))
+    COMPUTE_MAX_WORKERS = int(os.getenv("COMPUTE_MAX_WORKERS", str(os.cpu_count() or 1)))
+    COMPUTE_MAX_QUEUE = int(os.getenv("COMPUTE_MAX_QUEUE", "16"))
+    COMPUTE_QUEUE_TIMEOUT = float(os.getenv("COMPUTE_QUEUE_TIMEOUT", "5"))
+    COMPUTE_TASK_TIMEOUT = float(os.getenv("COMPUTE_TASK_TIMEOUT", "60"))
+    COMPUTE_TASK_MEMORY_MB = int(os.getenv("COMPUTE_TASK_MEMORY_MB", "1024"))
+    COMPUTE_RETRY_AFTER = int(os.getenv("COMPUTE_RETRY_AFTER", "10"))
+    FLAMAPY_PRECOMPUTE_EXPORTS = os.getenv("FLAMAPY_PRECOMPUTE_EXPORTS", "true").lower() == "true"
+    # Per-request query stats: a SELECT repeated this many times is logged as a likely N+1
+    QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "true").lower() == "true"
+    QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5"))
+    QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", "50"))
+    QUERY_SERVER_TIMING = False
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    QUERY_SERVER_TIMING = True
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=5, max_overflow=5)
 
 
 class TestingConfig(Config):
@@ -48,8 +107,16 @@ class TestingConfig(Config):
         f"{os.getenv('MARIADB_PORT', '3306')}/"
         f"{os.getenv('MARIADB_TEST_DATABASE', 'default_db')}"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=5, max_overflow=0)
+    SQLALCHEMY_BINDS = {}
     WTF_CSRF_ENABLED = False
+    JOBS_RUN_SYNC = True
+    # Tests recreate the database and reuse ids; the tests that need the cache enable it themselves
+    SESSION_CACHE_TTL = 0
+    MODEL_CACHE_DIR = os.path.join(tempfile.gettempdir(), "formulahub_test_cache", "models")
+    FILE_STORE_DIR = os.path.join(tempfile.gettempdir(), "formulahub_test_cache", "files")
 
 
 class ProductionConfig(Config):
     DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=20, max_overflow=30)
@@ -1,4 +1,6 @@
-from flask import render_template
+from flask import jsonify, render_template
+
+from core.jobs.compute_executor import ComputeBusyError, ComputeTimeoutError
 
 
 class ErrorHandlerManager:
@@ -25,3 +27,16 @@ class ErrorHandlerManager:
         def bad_request_error(e):
             self.app.logger.warning("Bad Request: %s", str(e))
             return render_template("400.html"), 400
+
+        @self.app.errorhandler(ComputeBusyError)
+        def compute_busy_error(e):
+            self.app.logger.warning("Compute executor busy: %s", str(e))
+            response = jsonify({"error": str(e)})
+            response.status_code = 503
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response
+
+        @self.app.errorhandler(ComputeTimeoutError)
+        def compute_timeout_error(e):
+            self.app.logger.warning("Compute task timed out: %s", str(e))
+            return jsonify({"error": str(e)}), 504
@@ -0,0 +1,50 @@
+from flask import g, request
+
+from core.database.instrumentation import QueryStats, start_collecting, stop_collecting
+
+
+class QueryInstrumentationManager:
+    """
+    Counts the queries of every request, logs routes that repeat the same SELECT (likely N+1 from lazy
+    relationships) or run too many queries, and adds a Server-Timing header with the SQL time when
+    QUERY_SERVER_TIMING is enabled (development).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def register_hooks(self):
+        if not self.app.config.get("QUERY_INSTRUMENTATION", True):
+            return
+
+        @self.app.before_request
+        def start_query_stats():
+            g.query_stats = QueryStats()
+            g.query_stats_token = start_collecting(g.query_stats)
+
+        @self.app.after_request
+        def report_query_stats(response):
+            stats = g.get("query_stats")
+            if stats is None:
+                return response
+
+            self.log_query_stats(stats)
+            if self.app.config.get("QUERY_SERVER_TIMING"):
+                response.headers.add(
+                    "Server-Timing", f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                )
+            return response
+
+        @self.app.teardown_request
+        def stop_query_stats(exception=None):
+            token = g.pop("query_stats_token", None)
+            if token is not None:
+                stop_collecting(token)
+
+    def log_query_stats(self, stats: QueryStats):
+        route = f"{request.method} {request.path}"
+        for shape, times in stats.repeated_selects(self.app.config.get("QUERY_N_PLUS_ONE_THRESHOLD", 5)):
+            self.app.logger.warning(f"Possible N+1 on {route}: {times}x {shape[:300]}")
+
+        if stats.count > self.app.config.get("QUERY_COUNT_WARNING", 50):
+            self.app.logger.warning(f"{route} ran {stats.count} queries ({stats.duration * 1000:.1f} ms)")
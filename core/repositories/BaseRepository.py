@@ -1,4 +1,8 @@
-from typing import Generic, List, NoReturn, Optional, TypeVar, Union
+from typing import Generic, Iterable, Iterator, List, NoReturn, Optional, Sequence, Tuple, TypeVar, Union
+
+from sqlalchemy import and_, delete, insert, inspect, or_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import RelationshipDirection
 
 import app
 
@@ -48,6 +52,10 @@ class BaseRepository(Generic[T]):
         return False
 
     def delete_by_column(self, column_name: str, value) -> bool:
+        if self._can_delete_in_bulk():
+            return self.delete_where(getattr(self.model, column_name) == value) > 0
+
+        # Inheritance or cascading relationships: the ORM has to see every instance
         instances: List[T] = self.get_by_column(column_name, value)
         if not instances:
             return False
@@ -57,5 +65,145 @@ class BaseRepository(Generic[T]):
         self.session.commit()
         return True
 
+    def bulk_create(self, rows: Iterable[dict], return_ids: bool = False, commit: bool = True) -> Optional[List[int]]:
+        """
+        Inserts every row with a single executemany INSERT (no per-row flush). With return_ids, returns
+        the new primary keys in the order of ``rows``, using RETURNING where the database has it
+        (MariaDB >= 10.5).
+        """
+        rows = list(rows)
+        ids = []
+        if rows:
+            if not return_ids:
+                self.session.execute(insert(self.model), rows)
+            elif self._dialect().insert_executemany_returning_sort_by_parameter_order:
+                statement = insert(self.model).returning(self._primary_key(), sort_by_parameter_order=True)
+                ids = list(self.session.scalars(statement, rows))
+            else:
+                # Without RETURNING each row needs its own INSERT to learn its autoincrement id
+                table_insert = insert(self.model.__table__)
+                ids = [self.session.execute(table_insert.values(**row)).inserted_primary_key[0] for row in rows]
+        self._finish(commit)
+        return ids if return_ids else None
+
+    def bulk_update(self, rows: Iterable[dict], commit: bool = True) -> None:
+        """Updates rows by primary key (each dict must include it) with one executemany UPDATE."""
+        rows = list(rows)
+        if rows:
+            self.session.execute(update(self.model), rows)
+        self._finish(commit)
+
+    def upsert(self, rows: Iterable[dict], update_columns: Optional[List[str]] = None, commit: bool = True) -> None:
+        """
+        INSERT ... ON DUPLICATE KEY UPDATE (MariaDB/MySQL). Rows clashing with the primary key or a
+        unique constraint update ``update_columns`` (by default every column given except the key).
+        """
+        rows = list(rows)
+        if rows:
+            if self._dialect().name not in ("mysql", "mariadb"):
+                raise NotImplementedError("upsert() relies on ON DUPLICATE KEY UPDATE (MariaDB/MySQL)")
+
+            primary_key = self._primary_key().key
+            if update_columns is None:
+                update_columns = [column for column in rows[0] if column != primary_key]
+
+            statement = mysql_insert(self.model.__table__)
+            statement = statement.on_duplicate_key_update(
+                {column: statement.inserted[column] for column in update_columns}
+            )
+            self.session.execute(statement, rows)
+        self._finish(commit)
+
+    def delete_where(self, *criteria, commit: bool = True) -> int:
+        """
+        Set-based DELETE ... WHERE; returns the number of rows deleted. It bypasses ORM cascades, so
+        dependent rows are left to the database foreign keys.
+        """
+        result = self.session.execute(
+            delete(self.model).where(*criteria).execution_options(synchronize_session="fetch")
+        )
+        self._finish(commit)
+        return result.rowcount
+
+    def paginate_keyset(
+        self, order_by: Optional[str] = None, after: Optional[Sequence] = None, limit: int = 100, query=None
+    ) -> Tuple[list, Optional[list]]:
+        """
+        Returns up to ``limit`` rows that come after the ``after`` position, plus the position of the next
+        page (None on the last one). Rows are ordered by ``order_by`` (an attribute name, "-name" for
+        descending, the primary key by default) with the primary key as tie-breaker. Pages are selected with
+        a WHERE on those keys instead of an OFFSET, so the last page costs the same as the first.
+        ``query`` narrows the rows; it defaults to every row of the model.
+        """
+        keys = self._keyset_keys(order_by)
+        query = self.model.query if query is None else query
+        if after is not None:
+            query = query.filter(self._after(keys, after))
+        query = query.order_by(*(column.desc() if descending else column.asc() for column, descending in keys))
+
+        rows = query.limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, [getattr(rows[-1], column.key) for column, _ in keys]
+
+    def iter_batches(self, batch_size: int = 1000, order_by: Optional[str] = None, query=None) -> Iterator[list]:
+        """
+        Yields every row in lists of at most ``batch_size``, so memory is bounded by the batch size rather
+        than by the table. Each batch is its own keyset query instead of one long server-side cursor: the
+        connection is released between batches and callers may commit while they iterate.
+        """
+        after = None
+        while True:
+            rows, after = self.paginate_keyset(order_by, after, batch_size, query)
+            if rows:
+                yield rows
+            if after is None:
+                return
+
+    def _finish(self, commit: bool):
+        if commit:
+            self.session.commit()
+        else:
+            self.session.flush()
+
+    def _dialect(self):
+        return self.session.get_bind(self.model).dialect
+
+    def _primary_key(self):
+        return inspect(self.model).primary_key[0]
+
+    def _keyset_keys(self, order_by: Optional[str]) -> list:
+        primary_key = getattr(self.model, self._primary_key().key)
+        if not order_by:
+            return [(primary_key, False)]
+
+        descending = order_by.startswith("-")
+        column = getattr(self.model, order_by.lstrip("-"))
+        if column.key == primary_key.key:
+            return [(primary_key, descending)]
+        return [(column, descending), (primary_key, descending)]
+
+    @staticmethod
+    def _after(keys: list, after: Sequence):
+        if len(after) != len(keys):
+            raise ValueError(f"Keyset position must have {len(keys)} values, got {len(after)}")
+
+        # (a, b) > (x, y) spelled out as a > x OR (a = x AND b > y), which MariaDB resolves with the index
+        clauses = []
+        for index, (column, descending) in enumerate(keys):
+            previous_equal = [keys[i][0] == after[i] for i in range(index)]
+            clauses.append(and_(*previous_equal, column < after[index] if descending else column > after[index]))
+        return or_(*clauses)
+
+    def _can_delete_in_bulk(self) -> bool:
+        mapper = inspect(self.model)
+        if mapper.inherits is not None or mapper.polymorphic_map:
+            return False
+        return all(
+            relationship.direction is RelationshipDirection.MANYTOONE and not relationship.cascade.delete
+            for relationship in mapper.relationships
+        )
+
     def count(self) -> int:
         return self.model.query.count()
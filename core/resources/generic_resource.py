@@ -1,9 +1,15 @@
+import base64
+import json
 from datetime import datetime
+from urllib.parse import urlencode
 
-from flask import request
+from flask import Response, current_app, request, stream_with_context
 from flask_restful import Resource
+from werkzeug.http import generate_etag
 
 from app import db
+from core.repositories.BaseRepository import BaseRepository
+from core.serialisers.serializer import encode
 
 
 def convert_value(value):
@@ -12,21 +18,125 @@ def convert_value(value):
     return value
 
 
+def encode_cursor(after) -> str:
+    return base64.urlsafe_b64encode(json.dumps(after).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except ValueError:
+        after = None
+    if not isinstance(after, list):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def _split_arg(name) -> list:
+    return [value.strip() for value in request.args.get(name, "").split(",") if value.strip()]
+
+
 class GenericResource(Resource):
-    def __init__(self, model, serializer):
+    """
+    REST endpoints for a model.
+
+    Collections are paginated by primary key with ``?limit=`` (default 100, at most 1000) and ``?cursor=``
+    (the ``next_cursor`` of the previous page); ``?limit=all`` streams every row in batches instead.
+    ``?fields=a,b`` returns only those fields and ``?include=`` adds fields with a related serializer,
+    which are left out by default. Items and pages carry an ETag and answer ``If-None-Match`` with 304.
+    Last-Modified is the newest ``created_at`` of the items and is informative only: edits do not move
+    it, so conditional requests are decided by the ETag alone.
+    """
+
+    # Rows loaded per query while streaming a collection
+    batch_size = 500
+    default_limit = 100
+    max_limit = 1000
+
+    def __init__(self, model, serializer, query=None):
         self.model = model
         self.model_name = model.__name__
         self.serializer = serializer
+        self.repository = BaseRepository(model)
+        # query(fields) -> Query that loads what the requested fields need
+        self.query = query
 
     def get(self, id=None):
+        try:
+            fields = self._requested_fields()
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        query = self.query(fields) if self.query else self.model.query
+
         if id:
-            item = self.model.query.get(id)
+            item = query.filter(self.model.id == id).first()
             if not item:
                 return {"message": f"{self.model_name} not found"}, 404
-            return self.serializer.serialize(item), 200
+            return self._conditional_response(self.serializer.rows([item], fields)[0], [item])
+
+        if request.args.get("limit") == "all":
+            return Response(stream_with_context(self._stream_collection(query, fields)), mimetype="application/json")
+
+        try:
+            limit = self._limit(request.args.get("limit"))
+            items, after = self.repository.paginate_keyset(
+                after=decode_cursor(request.args.get("cursor")), limit=limit, query=query
+            )
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        next_cursor = encode_cursor(after) if after else None
+        payload = {"items": self.serializer.rows(items, fields), "next_cursor": next_cursor}
+        response = self._conditional_response(payload, items)
+        if next_cursor:
+            next_url = f"{request.base_url}?{urlencode({**request.args.to_dict(), 'cursor': next_cursor})}"
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return response
+
+    def _requested_fields(self) -> set:
+        known = self.serializer.serialization_fields
+        fields = _split_arg("fields") or [key for key in known if key not in self.serializer.related_serializers]
+        include = _split_arg("include")
+
+        unknown = [field for field in fields + include if field not in known]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(known)}")
+        return set(fields) | set(include)
+
+    def _limit(self, value) -> int:
+        if value is None:
+            return self.default_limit
+        if not value.isdigit() or not 1 <= int(value) <= self.max_limit:
+            raise ValueError(f"limit must be between 1 and {self.max_limit}, or 'all'")
+        return int(value)
+
+    def _conditional_response(self, payload, items):
+        body = encode(payload)
+        etag = generate_etag(body)
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
         else:
-            items = self.model.query.all()
-            return {"items": [self.serializer.serialize(i) for i in items]}, 200
+            response = current_app.response_class(body + b"\n", mimetype="application/json")
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+
+        created = [item.created_at for item in items if getattr(item, "created_at", None)]
+        if created:
+            response.last_modified = max(created)
+        return response
+
+    def _stream_collection(self, query, fields):
+        """Writes {"items": [...]} one batch at a time, so memory does not grow with the table."""
+        yield b'{"items":['
+        separator = b""
+        for batch in self.repository.iter_batches(self.batch_size, query=query):
+            # Each batch is encoded as one JSON array and written without its brackets
+            yield separator + encode(self.serializer.rows(batch, fields))[1:-1]
+            separator = b","
+        yield b"]}\n"
 
     def post(self):
         data = request.get_json()
@@ -63,9 +173,9 @@ class GenericResource(Resource):
         return {"message": f"{self.model_name} deleted successfully"}, 204
 
 
-def create_resource(model, serialization_fields=None):
+def create_resource(model, serialization_fields=None, query=None):
     class Resource(GenericResource):
         def __init__(self):
-            super().__init__(model, serialization_fields)
+            super().__init__(model, serialization_fields, query)
 
     return Resource
@@ -1,6 +1,7 @@
 from sqlalchemy.exc import IntegrityError
 
 from app import db
+from core.repositories.BaseRepository import BaseRepository
 
 
 class BaseSeeder:
@@ -36,3 +37,19 @@ class BaseSeeder:
 
         # After committing, the `data` objects should have their IDs assigned.
         return data
+
+    def bulk_seed(self, model, rows, return_ids=False):
+        """
+        Inserts a list of rows (dicts of column values) with a single bulk INSERT and commits.
+        Throws an exception if data insertion fails.
+
+        :param model: Model class of the rows.
+        :param rows: List of dicts to insert.
+        :param return_ids: Whether to return the primary keys of the new rows, in order.
+        :return: List of IDs if return_ids, otherwise None.
+        """
+        try:
+            return BaseRepository(model).bulk_create(rows, return_ids=return_ids)
+        except IntegrityError as e:
+            self.db.session.rollback()
+            raise Exception(f"Failed to insert data into `{model.__table__.name}` table. Error: {e}")
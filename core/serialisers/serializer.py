@@ -1,4 +1,11 @@
-from datetime import datetime
+import inspect
+from datetime import date, datetime
+from operator import attrgetter, methodcaller
+
+import msgspec
+from sqlalchemy.orm import ColumnProperty, QueryableAttribute
+
+_encoder = msgspec.json.Encoder()
 
 
 def convert_value(value):
@@ -7,25 +14,105 @@ def convert_value(value):
     return value
 
 
+def encode(payload) -> bytes:
+    """
+    JSON-encodes ``payload`` with msgspec. Naive datetimes are written natively in the same ISO 8601
+    format convert_value produces; aware ones are not (msgspec writes UTC as ``Z``, isoformat() as
+    ``+00:00``), which is why Serializer.rows() only leaves naive DateTime columns unconverted.
+    """
+    return _encoder.encode(payload)
+
+
 class Serializer:
+    """
+    Turns model instances into dicts following ``serialization_fields`` ({output key: attribute name}).
+    Methods are called and fields listed in ``related_serializers`` are serialized with their own serializer.
+
+    The field map is compiled once per model class and field selection into a tuple of getters (and
+    converters where the column type needs one), so serializing an instance does no per-field lookups.
+    """
+
     def __init__(self, serialization_fields, related_serializers=None):
         self.serialization_fields = serialization_fields
         self.related_serializers = related_serializers or {}
+        self._plans = {}
+
+    def serialize(self, instance, fields=None):
+        """Serializes ``fields`` (all of them by default); attributes of other fields are never touched."""
+        return self._row(instance, _fields_key(fields), False)
+
+    def rows(self, instances, fields=None) -> list:
+        """Like serialize() for many instances, but keeping naive DateTime columns native for encode()."""
+        fields = _fields_key(fields)
+        return [self._row(instance, fields, True) for instance in instances]
+
+    def _row(self, instance, fields, native):
+        if instance is None:
+            return None
+        return {key: get(instance) for key, get in self._plan(type(instance), fields, native)}
+
+    def _plan(self, cls, fields, native):
+        plan = self._plans.get((cls, fields, native))
+        if plan is None:
+            plan = tuple(
+                (key, self._compile_field(cls, key, attr_name, native))
+                for key, attr_name in self.serialization_fields.items()
+                if fields is None or key in fields
+            )
+            self._plans[(cls, fields, native)] = plan
+        return plan
+
+    def _compile_field(self, cls, key, attr_name, native):
+        class_attr = getattr(cls, attr_name, None)
+        if class_attr is None:
+            # Only known per instance: resolve it the slow way every time
+            get = _dynamic_getter(attr_name)
+        elif inspect.isroutine(class_attr):
+            get = methodcaller(attr_name)
+        else:
+            get = attrgetter(attr_name)
+
+        related = self.related_serializers.get(key)
+        if related is not None:
+
+            def get_related(instance):
+                value = get(instance)
+                if isinstance(value, list):
+                    return [related._row(item, None, native) for item in value]
+                return related._row(value, None, native)
+
+            return get_related
+
+        convert = _converter(class_attr, native)
+        if convert is None:
+            return get
+        return lambda instance: convert(get(instance))
+
+
+def _fields_key(fields):
+    return None if fields is None else frozenset(fields)
+
+
+def _dynamic_getter(attr_name):
+    def get(instance):
+        value = getattr(instance, attr_name, None)
+        return value() if callable(value) else value
+
+    return get
+
 
-    def serialize(self, instance):
-        serialized_data = {}
-        for key, attr_name in self.serialization_fields.items():
-            if key in self.related_serializers:
-                related_data = getattr(instance, attr_name)()
-                if isinstance(related_data, list):
-                    serialized_data[key] = [
-                        self.related_serializers[key].serialize(sub_instance) for sub_instance in related_data
-                    ]
-                else:
-                    serialized_data[key] = self.related_serializers[key].serialize(related_data)
-            else:
-                attr = getattr(instance, attr_name, None)
-                if callable(attr):
-                    attr = attr()
-                serialized_data[key] = convert_value(attr)
-        return serialized_data
+def _converter(class_attr, native=False):
+    # Columns of a known non-date type are already JSON-ready, and for encode() so are naive DateTime
+    # columns; anything else, which may hold aware datetimes, goes through convert_value
+    if isinstance(class_attr, QueryableAttribute) and isinstance(class_attr.property, ColumnProperty):
+        column_type = class_attr.type
+        try:
+            python_type = column_type.python_type
+        except NotImplementedError:
+            return convert_value
+        if not issubclass(python_type, (date, datetime)):
+            return None
+        if native and issubclass(python_type, datetime) and not getattr(column_type, "timezone", False):
+            return None
+        return convert_value
+    return convert_value
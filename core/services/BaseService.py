@@ -23,6 +23,24 @@ class BaseService:
     def delete(self, id):
         return self.repository.delete(id)
 
+    def bulk_create(self, rows, return_ids=False, commit=True):
+        return self.repository.bulk_create(rows, return_ids=return_ids, commit=commit)
+
+    def bulk_update(self, rows, commit=True):
+        return self.repository.bulk_update(rows, commit=commit)
+
+    def upsert(self, rows, update_columns=None, commit=True):
+        return self.repository.upsert(rows, update_columns=update_columns, commit=commit)
+
+    def paginate_keyset(self, order_by=None, after=None, limit=100, query=None):
+        return self.repository.paginate_keyset(order_by=order_by, after=after, limit=limit, query=query)
+
+    def iter_batches(self, batch_size=1000, order_by=None, query=None):
+        return self.repository.iter_batches(batch_size=batch_size, order_by=order_by, query=query)
+
+    def delete_where(self, *criteria, commit=True):
+        return self.repository.delete_where(*criteria, commit=commit)
+
     def handle_service_response(self, result, errors, success_url_redirect, success_msg, error_template, form):
         if result:
             flash(success_msg, "success")
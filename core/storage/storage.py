@@ -0,0 +1,239 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_file_key(user_id: int, dataset_id: int, name: str) -> str:
+    """Storage key of a dataset file; the same layout the uploads folder has always used."""
+    return f"user_{user_id}/dataset_{dataset_id}/{name}"
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    key: str
+    size: int
+    mtime: float
+
+
+class StorageBackend:
+    """
+    Where uploaded files live. Keys are relative, "/"-separated paths. Files are immutable once
+    stored, which lets remote backends keep local copies (local_path) without invalidation.
+    """
+
+    def put(self, key: str, source_path: str, move: bool = False) -> str:
+        raise NotImplementedError
+
+    def open(self, key: str, mode: str = "rb"):
+        raise NotImplementedError
+
+    def stat(self, key: str) -> StoredFile:
+        """Raises FileNotFoundError if the key does not exist."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.stat(key)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def link(self, source_key: str, dest_key: str) -> str:
+        """Makes dest_key refer to the same content as source_key, without reading it."""
+        raise NotImplementedError
+
+    def url(self, key: str, expires: int = 3600):
+        """Direct download URL, or None when files must be served by the app."""
+        return None
+
+    def local_path(self, key: str) -> str:
+        """Path of a local copy of the file, for libraries that only read from disk."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key '{key}'")
+        return path
+
+    def put(self, key, source_path, move=False):
+        path = self._path(key)
+        if os.path.abspath(source_path) == path:
+            return key
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if move:
+            shutil.move(source_path, path)
+        else:
+            shutil.copy2(source_path, path)
+        return key
+
+    def open(self, key, mode="rb"):
+        return open(self._path(key), mode)
+
+    def stat(self, key):
+        stat = os.stat(self._path(key))
+        return StoredFile(key=key, size=stat.st_size, mtime=stat.st_mtime)
+
+    def link(self, source_key, dest_key):
+        source, dest = self._path(source_key), self._path(dest_key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            os.link(source, dest)
+        except OSError:
+            # Otro sistema de ficheros, o no admite hard links
+            shutil.copy2(source, dest)
+        return dest_key
+
+    def local_path(self, key):
+        return self._path(key)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage (AWS S3, MinIO...). boto3 is only needed when this backend is
+    configured. Files read through local_path() are downloaded once into cache_dir.
+    """
+
+    def __init__(self, bucket: str, cache_dir: str, prefix: str = "", client=None, **client_options):
+        self.bucket = bucket
+        self.cache_dir = cache_dir
+        self.prefix = prefix.strip("/")
+        self._client = client
+        self._client_options = client_options
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise RuntimeError("The S3 storage backend requires boto3 (pip install boto3)") from exc
+            self._client = boto3.client("s3", **self._client_options)
+        return self._client
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key, source_path, move=False):
+        self.client.upload_file(source_path, self.bucket, self._object_key(key))
+        if move:
+            os.remove(source_path)
+        return key
+
+    def open(self, key, mode="rb"):
+        return open(self.local_path(key), mode)
+
+    def stat(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(key) from exc
+            raise
+        return StoredFile(key=key, size=head["ContentLength"], mtime=head["LastModified"].timestamp())
+
+    def link(self, source_key, dest_key):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=self._object_key(dest_key),
+            CopySource={"Bucket": self.bucket, "Key": self._object_key(source_key)},
+        )
+        return dest_key
+
+    def url(self, key, expires=3600):
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._object_key(key)}, ExpiresIn=expires
+        )
+
+    def local_path(self, key):
+        digest = hashlib.sha256(self._object_key(key).encode("utf-8")).hexdigest()
+        path = os.path.join(self.cache_dir, digest[:2], f"{digest}{os.path.splitext(key)[1]}")
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self.client.download_file(self.bucket, self._object_key(key), temp_path)
+            os.replace(temp_path, path)
+        except Exception as exc:
+            from botocore.exceptions import ClientError
+
+            if isinstance(exc, ClientError) and exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise FileNotFoundError(key) from exc
+            raise
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return path
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+
+class Storage:
+    """
+    Application storage, backed by the backend selected in STORAGE_BACKEND ("local" or "s3").
+    The backend is built on first use from the app config, so every gunicorn worker (and every
+    app node, with a shared backend) resolves the same key to the same file.
+    """
+
+    def __init__(self, backend: StorageBackend = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = self._build_backend(current_app.config)
+        return self._backend
+
+    @staticmethod
+    def _build_backend(config) -> StorageBackend:
+        kind = config.get("STORAGE_BACKEND", "local")
+        if kind == "local":
+            root = config.get("STORAGE_LOCAL_ROOT") or os.path.join(os.getenv("WORKING_DIR", ""), "uploads")
+            return LocalStorage(root)
+        if kind == "s3":
+            client_options = {
+                "endpoint_url": config.get("S3_ENDPOINT_URL"),
+                "region_name": config.get("S3_REGION"),
+                "aws_access_key_id": config.get("S3_ACCESS_KEY_ID"),
+                "aws_secret_access_key": config.get("S3_SECRET_ACCESS_KEY"),
+            }
+            return S3Storage(
+                bucket=config["S3_BUCKET"],
+                cache_dir=config.get("STORAGE_CACHE_DIR") or os.path.join("cache", "storage"),
+                prefix=config.get("S3_PREFIX", ""),
+                **{name: value for name, value in client_options.items() if value},
+            )
+        raise ValueError(f"Unknown STORAGE_BACKEND '{kind}'")
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+storage = Storage()
@@ -0,0 +1,24 @@
+"""add checksum to formula_file
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:12:41.503217
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("formula_file", sa.Column("checksum", sa.String(length=120), nullable=True))
+
+
+def downgrade():
+    op.drop_column("formula_file", "checksum")
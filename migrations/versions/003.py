@@ -0,0 +1,26 @@
+"""add row_count and column_schema to formula_file
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 11:02:17.284530
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("formula_file", sa.Column("row_count", sa.Integer(), nullable=True))
+    op.add_column("formula_file", sa.Column("column_schema", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("formula_file", "column_schema")
+    op.drop_column("formula_file", "row_count")
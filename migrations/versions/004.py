@@ -0,0 +1,35 @@
+"""add uvl_validation table
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 13:40:05.918272
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "uvl_validation",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("checksum", sa.String(length=120), nullable=False),
+        sa.Column("validator_version", sa.String(length=50), nullable=False),
+        sa.Column("valid", sa.Boolean(), nullable=False),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column("parse_time_ms", sa.Float(), nullable=True),
+        sa.Column("validated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("checksum"),
+    )
+
+
+def downgrade():
+    op.drop_table("uvl_validation")
@@ -0,0 +1,79 @@
+"""typed feature model and dataset metrics
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 15:21:48.662013
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("fm_metrics", sa.Column("number_of_features", sa.Integer(), nullable=True))
+    op.add_column("fm_metrics", sa.Column("number_of_constraints", sa.Integer(), nullable=True))
+    op.add_column("fm_metrics", sa.Column("tree_depth", sa.Integer(), nullable=True))
+    op.add_column("fm_metrics", sa.Column("core_features", sa.Integer(), nullable=True))
+    op.add_column("fm_metrics", sa.Column("dead_features", sa.Integer(), nullable=True))
+    op.add_column("fm_metrics", sa.Column("number_of_configurations", sa.Float(), nullable=True))
+    op.add_column("fm_metrics", sa.Column("analysis_status", sa.String(length=20), nullable=True))
+    op.add_column("fm_metrics", sa.Column("analysis_errors", sa.JSON(), nullable=True))
+    op.add_column("fm_metrics", sa.Column("analyzed_at", sa.DateTime(), nullable=True))
+
+    # Los valores existentes son texto numérico ("5", "50"); cualquier otro valor se descarta
+    op.execute("UPDATE ds_metrics SET number_of_models = NULL WHERE number_of_models NOT REGEXP '^[0-9]+$'")
+    op.execute("UPDATE ds_metrics SET number_of_features = NULL WHERE number_of_features NOT REGEXP '^[0-9]+$'")
+    op.alter_column(
+        "ds_metrics",
+        "number_of_models",
+        existing_type=sa.String(length=120),
+        type_=sa.Integer(),
+        existing_nullable=True,
+    )
+    op.alter_column(
+        "ds_metrics",
+        "number_of_features",
+        existing_type=sa.String(length=120),
+        type_=sa.Integer(),
+        existing_nullable=True,
+    )
+    op.add_column("ds_metrics", sa.Column("number_of_constraints", sa.Integer(), nullable=True))
+    op.add_column("ds_metrics", sa.Column("number_of_configurations", sa.Float(), nullable=True))
+    op.add_column("ds_metrics", sa.Column("max_tree_depth", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("ds_metrics", "max_tree_depth")
+    op.drop_column("ds_metrics", "number_of_configurations")
+    op.drop_column("ds_metrics", "number_of_constraints")
+    op.alter_column(
+        "ds_metrics",
+        "number_of_features",
+        existing_type=sa.Integer(),
+        type_=sa.String(length=120),
+        existing_nullable=True,
+    )
+    op.alter_column(
+        "ds_metrics",
+        "number_of_models",
+        existing_type=sa.Integer(),
+        type_=sa.String(length=120),
+        existing_nullable=True,
+    )
+
+    op.drop_column("fm_metrics", "analyzed_at")
+    op.drop_column("fm_metrics", "analysis_errors")
+    op.drop_column("fm_metrics", "analysis_status")
+    op.drop_column("fm_metrics", "number_of_configurations")
+    op.drop_column("fm_metrics", "dead_features")
+    op.drop_column("fm_metrics", "core_features")
+    op.drop_column("fm_metrics", "tree_depth")
+    op.drop_column("fm_metrics", "number_of_constraints")
+    op.drop_column("fm_metrics", "number_of_features")
@@ -0,0 +1,35 @@
+"""add uvl_feature_index table
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 18:12:44.305118
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "uvl_feature_index",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("hubfile_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(["hubfile_id"], ["file.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("hubfile_id", "kind", "name", name="uq_uvl_feature_index_entry"),
+    )
+    op.create_index("ix_uvl_feature_index_kind_name", "uvl_feature_index", ["kind", "name"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_uvl_feature_index_kind_name", table_name="uvl_feature_index")
+    op.drop_table("uvl_feature_index")
@@ -0,0 +1,36 @@
+"""persist storage keys of hubfiles and formula files
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 19:03:27.514820
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("file", sa.Column("storage_key", sa.String(length=512), nullable=True))
+    op.add_column("formula_file", sa.Column("storage_key", sa.String(length=512), nullable=True))
+
+    # Los UVL siempre han estado en uploads/user_X/dataset_Y/<nombre>. Los CSV existentes se dejan
+    # sin clave: algunos solo están en formula_examples y get_path() mantiene ese fallback.
+    op.execute(
+        "UPDATE file "
+        "JOIN feature_model ON file.feature_model_id = feature_model.id "
+        "JOIN data_set ON feature_model.uvl_dataset_id = data_set.id "
+        "SET file.storage_key = CONCAT('user_', data_set.user_id, '/dataset_', data_set.id, '/', file.name) "
+        "WHERE file.storage_key IS NULL"
+    )
+
+
+def downgrade():
+    op.drop_column("formula_file", "storage_key")
+    op.drop_column("file", "storage_key")
@@ -0,0 +1,63 @@
+"""index hot lookup columns
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 20:12:41.306518
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+# (nombre, tabla, columnas, opciones extra)
+INDEXES = [
+    ("ix_ds_meta_data_dataset_doi", "ds_meta_data", ["dataset_doi"], {}),
+    ("ix_ds_meta_data_deposition_id", "ds_meta_data", ["deposition_id"], {}),
+    ("ix_data_set_user_id_created_at", "data_set", ["user_id", "created_at"], {}),
+    ("ix_ds_download_record_lookup", "ds_download_record", ["dataset_id", "user_id", "download_cookie"], {}),
+    ("ix_ds_view_record_lookup", "ds_view_record", ["dataset_id", "user_id", "view_cookie"], {}),
+    ("ix_file_download_record_lookup", "file_download_record", ["file_id", "user_id", "download_cookie"], {}),
+    ("ix_file_view_record_lookup", "file_view_record", ["file_id", "user_id", "view_cookie"], {}),
+    (
+        "ix_user_session_lookup",
+        "user_session",
+        ["session_id", "flask_session_token", "user_id"],
+        {"mysql_length": {"flask_session_token": 255}},
+    ),
+    (
+        "ix_user_session_token_user",
+        "user_session",
+        ["flask_session_token", "user_id"],
+        {"mysql_length": {"flask_session_token": 255}},
+    ),
+    ("ix_doi_mapping_dataset_doi_old", "doi_mapping", ["dataset_doi_old"], {}),
+]
+
+# InnoDB descarta el índice implícito de una foreign key en cuanto otro índice empieza por esa columna,
+# así que antes de borrar los compuestos hay que devolverle uno propio.
+FOREIGN_KEY_COLUMNS = [
+    ("data_set", "user_id"),
+    ("ds_download_record", "dataset_id"),
+    ("ds_view_record", "dataset_id"),
+    ("file_download_record", "file_id"),
+    ("file_view_record", "file_id"),
+]
+
+
+def upgrade():
+    for name, table, columns, options in INDEXES:
+        op.create_index(name, table, columns, unique=False, **options)
+
+
+def downgrade():
+    for table, column in FOREIGN_KEY_COLUMNS:
+        op.create_index(f"ix_{table}_{column}", table, [column], unique=False)
+
+    for name, table, _columns, _options in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,91 @@
+import json
+import time
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+
+
+def _legacy_serialize(serializer, instance, fields=None):
+    # Previous Serializer.serialize: getattr + callable check per field and instance
+    from core.serialisers.serializer import convert_value
+
+    serialized_data = {}
+    for key, attr_name in serializer.serialization_fields.items():
+        if fields is not None and key not in fields:
+            continue
+        if key in serializer.related_serializers:
+            related_data = getattr(instance, attr_name)()
+            serialized_data[key] = [
+                _legacy_serialize(serializer.related_serializers[key], sub_instance) for sub_instance in related_data
+            ]
+        else:
+            attr = getattr(instance, attr_name, None)
+            if callable(attr):
+                attr = attr()
+            serialized_data[key] = convert_value(attr)
+    return serialized_data
+
+
+def _build_datasets(count, files_per_dataset):
+    from app.modules.dataset.models import DSMetaData, PublicationType, UVLDataSet
+    from app.modules.featuremodel.models import FeatureModel
+    from app.modules.hubfile.models import Hubfile
+
+    now = datetime.utcnow()
+    datasets = []
+    for i in range(count):
+        meta = DSMetaData(title=f"Dataset {i}", description="Benchmark", publication_type=PublicationType.NONE)
+        feature_model = FeatureModel(
+            files=[
+                Hubfile(id=i * files_per_dataset + j, name=f"model_{i}_{j}.uvl", checksum="x", size=1024 * j)
+                for j in range(files_per_dataset)
+            ]
+        )
+        datasets.append(UVLDataSet(id=i, created_at=now, ds_meta_data=meta, feature_models=[feature_model]))
+    return datasets
+
+
+def _best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@click.command(
+    "serializer:benchmark",
+    help="Measures the dataset API serialization throughput against the previous Serializer + json encoder.",
+)
+@click.option("--count", default=10000, show_default=True, help="Number of datasets to serialize.")
+@click.option("--files", "files_per_dataset", default=3, show_default=True, help="Files per dataset.")
+@click.option("--fields", default=None, help="Comma-separated fields to serialize (default: all, files included).")
+@click.option("--repeat", default=3, show_default=True, help="Runs per implementation; the best one is reported.")
+@with_appcontext
+def serializer_benchmark(count, files_per_dataset, fields, repeat):
+    from flask import current_app
+
+    from app.modules.dataset.api import dataset_serializer
+    from core.serialisers.serializer import encode
+
+    fields = set(fields.split(",")) if fields else None
+    datasets = _build_datasets(count, files_per_dataset)
+
+    implementations = {
+        "previous (getattr per field + json.dumps)": lambda: json.dumps(
+            {"items": [_legacy_serialize(dataset_serializer, dataset, fields) for dataset in datasets]}
+        ).encode("utf-8"),
+        "compiled (field getters + msgspec)": lambda: encode({"items": dataset_serializer.rows(datasets, fields)}),
+    }
+
+    click.echo(click.style(f"Serializing {count} datasets with {files_per_dataset} files each...", fg="yellow"))
+    with current_app.test_request_context():
+        timings = {name: _best_of(repeat, implementation) for name, implementation in implementations.items()}
+
+    for name, seconds in timings.items():
+        click.echo(f"{name}: {seconds * 1000:.0f} ms, {count / seconds:,.0f} datasets/s")
+
+    previous, compiled = timings.values()
+    click.echo(click.style(f"Speedup: {previous / compiled:.1f}x", fg="green"))
@@ -0,0 +1,13 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command("uvl:index", help="Indexes the feature, attribute and constraint names of every UVL file (backfill).")
+@click.option("--force", is_flag=True, help="Re-index files that already have index entries.")
+@with_appcontext
+def uvl_index(force):
+    from app.modules.flamapy.services import FlamapyService
+
+    click.echo(click.style("Indexing UVL files...", fg="yellow"))
+    indexed = FlamapyService().backfill_feature_index(force=force)
+    click.echo(click.style(f"{indexed} UVL files indexed.", fg="green"))
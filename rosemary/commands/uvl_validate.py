@@ -0,0 +1,13 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command("uvl:validate", help="Validates every UVL file and stores the result (backfill).")
+@click.option("--force", is_flag=True, help="Re-validate files that already have an up-to-date result.")
+@with_appcontext
+def uvl_validate(force):
+    from app.modules.flamapy.services import VALIDATOR_VERSION, FlamapyService
+
+    click.echo(click.style(f"Validating UVL files with validator {VALIDATOR_VERSION}...", fg="yellow"))
+    validated = FlamapyService().backfill_validations(force=force)
+    click.echo(click.style(f"{validated} distinct UVL files have an up-to-date validation.", fg="green"))